@@ -1,149 +1,850 @@
+import time
+_IMPORTS_START = time.perf_counter()
 import sys
-import math
-from datetime import datetime, timedelta
+import statistics
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QHBoxLayout,
     QComboBox, QLabel, QLineEdit, QPushButton, QGridLayout, QGroupBox,
     QDateEdit, QSpinBox, QDoubleSpinBox, QColorDialog, QGraphicsDropShadowEffect,
-    QSizePolicy, QScrollArea
+    QSizePolicy, QScrollArea, QStackedWidget, QCompleter, QFileDialog, QMessageBox, QAbstractSpinBox
 )
-from PyQt6.QtGui import QColor, QDoubleValidator
-from PyQt6.QtCore import Qt, QDate
-# Network for currency API
-try:
-    import requests
-    REQUESTS_AVAILABLE = True
-except ImportError:
-    REQUESTS_AVAILABLE = False
+from PyQt6.QtGui import QAction, QColor, QDoubleValidator, QImage, QPainter, QPixmap
+from PyQt6.QtCore import Qt, QDate, QEvent, QRectF, QTimer, QObject, QStringListModel, pyqtSignal
+from engine import get_engine, TEMPERATURE_UNITS, FUEL_UNITS
+# Network for currency API (requests itself is imported on the first fetch)
+from rates import (
+    REQUESTS_AVAILABLE, REFERENCE_BASE, CURRENCIES, NOT_MODIFIED, CrossRates, PersistentRateCache,
+    get_provider, format_age
+)
+from unit_search import UnitIndex, default_entries, prefixed_entries
+from expressions import ExpressionError, format_result, get_evaluator
+from tracing import get_tracer, trace_path_from_env
+from grades import DEFAULT_CREDITS, GRADE_POINTS, GradeError, cgpa
+if not REQUESTS_AVAILABLE:
     print("Requests library not available. Currency conversion will not work.")
 
+# Startup profile: (label, seconds) in the order they were recorded
+STARTUP_TIMINGS = [("imports", time.perf_counter() - _IMPORTS_START)]
+
+
+@contextmanager
+def timed(label, timings=STARTUP_TIMINGS):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.append((label, time.perf_counter() - start))
+
+
+def print_startup_profile(timings=STARTUP_TIMINGS):
+    print("Startup profile:", file=sys.stderr)
+    for label, seconds in timings:
+        print(f"  {label:<28} {seconds * 1000:8.1f} ms", file=sys.stderr)
+    total = time.perf_counter() - _IMPORTS_START
+    print(f"  {'total (to first paint)':<28} {total * 1000:8.1f} ms", file=sys.stderr)
+
+# Built converter panels kept alive per tab (least recently used are dropped)
+PANEL_CACHE_SIZE = 8
+
+# Most courses the CGPA panel takes (its grade rows are pooled)
+CGPA_MAX_COURSES = 120
+
+# Tab title -> converters listed in its selector
+CONVERTER_TABS = (
+    ("Physical Units", ["Length", "Mass", "Temperature", "Volume", "Area", "Speed", "Energy", "Power", "Pressure", "Angle", "Density"]),
+    ("Digital Units", ["Storage", "Data Rate", "Time", "Decimal to Hex", "RGB to Hex"]),
+    ("Health/Education", ["BMI", "CGPA", "Grade Converter", "Age Calculator", "Date Difference", "BMR/TDEE", "Tip Calculator", "Discount Calculator"]),
+    ("Finance", ["Currency Converter"]),
+    ("Miscellaneous", ["Frequency", "Force", "Torque", "Viscosity", "Fuel Efficiency", "Illuminance", "Quick Convert"]),
+)
+
+# Convert-as-you-type waits for a pause this long (ms) after the last keystroke
+LIVE_CONVERT_DEBOUNCE_MS = 250
+
+# Methods shadowed with traced versions while tracing is on: attribute -> span
+TRACED_WINDOW_METHODS = {
+    "build_tab": "build_tab", "update_converter": "update_converter",
+    "build_converter_panel": "build_converter_panel", "apply_stylesheet": "apply_stylesheet",
+    "update_search": "update_search",
+}
+TRACED_FETCHER_METHODS = {"_fetch": "fetch_rates", "request": "rates.request"}
+
+# Dark theme, by the widget class each rule styles. Normally the whole theme is
+# set on the window. With performance rendering the window keeps only the
+# chrome and every widget in the tabs gets just its own class's rules, so a
+# widget is styled from a few rules instead of the whole sheet cascading down
+# from the root.
+GROUP_TITLE_MARGIN = 20  # QGroupBox margin-top; its frame starts this far down
+THEME_RULES = {
+    "QMainWindow": """
+        QMainWindow {
+            background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
+                stop:0 #1d1f27, stop:1 #14151b);
+            color: #e6e6e6;
+            font-family: Segoe UI, Roboto, "Helvetica Neue", Arial;
+        }""",
+    "QTabWidget": """
+        QTabWidget::pane {
+            border: 0px;
+            background: transparent;
+            margin: 10px;
+        }""",
+    "QTabBar": """
+        QTabBar::tab {
+            background: #2a2d3a;
+            color: #d8d8d8;
+            padding: 10px 16px;
+            margin-right: 6px;
+            border-radius: 8px;
+            font-weight: 500;
+        }
+        QTabBar::tab:selected {
+            background: #3a3f54;
+            color: #ffffff;
+        }
+        QTabBar::tab:hover:!selected {
+            background: #34394b;
+        }""",
+    "QGroupBox": f"""
+        QGroupBox {{
+            background: #242734;
+            border: 1px solid #3c4155;
+            border-radius: 12px;
+            margin-top: {GROUP_TITLE_MARGIN}px;
+            padding: 20px;
+            padding-top: 28px;
+            font-size: 16px;
+            color: #9bd5ff;
+            font-weight: 600;
+        }}
+        QGroupBox::title {{
+            subcontrol-origin: margin;
+            left: 14px;
+            padding: 0 8px;
+            margin-top: -12px;
+            background: #242734;
+        }}""",
+    "QLabel": """
+        QLabel {
+            color: #e6e6e6;
+            font-size: 14px;
+        }
+        QLabel#resultLabel {
+            font-size: 18px;
+            font-weight: bold;
+            color: #7ce0d3;
+            padding: 10px;
+            background: rgba(124, 224, 211, 0.08);
+            border: 1px solid rgba(124, 224, 211, 0.25);
+            border-radius: 8px;
+            margin-top: 10px;
+        }""",
+}
+for _cls in ("QComboBox", "QLineEdit", "QSpinBox", "QDoubleSpinBox", "QDateEdit"):
+    THEME_RULES[_cls] = f"""
+        {_cls} {{
+            background: #2a2d3a;
+            color: #ffffff;
+            border: 1px solid #414658;
+            border-radius: 8px;
+            padding: 8px 10px;
+            min-height: 28px;
+        }}
+        {_cls}:hover {{
+            border: 1px solid #5a6075;
+        }}"""
+THEME_RULES["QComboBox"] += """
+        QComboBox QAbstractItemView {
+            background: #2a2d3a;
+            border: 1px solid #414658;
+            selection-background-color: #3a3f54;
+        }"""
+THEME_RULES.update({
+    "QPushButton": """
+        QPushButton {
+            background: #5568fe;
+            color: #ffffff;
+            border: none;
+            border-radius: 8px;
+            padding: 10px 16px;
+            font-weight: 600;
+        }
+        QPushButton:hover {
+            background: #6a7bff;
+        }
+        QPushButton:pressed {
+            background: #3f53ff;
+        }
+        QPushButton#secondary {
+            background: #3a3f54;
+        }
+        QPushButton#secondary:hover {
+            background: #464c67;
+        }""",
+    "QScrollArea": """
+        QScrollArea {
+            border: none;
+            background: transparent;
+        }""",
+    "QWidget": """
+        QWidget#scrollWidget {
+            background: transparent;
+        }""",
+})
+for _cls in ("QMenuBar", "QMenu", "QStatusBar"):
+    THEME_RULES[_cls] = f"""
+        {_cls} {{
+            background: #1d1f27;
+            color: #d8d8d8;
+        }}"""
+for _cls in ("QMenuBar", "QMenu"):
+    THEME_RULES[_cls] += f"""
+        {_cls}::item:selected {{
+            background: #3a3f54;
+        }}"""
+THEME_RULES["QStatusBar"] += """
+        QStatusBar QLabel {
+            color: #9aa2c0;
+            font-size: 12px;
+        }"""
+# Rules that stay on the window with performance rendering
+CHROME_CLASSES = ("QMainWindow", "QTabWidget", "QTabBar", "QScrollArea", "QWidget", "QMenuBar", "QMenu", "QStatusBar")
+
+# Converter panel drop shadow
+SHADOW_BLUR = 24
+SHADOW_OFFSET = 8
+SHADOW_ALPHA = 160
+
+# Performance rendering switches itself on (once) when the median of the last
+# FRAME_WINDOW frames takes longer than this (ms); software-rendered remote
+# desktops are where the live shadows stutter
+FRAME_BUDGET_MS = 33.0
+FRAME_WINDOW = 30
+# Frame times kept per rendering mode for Debug > Frame times
+FRAME_HISTORY = 5000
+
+
+def format_exact(value):
+    # Exact-mode results (Decimal): plain notation, no trailing zeros
+    return f"{value.normalize():f}"
+
+
+class ConversionScheduler(QObject):
+    # Coalesces signal-driven recomputations for every converter panel: all
+    # schedule(fn) calls made during one event-loop turn collapse into a
+    # single fn() on the next turn (a swap fires two currentIndexChanged, but
+    # converts once). typed(fn) is the convert-as-you-type hook and also waits
+    # for a pause in typing. `saved` counts the recomputations that were
+    # requested but never had to run.
+    statsChanged = pyqtSignal()
+
+    def __init__(self, debounce_ms=LIVE_CONVERT_DEBOUNCE_MS, live=False, parent=None):
+        super().__init__(parent)
+        self.debounce_ms = debounce_ms
+        self.live = live
+        self._pending = {}  # fn -> None, in request order
+        self._timers = {}   # fn -> debounce timer
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(0)
+        self._flush_timer.timeout.connect(self.flush)
+        self.requested = 0
+        self.evaluated = 0
+        self.saved = 0
+
+    def schedule(self, fn):
+        self.requested += 1
+        self._enqueue(fn)
+
+    def typed(self, fn):
+        if not self.live:
+            return
+        self.requested += 1
+        timer = self._timers.get(fn)
+        if timer is None:
+            timer = self._timers[fn] = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda f=fn: self._enqueue(f))
+        elif timer.isActive():
+            # The previous keystroke's conversion is superseded
+            self.saved += 1
+        timer.start(self.debounce_ms)
+
+    def watch(self, fn, signals=(), typing=()):
+        # Wire value-changing signals (combos, spin boxes) and text signals
+        for signal in signals:
+            signal.connect(lambda *_, f=fn: self.schedule(f))
+        for signal in typing:
+            signal.connect(lambda *_, f=fn: self.typed(f))
+
+    def forget(self, fn):
+        # Drop everything queued for a panel that is going away
+        self._pending.pop(fn, None)
+        timer = self._timers.pop(fn, None)
+        if timer is not None:
+            try:
+                timer.stop()
+                timer.deleteLater()
+            except RuntimeError:
+                # Window teardown: the scheduler (and its timers) went first
+                pass
+
+    def _enqueue(self, fn):
+        if fn in self._pending:
+            self.saved += 1
+            return
+        self._pending[fn] = None
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self):
+        pending, self._pending = self._pending, {}
+        for fn in pending:
+            self.evaluated += 1
+            fn()
+        if pending:
+            self.statsChanged.emit()
+
+    def stats(self):
+        return {"requested": self.requested, "evaluated": self.evaluated, "saved": self.saved}
+
+
+class RateFetcher(QObject):
+    # Fetches exchange rates on worker threads so the window never blocks.
+    # Only the reference base is fetched; every pair is triangulated from it
+    # (see rates.CrossRates), so a session costs one call per TTL window.
+    # Concurrent requests share the in-flight fetch; the result is delivered
+    # on the GUI thread through ratesReady.
+    ratesReady = pyqtSignal(str, object)  # base, rates dict or None on failure
+    _fetched = pyqtSignal(str, object)
+
+    # A base whose fetch failed is not retried automatically for this long
+    # (seconds); Refresh Rates always retries
+    RETRY_AFTER = 60
+
+    def __init__(self, cache, provider=None, base=REFERENCE_BASE, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.provider = provider or get_provider()
+        self.base = base
+        self.in_flight = set()
+        self._failed_at = {}
+        self._cross = None
+        self._cross_source = None
+        self._pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="rates")
+        self._fetched.connect(self._on_fetched)
+
+    def request(self, force_refresh=False):
+        # Cross rates right away, even stale ones (None if nothing is cached);
+        # a background refresh starts when they are missing, stale or forced
+        base = self.base
+        rates, age = self.cache.lookup(base)
+        stale = rates is None or age >= self.cache.ttl
+        if force_refresh or (stale and not self._backing_off(base)):
+            if base not in self.in_flight:
+                self.in_flight.add(base)
+                self._pool.submit(self._fetch, base)
+        if rates is None:
+            return None
+        # Matrix is rebuilt only when a new payload arrives
+        if self._cross_source is not rates:
+            self._cross = CrossRates(base, rates)
+            self._cross_source = rates
+        return self._cross
+
+    def is_loading(self):
+        return self.base in self.in_flight
+
+    def _backing_off(self, base):
+        failed_at = self._failed_at.get(base)
+        return failed_at is not None and time.monotonic() - failed_at < self.RETRY_AFTER
+
+    def _fetch(self, base):
+        # Worker thread: emitting crosses back to the GUI thread. It always
+        # emits, failed or not, so the base never stays in in_flight.
+        rates = None
+        try:
+            status, rates = self.provider.fetch(base)
+            if status == NOT_MODIFIED:
+                rates = self.cache.touch(base)
+                if rates is None:
+                    # Validators outlived the cached payload; fetch it in full
+                    status, rates = self.provider.fetch(base, conditional=False)
+            if rates is not None and not isinstance(rates, dict):
+                raise TypeError(f"unexpected rates payload ({type(rates).__name__})")
+            if rates and status != NOT_MODIFIED:
+                self.cache.put(base, rates)
+        except Exception as e:
+            print(f"Error refreshing currency rates: {e}")
+            rates = None
+        finally:
+            self._fetched.emit(base, rates)
+
+    def _on_fetched(self, base, rates):
+        self.in_flight.discard(base)
+        if rates:
+            self._failed_at.pop(base, None)
+        else:
+            self._failed_at[base] = time.monotonic()
+        self.ratesReady.emit(base, rates)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+_panel_sheets = {}  # class name -> theme rules for that class and its bases
+
+
+def panel_sheet(widget):
+    # The non-chrome theme rules that apply to widget's class
+    name = widget.metaObject().className()
+    sheet = _panel_sheets.get(name)
+    if sheet is None:
+        rules = []
+        meta = widget.metaObject()
+        while meta is not None:
+            cls = meta.className()
+            if cls in THEME_RULES and cls not in CHROME_CLASSES:
+                rules.append(THEME_RULES[cls])
+            meta = meta.superClass()
+        sheet = _panel_sheets[name] = "".join(reversed(rules))
+    return sheet
+
+
+@lru_cache(maxsize=32)
+def shadow_pixmap(width, height, radius=12):
+    # Soft shadow of a rounded width x height panel, padded by SHADOW_BLUR / 2
+    # on every side: translucent layers shrink towards the panel, so the alpha
+    # builds up to SHADOW_ALPHA underneath it. Rendered once per panel size.
+    spread = SHADOW_BLUR // 2
+    image = QImage(width + 2 * spread, height + 2 * spread, QImage.Format.Format_ARGB32_Premultiplied)
+    image.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+    layer = 1 - (1 - SHADOW_ALPHA / 255) ** (1 / spread)
+    painter.setBrush(QColor(0, 0, 0, round(255 * layer)))
+    for grow in range(spread, 0, -1):
+        painter.drawRoundedRect(QRectF(spread - grow, spread - grow, width + 2 * grow, height + 2 * grow),
+                                radius + grow, radius + grow)
+    painter.end()
+    return QPixmap.fromImage(image)
+
+
+class PanelStack(QStackedWidget):
+    # The converter panels of one tab. With cached_shadow on, the current
+    # panel's shadow is painted here from shadow_pixmap() instead of by a
+    # QGraphicsDropShadowEffect, which re-renders and re-blurs the whole panel
+    # for every repaint inside it (each keystroke, each cursor blink).
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.cached_shadow = False
+
+    def set_cached_shadow(self, on):
+        self.cached_shadow = on
+        spread = SHADOW_BLUR // 2
+        if on:
+            self.setContentsMargins(spread, 0, spread, spread + SHADOW_OFFSET)
+        else:
+            self.setContentsMargins(0, 0, 0, 0)
+        self.update()
+
+    def paintEvent(self, event):
+        page = self.currentWidget()
+        if self.cached_shadow and page is not None:
+            frame = page.geometry().adjusted(0, GROUP_TITLE_MARGIN, 0, 0)
+            spread = SHADOW_BLUR // 2
+            painter = QPainter(self)
+            painter.drawPixmap(frame.x() - spread, frame.y() - spread + SHADOW_OFFSET,
+                               shadow_pixmap(frame.width(), frame.height()))
+            painter.end()
+        super().paintEvent(event)
+
+
+class FrameMonitor(QObject):
+    # Times every frame of one window: Qt paints all dirty widgets and flushes
+    # the backing store while the window handles its UpdateRequest. Frames are
+    # kept per rendering mode, so the two modes can be compared; overBudget
+    # fires once, the first time the median of the last `window` frames is
+    # over budget.
+    overBudget = pyqtSignal(float)
+
+    def __init__(self, widget, mode, budget_ms=FRAME_BUDGET_MS, window=FRAME_WINDOW):
+        super().__init__(widget)
+        self.mode = mode
+        self.budget_ms = budget_ms
+        self.recent = deque(maxlen=window)
+        self.frames = {}  # mode -> frame times (ms), newest last
+        self.armed = True
+        widget.installEventFilter(self)
+
+    def set_mode(self, mode):
+        self.mode = mode
+        self.recent.clear()
+
+    def eventFilter(self, obj, event):
+        if event.type() != QEvent.Type.UpdateRequest:
+            return False
+        start = time.perf_counter()
+        obj.event(event)
+        self.record((time.perf_counter() - start) * 1000)
+        return True
+
+    def record(self, ms):
+        frames = self.frames.get(self.mode)
+        if frames is None:
+            frames = self.frames[self.mode] = deque(maxlen=FRAME_HISTORY)
+        frames.append(ms)
+        self.recent.append(ms)
+        if self.armed and len(self.recent) == self.recent.maxlen:
+            median = statistics.median(self.recent)
+            if median > self.budget_ms:
+                self.armed = False
+                self.overBudget.emit(median)
+
+    def stats(self):
+        # mode -> {"frames", "p50_ms", "p95_ms", "max_ms"}
+        result = {}
+        for mode, frames in self.frames.items():
+            ordered = sorted(frames)
+            result[mode] = {
+                "frames": len(ordered),
+                "p50_ms": ordered[len(ordered) // 2],
+                "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                "max_ms": ordered[-1],
+            }
+        return result
+
+    def format_stats(self):
+        stats = self.stats()
+        if not stats:
+            return "No frames recorded"
+        lines = [f"{'mode':<12} {'frames':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}"]
+        for mode, s in stats.items():
+            lines.append(f"{mode:<12} {s['frames']:>7} {s['p50_ms']:>8.2f} {s['p95_ms']:>8.2f} {s['max_ms']:>8.2f}")
+        lines.append(f"Budget: {self.budget_ms:.0f} ms per frame")
+        return "\n".join(lines)
+
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, panel_cache_size=PANEL_CACHE_SIZE, live_convert=False,
+                 debounce_ms=LIVE_CONVERT_DEBOUNCE_MS, performance_rendering=False, auto_performance=True):
         super().__init__()
         self.setWindowTitle("All-In-One Unit Converter")
         self.setGeometry(100, 100, 980, 720)
 
+        # Shared headless conversion engine (unit tables + factor matrices)
+        self.engine = get_engine()
+        # View > Exact arithmetic: Decimal results from cached rational factors
+        self.exact_mode = False
+        self.panel_cache_size = max(1, panel_cache_size)
+
+        # One scheduler shared by all panels, so bursts of signals convert once
+        self.scheduler = ConversionScheduler(debounce_ms, live_convert, parent=self)
+
+        # Debug > Record trace (or AK_CONVERTER_TRACE): while off, window methods
+        # aren't wrapped and panel handlers only check a flag
+        self.tracer = get_tracer()
+        self._panel_name = None
+        if self.tracer.enabled:
+            self.tracer.instrument(self, TRACED_WINDOW_METHODS, "ui")
+
+        # View > Performance rendering: cached panel shadows and per-class
+        # styles; switched on automatically after slow frames unless the user
+        # has chosen a mode
+        self.performance_rendering = performance_rendering
+        self.auto_performance = auto_performance and not performance_rendering
+
         # Modern dark theme stylesheet
-        self.setStyleSheet("""
-            QMainWindow {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:1,
-                    stop:0 #1d1f27, stop:1 #14151b);
-                color: #e6e6e6;
-                font-family: Segoe UI, Roboto, "Helvetica Neue", Arial;
-            }
-            QTabWidget::pane {
-                border: 0px;
-                background: transparent;
-                margin: 10px;
-            }
-            QTabBar::tab {
-                background: #2a2d3a;
-                color: #d8d8d8;
-                padding: 10px 16px;
-                margin-right: 6px;
-                border-radius: 8px;
-                font-weight: 500;
-            }
-            QTabBar::tab:selected {
-                background: #3a3f54;
-                color: #ffffff;
-            }
-            QTabBar::tab:hover:!selected {
-                background: #34394b;
-            }
-            QGroupBox {
-                background: #242734;
-                border: 1px solid #3c4155;
-                border-radius: 12px;
-                margin-top: 20px;
-                padding: 20px;
-                padding-top: 28px;
-                font-size: 16px;
-                color: #9bd5ff;
-                font-weight: 600;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 14px;
-                padding: 0 8px;
-                margin-top: -12px;
-                background: #242734;
-            }
-            QLabel {
-                color: #e6e6e6;
-                font-size: 14px;
-            }
-            QLabel#resultLabel {
-                font-size: 18px;
-                font-weight: bold;
-                color: #7ce0d3;
-                padding: 10px;
-                background: rgba(124, 224, 211, 0.08);
-                border: 1px solid rgba(124, 224, 211, 0.25);
-                border-radius: 8px;
-                margin-top: 10px;
-            }
-            QComboBox, QLineEdit, QSpinBox, QDoubleSpinBox, QDateEdit {
-                background: #2a2d3a;
-                color: #ffffff;
-                border: 1px solid #414658;
-                border-radius: 8px;
-                padding: 8px 10px;
-                min-height: 28px;
-            }
-            QComboBox:hover, QLineEdit:hover, QSpinBox:hover, QDoubleSpinBox:hover, QDateEdit:hover {
-                border: 1px solid #5a6075;
-            }
-            QComboBox QAbstractItemView {
-                background: #2a2d3a;
-                border: 1px solid #414658;
-                selection-background-color: #3a3f54;
-            }
-            QPushButton {
-                background: #5568fe;
-                color: #ffffff;
-                border: none;
-                border-radius: 8px;
-                padding: 10px 16px;
-                font-weight: 600;
-            }
-            QPushButton:hover {
-                background: #6a7bff;
-            }
-            QPushButton:pressed {
-                background: #3f53ff;
-            }
-            QPushButton#secondary {
-                background: #3a3f54;
-            }
-            QPushButton#secondary:hover {
-                background: #464c67;
-            }
-            QScrollArea {
-                border: none;
-                background: transparent;
-            }
-            QWidget#scrollWidget {
-                background: transparent;
-            }
-        """)
+        with timed("stylesheet"):
+            self.apply_stylesheet()
 
         self.tab_widget = QTabWidget()
         self.setCentralWidget(self.tab_widget)
 
-        # Tabs
-        self.add_category_tab("Physical Units", ["Length", "Mass", "Temperature", "Volume", "Area", "Speed", "Energy", "Power", "Pressure", "Angle", "Density"])
-        self.add_category_tab("Digital Units", ["Storage", "Data Rate", "Time", "Decimal to Hex", "RGB to Hex"])
-        self.add_category_tab("Health/Education", ["BMI", "CGPA", "Grade Converter", "Age Calculator", "Date Difference", "BMR/TDEE", "Tip Calculator", "Discount Calculator"])
-        self.add_category_tab("Finance", ["Currency Converter"])
-        self.add_category_tab("Miscellaneous", ["Frequency", "Force", "Torque", "Viscosity", "Fuel Efficiency", "Illuminance"])
+        # Tabs (content is built the first time each tab is shown)
+        for title, converters in CONVERTER_TABS:
+            self.add_category_tab(title, converters)
+        self.tab_widget.currentChanged.connect(self.ensure_tab_built)
+        self.ensure_tab_built(self.tab_widget.currentIndex())
+
+        # View menu + recomputation counter in the status bar
+        self.build_view_menu()
+        self.build_search_box()
+        self.recompute_label = QLabel()
+        self.statusBar().addPermanentWidget(self.recompute_label)
+        self.scheduler.statsChanged.connect(self.show_recompute_stats)
+        self.show_recompute_stats()
+        self.build_debug_menu()
+        self.frame_monitor = FrameMonitor(self, self.rendering_mode())
+        self.frame_monitor.overBudget.connect(self.on_slow_frames)
+
+        # Currency cache, persisted on disk and filled by background fetches
+        self.rate_cache = PersistentRateCache()
+        self.rate_fetcher = RateFetcher(self.rate_cache, parent=self)
+        if self.tracer.enabled:
+            self.instrument_for_tracing()
+
+    def closeEvent(self, event):
+        self.rate_fetcher.shutdown()
+        super().closeEvent(event)
+
+    def build_view_menu(self):
+        view_menu = self.menuBar().addMenu("View")
+        live_action = QAction("Convert as you type", self)
+        live_action.setCheckable(True)
+        live_action.setChecked(self.scheduler.live)
+        live_action.toggled.connect(lambda on: setattr(self.scheduler, "live", on))
+        view_menu.addAction(live_action)
+        self.live_action = live_action
+        exact_action = QAction("Exact arithmetic", self)
+        exact_action.setCheckable(True)
+        exact_action.setToolTip("Convert with exact decimal/rational factors instead of floats")
+        exact_action.toggled.connect(lambda on: setattr(self, "exact_mode", on))
+        view_menu.addAction(exact_action)
+        self.exact_action = exact_action
+        performance_action = QAction("Performance rendering", self)
+        performance_action.setCheckable(True)
+        performance_action.setChecked(self.performance_rendering)
+        performance_action.setToolTip("Cached panel shadows and lighter styling, for slow or remote displays")
+        performance_action.toggled.connect(self.set_performance_rendering)
+        view_menu.addAction(performance_action)
+        self.performance_action = performance_action
+
+    def build_debug_menu(self):
+        debug_menu = self.menuBar().addMenu("Debug")
+        trace_action = QAction("Record trace", self)
+        trace_action.setCheckable(True)
+        trace_action.setChecked(self.tracer.enabled)
+        trace_action.setToolTip("Time panel builds, conversions and rate fetches")
+        trace_action.toggled.connect(self.set_tracing)
+        debug_menu.addAction(trace_action)
+        self.trace_action = trace_action
+        summary_action = QAction("Trace summary...", self)
+        summary_action.triggered.connect(self.show_trace_summary)
+        debug_menu.addAction(summary_action)
+        export_action = QAction("Export Chrome trace...", self)
+        export_action.triggered.connect(self.export_trace)
+        debug_menu.addAction(export_action)
+        clear_action = QAction("Clear trace", self)
+        clear_action.triggered.connect(self.tracer.clear)
+        debug_menu.addAction(clear_action)
+        debug_menu.addSeparator()
+        frames_action = QAction("Frame times...", self)
+        frames_action.triggered.connect(self.show_frame_times)
+        debug_menu.addAction(frames_action)
+
+    def instrument_for_tracing(self):
+        self.tracer.instrument(self, TRACED_WINDOW_METHODS, "ui")
+        self.tracer.instrument(self.rate_fetcher, TRACED_FETCHER_METHODS, "network")
+
+    def set_tracing(self, on):
+        if on == self.tracer.enabled:
+            return
+        if on:
+            self.tracer.enable()
+            self.instrument_for_tracing()
+        else:
+            self.tracer.disable()
+
+    def traced(self, fn):
+        # Decorator for panel handlers. The wrapper checks tracer.enabled on
+        # each call, so panels built before tracing was switched on are traced
+        # too and open panels never need rebuilding. As with a plain slot, fn
+        # only gets the signal arguments it takes (not clicked's `checked`).
+        return self.tracer.wrap(fn, f"{self._panel_name}: {fn.__name__}", "convert",
+                                max_args=fn.__code__.co_argcount)
+
+    def show_trace_summary(self):
+        box = QMessageBox(self)
+        box.setWindowTitle("Trace summary")
+        box.setTextFormat(Qt.TextFormat.RichText)
+        text = self.tracer.format_summary().replace("&", "&amp;").replace("<", "&lt;")
+        box.setText(f"<pre>{text}</pre>")
+        box.exec()
+
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Chrome trace", "ak-converter-trace.json",
+                                              "Trace JSON (*.json)")
+        if path:
+            self.tracer.export_chrome(path)
+            self.statusBar().showMessage(f"Trace written to {path}", 5000)
+
+    def show_frame_times(self):
+        box = QMessageBox(self)
+        box.setWindowTitle("Frame times")
+        box.setTextFormat(Qt.TextFormat.RichText)
+        box.setText(f"<pre>{self.frame_monitor.format_stats()}</pre>")
+        box.exec()
+
+    def rendering_mode(self):
+        return "performance" if self.performance_rendering else "standard"
+
+    def set_performance_rendering(self, on):
+        # Chosen by the user (or once by on_slow_frames): no more switching
+        self.auto_performance = False
+        if on == self.performance_rendering:
+            return
+        self.performance_rendering = on
+        self.frame_monitor.set_mode(self.rendering_mode())
+        self.apply_stylesheet()
+        for i in range(self.tab_widget.count()):
+            tab = self.tab_widget.widget(i)
+            if not tab.built:
+                continue
+            tab.stack.set_cached_shadow(on)
+            for panel in tab.panels.values():
+                self.set_panel_shadow(panel)
+            self.style_widgets(tab)
+        self.style_widgets(self.search_box)
+
+    def on_slow_frames(self, median_ms):
+        if not self.auto_performance:
+            return
+        self.performance_action.setChecked(True)
+        self.statusBar().showMessage(
+            f"Frames took {median_ms:.0f} ms (budget {self.frame_monitor.budget_ms:.0f} ms);"
+            " switched to View > Performance rendering", 10000)
+
+    def set_panel_shadow(self, group):
+        # Live blurred shadow, or none when the panel stack paints a cached one
+        if self.performance_rendering:
+            group.setGraphicsEffect(None)
+            return
+        shadow = QGraphicsDropShadowEffect()
+        shadow.setBlurRadius(SHADOW_BLUR)
+        shadow.setColor(QColor(0, 0, 0, SHADOW_ALPHA))
+        shadow.setOffset(0, SHADOW_OFFSET)
+        group.setGraphicsEffect(shadow)
 
-        # Currency cache
-        self.currency_rates_cache = {}  # { base: {"timestamp": datetime, "rates": {...}} }
+    def style_widgets(self, root):
+        # Performance rendering: root and its children get their own class's
+        # theme rules. Otherwise those are dropped again and the window's
+        # sheet applies. Widgets with a sheet of their own are left alone, and
+        # the internals of combo and spin boxes are styled by the box's rules.
+        for widget in [root, *root.findChildren(QWidget)]:
+            if isinstance(widget.parent(), (QComboBox, QAbstractSpinBox)):
+                continue
+            own = widget.styleSheet()
+            if self.performance_rendering:
+                if not own:
+                    widget.setStyleSheet(panel_sheet(widget))
+            elif own and own == panel_sheet(widget):
+                widget.setStyleSheet("")
+
+    def build_search_box(self):
+        # Global unit search in the menu bar; the index is built on first use
+        self.unit_index = None
+        self.search_hits = {}
+        search = QLineEdit()
+        search.setPlaceholderText("Search units (Ctrl+F)")
+        search.setClearButtonEnabled(True)
+        search.setMinimumWidth(260)
+        self.search_model = QStringListModel(self)
+        completer = QCompleter(self.search_model, self)
+        completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        completer.setMaxVisibleItems(12)
+        search.setCompleter(completer)
+        # Looked up per call, so the traced version is used once it's shadowed
+        search.textEdited.connect(lambda text: self.update_search(text))
+        completer.activated.connect(self.open_search_hit)
+        search.returnPressed.connect(self.open_best_search_hit)
+        focus_action = QAction("Search units", self)
+        focus_action.setShortcut("Ctrl+F")
+        focus_action.triggered.connect(lambda: (search.setFocus(), search.selectAll()))
+        self.addAction(focus_action)
+        self.menuBar().setCornerWidget(search, Qt.Corner.TopRightCorner)
+        self.search_box = search
+        if self.performance_rendering:
+            self.style_widgets(search)
+
+    def update_search(self, text):
+        if self.unit_index is None:
+            with timed("unit search index"):
+                self.unit_index = UnitIndex(default_entries(CONVERTER_TABS, self.engine))
+        hits = {}
+        # Prefixed units ("kPa", "ms") are resolved by lookup, not indexed
+        entries = prefixed_entries(text, CONVERTER_TABS, self.engine)
+        for entry in entries + [result.entry for result in self.unit_index.search(text)]:
+            where = entry.converter if entry.unit else entry.tab
+            hits[f"{entry.label}  —  {where}"] = entry
+        self.search_hits = hits
+        self.search_model.setStringList(list(hits))
+
+    def open_search_hit(self, text):
+        entry = self.search_hits.get(text)
+        if entry is not None:
+            self.jump_to(entry)
+
+    def open_best_search_hit(self):
+        # Enter: the highlighted completion if any, else the top result
+        text = self.search_box.text()
+        if text not in self.search_hits:
+            text = next(iter(self.search_hits), "")
+        self.open_search_hit(text)
+
+    def jump_to(self, entry):
+        # Show the converter for a search entry, with its unit selected
+        titles = [self.tab_widget.tabText(i) for i in range(self.tab_widget.count())]
+        index = titles.index(entry.tab)
+        self.tab_widget.setCurrentIndex(index)
+        self.ensure_tab_built(index)
+        tab = self.tab_widget.widget(index)
+        tab.selector.setCurrentText(entry.converter)
+        panel = tab.panels[entry.converter]
+        if entry.unit is not None:
+            combos = panel.findChildren(QComboBox)
+            for combo in combos:
+                i = combo.findText(entry.unit)
+                if i >= 0:
+                    combo.setCurrentIndex(i)
+                    break
+            else:
+                # A prefixed unit the list doesn't hold: type it in
+                editable = [combo for combo in combos if combo.isEditable()]
+                if editable:
+                    editable[0].setEditText(entry.unit)
+        # The value field, not the line edit inside an editable combo
+        inputs = [e for e in panel.findChildren(QLineEdit) if not isinstance(e.parent(), QComboBox)]
+        if inputs:
+            inputs[0].setFocus()
+
+    def show_recompute_stats(self):
+        stats = self.scheduler.stats()
+        self.recompute_label.setText(f"Recomputations: {stats['evaluated']} run, {stats['saved']} saved")
+
+    def live_converter(self, fn, owner, signals=(), typing=()):
+        # Route a panel's automatic triggers through the shared scheduler
+        self.scheduler.watch(fn, signals, typing)
+        owner.destroyed.connect(lambda *_: self.scheduler.forget(fn))
+
+    def apply_stylesheet(self):
+        # Performance rendering keeps only the chrome here; see style_widgets
+        names = [name for name in THEME_RULES if name in CHROME_CLASSES or not self.performance_rendering]
+        self.setStyleSheet("".join(THEME_RULES[name] for name in names))
 
     def add_category_tab(self, title, converters):
+        # Placeholder only; see build_tab
         tab = QWidget()
+        tab.title = title
+        tab.converters = converters
+        tab.built = False
+        self.tab_widget.addTab(tab, title)
+
+    def ensure_tab_built(self, index):
+        tab = self.tab_widget.widget(index)
+        if tab is not None and not tab.built:
+            with timed(f"tab: {tab.title}"):
+                self.build_tab(tab)
+
+    def build_tab(self, tab):
+        converters = tab.converters
+        tab.built = True
         tab_layout = QVBoxLayout(tab)
 
         scroll_area = QScrollArea()
@@ -163,10 +864,10 @@ class MainWindow(QMainWindow):
         selector_row.addStretch()
         scroll_layout.addLayout(selector_row)
 
-        # Per-tab content container
-        content_widget = QWidget()
-        content_layout = QVBoxLayout(content_widget)
-        scroll_layout.addWidget(content_widget)
+        # Per-tab panel stack; switching back to a built panel is a page flip
+        stack = PanelStack()
+        stack.set_cached_shadow(self.performance_rendering)
+        scroll_layout.addWidget(stack)
         scroll_layout.addStretch()
 
         scroll_area.setWidget(scroll_widget)
@@ -174,7 +875,8 @@ class MainWindow(QMainWindow):
 
         # Store in tab object
         tab.selector = selector
-        tab.content_layout = content_layout
+        tab.stack = stack
+        tab.panels = OrderedDict()  # converter name -> panel, oldest first
 
         # Hook
         selector.currentTextChanged.connect(lambda text, t=tab: self.update_converter(text, t))
@@ -182,61 +884,49 @@ class MainWindow(QMainWindow):
         # Initial
         if converters:
             self.update_converter(converters[0], tab)
-
-        self.tab_widget.addTab(tab, title)
-
-    def clear_layout(self, layout):
-        if layout:
-            while layout.count():
-                item = layout.takeAt(0)
-                w = item.widget()
-                if w:
-                    w.deleteLater()
-                elif item.layout():
-                    self.clear_layout(item.layout())
+        if self.performance_rendering:
+            self.style_widgets(tab)
 
     def update_converter(self, converter_type, tab):
-        self.clear_layout(tab.content_layout)
-
+        group = tab.panels.get(converter_type)
+        if group is None:
+            group = self.build_converter_panel(converter_type)
+            tab.panels[converter_type] = group
+            tab.stack.addWidget(group)
+        tab.panels.move_to_end(converter_type)
+        self.show_panel(tab, group)
+        self.evict_panels(tab)
+
+    def show_panel(self, tab, group):
+        # Only the current page counts towards the stack's size hint, so short
+        # panels don't inherit the height of the tallest one built so far
+        for panel in tab.panels.values():
+            if panel is not group:
+                panel.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        group.setSizePolicy(QSizePolicy.Policy.Preferred, QSizePolicy.Policy.Preferred)
+        tab.stack.setCurrentWidget(group)
+        tab.stack.adjustSize()
+
+    def evict_panels(self, tab):
+        while len(tab.panels) > self.panel_cache_size:
+            _, panel = tab.panels.popitem(last=False)
+            tab.stack.removeWidget(panel)
+            panel.deleteLater()
+
+    def build_converter_panel(self, converter_type):
+        # Names the handlers traced while this panel is built
+        self._panel_name = converter_type
         group = QGroupBox(f"{converter_type} Converter")
         group_layout = QVBoxLayout(group)
 
         # Subtle shadow
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(24)
-        shadow.setColor(QColor(0, 0, 0, 160))
-        shadow.setOffset(0, 8)
-        group.setGraphicsEffect(shadow)
+        self.set_panel_shadow(group)
 
         # Build specific converter
-        if converter_type == "Length":
-            self.create_unit_converter(group_layout, self.get_length_units())
-        elif converter_type == "Mass":
-            self.create_unit_converter(group_layout, self.get_mass_units())
+        if self.engine.has_category(converter_type):
+            self.create_unit_converter(group_layout, self.engine.category(converter_type))
         elif converter_type == "Temperature":
             self.create_temperature_converter(group_layout)
-        elif converter_type == "Volume":
-            self.create_unit_converter(group_layout, self.get_volume_units())
-        elif converter_type == "Area":
-            self.create_unit_converter(group_layout, self.get_area_units())
-        elif converter_type == "Speed":
-            self.create_unit_converter(group_layout, self.get_speed_units())
-        elif converter_type == "Energy":
-            self.create_unit_converter(group_layout, self.get_energy_units())
-        elif converter_type == "Power":
-            self.create_unit_converter(group_layout, self.get_power_units())
-        elif converter_type == "Pressure":
-            self.create_unit_converter(group_layout, self.get_pressure_units())
-        elif converter_type == "Angle":
-            self.create_unit_converter(group_layout, self.get_angle_units())
-        elif converter_type == "Density":
-            self.create_unit_converter(group_layout, self.get_density_units())
-        elif converter_type == "Storage":
-            self.create_unit_converter(group_layout, self.get_storage_units())
-        elif converter_type == "Data Rate":
-            self.create_unit_converter(group_layout, self.get_data_rate_units())
-        elif converter_type == "Time":
-            self.create_unit_converter(group_layout, self.get_time_units())
         elif converter_type == "Decimal to Hex":
             self.create_dec_to_hex_converter(group_layout)
         elif converter_type == "RGB to Hex":
@@ -259,20 +949,14 @@ class MainWindow(QMainWindow):
             self.create_discount_calculator(group_layout)
         elif converter_type == "Currency Converter":
             self.create_currency_converter(group_layout)
-        elif converter_type == "Frequency":
-            self.create_unit_converter(group_layout, self.get_frequency_units())
-        elif converter_type == "Force":
-            self.create_unit_converter(group_layout, self.get_force_units())
-        elif converter_type == "Torque":
-            self.create_unit_converter(group_layout, self.get_torque_units())
-        elif converter_type == "Viscosity":
-            self.create_unit_converter(group_layout, self.get_viscosity_units())
         elif converter_type == "Fuel Efficiency":
             self.create_fuel_efficiency_converter(group_layout)
-        elif converter_type == "Illuminance":
-            self.create_unit_converter(group_layout, self.get_illuminance_units())
+        elif converter_type == "Quick Convert":
+            self.create_expression_converter(group_layout)
 
-        tab.content_layout.addWidget(group)
+        if self.performance_rendering:
+            self.style_widgets(group)
+        return group
 
     def number_line_edit(self, placeholder="Enter a number", allow_negative=True):
         le = QLineEdit()
@@ -281,14 +965,19 @@ class MainWindow(QMainWindow):
         le.setValidator(QDoubleValidator(bottom, 1e18, 12))
         return le
 
-    # General unit converter using multiplicative factors to a base unit
-    def create_unit_converter(self, layout, units):
+    # General unit converter using the engine's precomputed factor matrix
+    def create_unit_converter(self, layout, category):
         input_label = QLabel("Enter Value:")
         input_value = self.number_line_edit("Enter a number")
+        # Common units are listed; any other prefixed unit ("kPa", "ms", "PiB")
+        # can be typed and is resolved by name
         from_unit = QComboBox()
-        from_unit.addItems(list(units.keys()))
+        from_unit.addItems(category.names)
         to_unit = QComboBox()
-        to_unit.addItems(list(units.keys()))
+        to_unit.addItems(category.names)
+        for combo in (from_unit, to_unit):
+            combo.setEditable(True)
+            combo.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
         btn_row = QHBoxLayout()
         convert_btn = QPushButton("Convert")
         swap_btn = QPushButton("Swap")
@@ -310,41 +999,74 @@ class MainWindow(QMainWindow):
 
         layout.addLayout(form_layout)
 
+        matrix = category.matrix
+        names = category.names
+
+        def listed_id(combo):
+            # Combo rows are the category's unit ids, unless a unit was typed
+            i = combo.currentIndex()
+            return i if i >= 0 and combo.currentText() == names[i] else None
+
+        @self.traced
         def do_convert():
             text = input_value.text().strip()
             if not text:
                 output_label.setText("Result: Enter a value")
                 return
+            i, j = listed_id(from_unit), listed_id(to_unit)
+            listed = i is not None and j is not None
+            if not listed:
+                f, t = from_unit.currentText().strip(), to_unit.currentText().strip()
+                unknown = next((unit for unit in (f, t) if not category.has_unit(unit)), None)
+                if unknown is not None:
+                    output_label.setText(f"Result: Unknown unit {unknown!r}")
+                    return
             try:
+                if self.exact_mode:
+                    if listed:
+                        result = category.convert_decimal(text, i, j)
+                    else:
+                        result = self.engine.convert_decimal(category.name, text, f, t)
+                    output_label.setText(f"Result: {format_exact(result)}")
+                    return
                 value = float(text)
-                from_factor = units[from_unit.currentText()]
-                to_factor = units[to_unit.currentText()]
-                result = value * from_factor / to_factor
+                # Listed units use the precomputed matrix, typed ones a cached ratio
+                result = value * (matrix[i][j] if listed else category.ratio(f, t))
                 output_label.setText(f"Result: {result:.6f}")
             except Exception:
                 output_label.setText("Result: Invalid input")
 
+        def set_unit(combo, unit_id, text):
+            # Listed units by row (setCurrentText on an editable combo only
+            # sets the edit text), so the matrix path keeps being used
+            if unit_id is None:
+                combo.setEditText(text)
+            else:
+                combo.setCurrentIndex(unit_id)
+                combo.setEditText(names[unit_id])
+
         def do_swap():
-            i = from_unit.currentText()
-            j = to_unit.currentText()
-            from_unit.setCurrentText(j)
-            to_unit.setCurrentText(i)
-            do_convert()
+            i, j = listed_id(from_unit), listed_id(to_unit)
+            f, t = from_unit.currentText(), to_unit.currentText()
+            set_unit(from_unit, j, t)
+            set_unit(to_unit, i, f)
+            self.scheduler.schedule(do_convert)
 
         convert_btn.clicked.connect(do_convert)
         swap_btn.clicked.connect(do_swap)
         input_value.returnPressed.connect(do_convert)
-        from_unit.currentIndexChanged.connect(do_convert)
-        to_unit.currentIndexChanged.connect(do_convert)
+        self.live_converter(do_convert, output_label,
+                            signals=(from_unit.currentIndexChanged, to_unit.currentIndexChanged),
+                            typing=(input_value.textChanged, from_unit.editTextChanged, to_unit.editTextChanged))
 
     # Temperature special converter
     def create_temperature_converter(self, layout):
         input_label = QLabel("Enter Value:")
         input_value = self.number_line_edit("Enter temperature", allow_negative=True)
         from_unit = QComboBox()
-        from_unit.addItems(["Celsius", "Fahrenheit", "Kelvin"])
+        from_unit.addItems(TEMPERATURE_UNITS)
         to_unit = QComboBox()
-        to_unit.addItems(["Celsius", "Fahrenheit", "Kelvin"])
+        to_unit.addItems(TEMPERATURE_UNITS)
         btn_row = QHBoxLayout()
         convert_btn = QPushButton("Convert")
         swap_btn = QPushButton("Swap")
@@ -366,28 +1088,21 @@ class MainWindow(QMainWindow):
 
         layout.addLayout(form_layout)
 
-        def convert_temp(value, from_u, to_u):
-            if from_u == to_u:
-                return value
-            if from_u == "Celsius":
-                if to_u == "Fahrenheit": return value * 9/5 + 32
-                if to_u == "Kelvin": return value + 273.15
-            elif from_u == "Fahrenheit":
-                if to_u == "Celsius": return (value - 32) * 5/9
-                if to_u == "Kelvin": return (value - 32) * 5/9 + 273.15
-            elif from_u == "Kelvin":
-                if to_u == "Celsius": return value - 273.15
-                if to_u == "Fahrenheit": return (value - 273.15) * 9/5 + 32
-            return value
-
+        @self.traced
         def do_convert():
             text = input_value.text().strip()
             if not text:
                 output_label.setText("Result: Enter a value")
                 return
             try:
+                if self.exact_mode:
+                    result = self.engine.convert_decimal("Temperature", text, from_unit.currentText(), to_unit.currentText())
+                    output_label.setText(f"Result: {format_exact(result)}")
+                    return
                 value = float(text)
-                result = convert_temp(value, from_unit.currentText(), to_unit.currentText())
+                # Compiled once per unit pair, shared with the batch paths
+                convert = self.engine.transform("Temperature", from_unit.currentText(), to_unit.currentText())
+                result = convert.scalar(value)
                 output_label.setText(f"Result: {result:.4f}")
             except Exception:
                 output_label.setText("Result: Invalid input")
@@ -397,13 +1112,14 @@ class MainWindow(QMainWindow):
             j = to_unit.currentText()
             from_unit.setCurrentText(j)
             to_unit.setCurrentText(i)
-            do_convert()
+            self.scheduler.schedule(do_convert)
 
         convert_btn.clicked.connect(do_convert)
         swap_btn.clicked.connect(do_swap)
         input_value.returnPressed.connect(do_convert)
-        from_unit.currentIndexChanged.connect(do_convert)
-        to_unit.currentIndexChanged.connect(do_convert)
+        self.live_converter(do_convert, output_label,
+                            signals=(from_unit.currentIndexChanged, to_unit.currentIndexChanged),
+                            typing=(input_value.textChanged,))
 
     # Decimal to Hex
     def create_dec_to_hex_converter(self, layout):
@@ -421,6 +1137,7 @@ class MainWindow(QMainWindow):
 
         layout.addLayout(form_layout)
 
+        @self.traced
         def do_convert():
             text = input_value.text().strip()
             if not text:
@@ -435,6 +1152,7 @@ class MainWindow(QMainWindow):
 
         convert_btn.clicked.connect(do_convert)
         input_value.returnPressed.connect(do_convert)
+        self.live_converter(do_convert, output_label, typing=(input_value.textChanged,))
 
     # RGB to Hex
     def create_rgb_to_hex_converter(self, layout):
@@ -489,6 +1207,7 @@ class MainWindow(QMainWindow):
 
         layout.addLayout(grid)
 
+        @self.traced
         def do_bmi():
             tw = weight_input.text().strip()
             th = height_input.text().strip()
@@ -525,12 +1244,15 @@ class MainWindow(QMainWindow):
         convert_btn.clicked.connect(do_bmi)
         weight_input.returnPressed.connect(do_bmi)
         height_input.returnPressed.connect(do_bmi)
+        self.live_converter(do_bmi, output_label,
+                            typing=(weight_input.textChanged, height_input.textChanged,
+                                    weight_unit.currentIndexChanged, height_unit.currentIndexChanged))
 
-    # CGPA (simple average of grades)
+    # CGPA (credit-weighted average of grades, see grades.py)
     def create_cgpa_converter(self, layout):
         num_subjects_label = QLabel("Number of Subjects:")
         num_subjects = QSpinBox()
-        num_subjects.setRange(1, 30)
+        num_subjects.setRange(1, CGPA_MAX_COURSES)
         grades_layout = QVBoxLayout()
         convert_btn = QPushButton("Calculate CGPA")
         output_label = QLabel("CGPA: Waiting for input...")
@@ -546,54 +1268,62 @@ class MainWindow(QMainWindow):
         form_layout.addWidget(output_label)
         layout.addLayout(form_layout)
 
-        grades_inputs = []
+        # Grade rows are pooled: changing the count only shows or hides the
+        # rows in between, and a row is built the first time it is needed.
+        # Hidden rows keep what was typed in them.
+        rows = []  # (container, grade input, credits input)
+        shown = 0
 
         def update_grades():
-            nonlocal grades_inputs
-            # Clear old
-            while grades_layout.count():
-                item = grades_layout.takeAt(0)
-                w = item.widget()
-                if w: w.deleteLater()
-            grades_inputs = []
-            # Add new
-            for i in range(num_subjects.value()):
+            nonlocal shown
+            count = num_subjects.value()
+            for i in range(len(rows), count):
                 h_layout = QHBoxLayout()
-                grade_input = self.number_line_edit(f"Grade {i+1} (0-4.0)", allow_negative=False)
-                h_layout.addWidget(QLabel(f"Grade {i+1} (0-4.0):"))
-                h_layout.addWidget(grade_input)
+                grade_input = QLineEdit()
+                grade_input.setPlaceholderText(f"Grade {i+1} (A-F or 0-4.0)")
+                credits_input = QDoubleSpinBox()
+                credits_input.setRange(0, 30)
+                credits_input.setDecimals(1)
+                credits_input.setValue(DEFAULT_CREDITS)
+                credits_input.setSuffix(" credits")
+                h_layout.addWidget(QLabel(f"Grade {i+1}:"))
+                h_layout.addWidget(grade_input, 1)
+                h_layout.addWidget(credits_input)
                 container = QWidget(); container.setLayout(h_layout)
+                container.setVisible(False)
+                if self.performance_rendering:
+                    self.style_widgets(container)
                 grades_layout.addWidget(container)
-                grades_inputs.append(grade_input)
+                rows.append((container, grade_input, credits_input))
+            for i in range(min(shown, count), max(shown, count)):
+                rows[i][0].setVisible(i < count)
+            shown = count
 
         num_subjects.valueChanged.connect(update_grades)
         update_grades()
 
+        @self.traced
         def calculate():
+            courses = [(g.text(), c.value()) for _, g, c in rows[:shown] if g.text().strip()]
+            if not courses:
+                output_label.setText("CGPA: Enter at least one grade")
+                return
             try:
-                grades = []
-                for g in grades_inputs:
-                    if g.text().strip():
-                        val = float(g.text())
-                        if 0 <= val <= 4.0:
-                            grades.append(val)
-                        else:
-                            output_label.setText("CGPA: Grades must be between 0 and 4.0")
-                            return
-                if grades:
-                    cgpa = sum(grades) / len(grades)
-                    output_label.setText(f"CGPA: {cgpa:.2f}")
-                else:
-                    output_label.setText("CGPA: Enter at least one grade")
-            except Exception:
-                output_label.setText("CGPA: Invalid input")
+                result = cgpa(courses)
+            except GradeError as e:
+                output_label.setText(f"CGPA: {e}")
+                return
+            if result is None:
+                output_label.setText("CGPA: Credits must add up to more than 0")
+            else:
+                output_label.setText(f"CGPA: {result:.2f} ({sum(c for _, c in courses):g} credits)")
 
         convert_btn.clicked.connect(calculate)
 
     # Grade Converter (letter to GPA)
     def create_grade_converter(self, layout):
         grade_letter = QComboBox()
-        grade_letter.addItems(["A", "A-", "B+", "B", "B-", "C+", "C", "C-", "D+", "D", "F"])
+        grade_letter.addItems(GRADE_POINTS)
         convert_btn = QPushButton("Convert to GPA")
         output_label = QLabel("GPA: Waiting for input...")
         output_label.setObjectName("resultLabel")
@@ -605,14 +1335,10 @@ class MainWindow(QMainWindow):
         form_layout.addWidget(output_label)
         layout.addLayout(form_layout)
 
-        grade_map = {
-            "A": 4.0, "A-": 3.7, "B+": 3.3, "B": 3.0, "B-": 2.7,
-            "C+": 2.3, "C": 2.0, "C-": 1.7, "D+": 1.3, "D": 1.0, "F": 0.0
-        }
-
+        @self.traced
         def convert():
             g = grade_letter.currentText()
-            output_label.setText(f"GPA: {grade_map[g]:.1f}")
+            output_label.setText(f"GPA: {GRADE_POINTS[g]:.1f}")
 
         convert_btn.clicked.connect(convert)
 
@@ -632,6 +1358,7 @@ class MainWindow(QMainWindow):
         form_layout.addWidget(output_label)
         layout.addLayout(form_layout)
 
+        @self.traced
         def calculate():
             birth = birth_date.date().toPyDate()
             today = datetime.today().date()
@@ -661,6 +1388,7 @@ class MainWindow(QMainWindow):
         form_layout.addWidget(output_label, 3, 0, 1, 2)
         layout.addLayout(form_layout)
 
+        @self.traced
         def calculate():
             start = start_date.date().toPyDate()
             end = end_date.date().toPyDate()
@@ -699,6 +1427,7 @@ class MainWindow(QMainWindow):
             "Super Active": 1.9
         }
 
+        @self.traced
         def calculate():
             try:
                 w = float(weight.text())
@@ -711,6 +1440,9 @@ class MainWindow(QMainWindow):
                 output_label.setText("Results: Invalid input")
 
         calculate_btn.clicked.connect(calculate)
+        self.live_converter(calculate, output_label,
+                            typing=(weight.textChanged, height.textChanged, age.textChanged,
+                                    gender.currentIndexChanged, activity.currentIndexChanged))
 
     # Tip Calculator
     def create_tip_calculator(self, layout):
@@ -730,6 +1462,7 @@ class MainWindow(QMainWindow):
         grid.addWidget(output_label, 3, 0, 1, 2)
         layout.addLayout(grid)
 
+        @self.traced
         def calculate():
             try:
                 b = float(bill.text())
@@ -741,6 +1474,7 @@ class MainWindow(QMainWindow):
                 output_label.setText("Tip: Invalid input")
 
         calculate_btn.clicked.connect(calculate)
+        self.live_converter(calculate, output_label, typing=(bill.textChanged, tip_percent.valueChanged))
 
     # Discount Calculator
     def create_discount_calculator(self, layout):
@@ -760,6 +1494,7 @@ class MainWindow(QMainWindow):
         grid.addWidget(output_label, 3, 0, 1, 2)
         layout.addLayout(grid)
 
+        @self.traced
         def calculate():
             try:
                 p = float(price.text())
@@ -771,6 +1506,8 @@ class MainWindow(QMainWindow):
                 output_label.setText("Discounted Price: Invalid input")
 
         calculate_btn.clicked.connect(calculate)
+        self.live_converter(calculate, output_label,
+                            typing=(price.textChanged, discount_percent.valueChanged))
 
     # Currency Converter (robust API, caching, swap, auto-convert)
     def create_currency_converter(self, layout):
@@ -788,18 +1525,13 @@ class MainWindow(QMainWindow):
         btn_row.addWidget(refresh_btn)
         output_label = QLabel("Result: Waiting for input...")
         output_label.setObjectName("resultLabel")
+        status_label = QLabel("")
+        status_label.setStyleSheet("color: #9aa2c0; font-size: 12px;")
         attribution = QLabel('<a href="https://exchangerate.host" style="color: #9aa2c0;">Rates by exchangerate.host</a>')
         attribution.setOpenExternalLinks(True)
 
-        # Broad set of common currencies + BTC/ETH
-        currencies = [
-            "USD", "EUR", "GBP", "JPY", "CAD", "AUD", "CHF", "CNY", "INR",
-            "NZD", "SEK", "NOK", "DKK", "PLN", "CZK", "HUF", "MXN", "BRL",
-            "ZAR", "HKD", "SGD", "KRW", "THB", "TWD", "AED", "SAR", "TRY",
-            "ILS", "RUB", "BTC", "ETH"
-        ]
-        from_curr.addItems(currencies)
-        to_curr.addItems(currencies)
+        from_curr.addItems(CURRENCIES)
+        to_curr.addItems(CURRENCIES)
         from_curr.setCurrentText("USD")
         to_curr.setCurrentText("EUR")
 
@@ -809,37 +1541,33 @@ class MainWindow(QMainWindow):
         grid.addWidget(QLabel("To:"), 2, 0); grid.addWidget(to_curr, 2, 1)
         grid.addLayout(btn_row, 3, 0, 1, 2)
         grid.addWidget(output_label, 4, 0, 1, 2)
-        grid.addWidget(attribution, 5, 0, 1, 2)
+        grid.addWidget(status_label, 5, 0, 1, 2)
+        grid.addWidget(attribution, 6, 0, 1, 2)
         layout.addLayout(grid)
 
-        def fetch_rates(base, force_refresh=False):
-            # Return cached if fresh (30 minutes)
-            entry = self.currency_rates_cache.get(base)
-            if entry and not force_refresh:
-                ts = entry.get("timestamp")
-                if ts and (datetime.now() - ts) < timedelta(minutes=30):
-                    return entry["rates"]
-
-            if not REQUESTS_AVAILABLE:
-                return None
-
-            try:
-                # Free, no-key API that supports crypto: exchangerate.host
-                url = f"https://api.exchangerate.host/latest?base={base}"
-                resp = requests.get(url, timeout=8)
-                if resp.status_code == 200:
-                    data = resp.json()
-                    rates = data.get("rates", {})
-                    if rates:
-                        self.currency_rates_cache[base] = {
-                            "timestamp": datetime.now(),
-                            "rates": rates
-                        }
-                        return rates
-            except Exception as e:
-                print(f"Error fetching currency rates: {e}")
-            return None
-
+        def show_status():
+            # Cache diagnostics: rate age and hit/miss counters
+            base = self.rate_fetcher.base
+            parts = []
+            if self.rate_fetcher.is_loading():
+                parts.append("Updating rates...")
+            age = self.rate_cache.age(base)
+            if age is not None:
+                state = "" if age < self.rate_cache.ttl else " (stale, last known)"
+                parts.append(f"{base} rates {format_age(age)} old{state}")
+            stats = self.rate_cache.stats()
+            parts.append(f"Cache: {stats['hits']} hits, {stats['stale_hits']} stale, {stats['misses']} misses")
+            status_label.setText("  ·  ".join(parts))
+            http = self.rate_fetcher.provider.stats()
+            latency = http["avg_latency_ms"]
+            status_label.setToolTip(
+                f"HTTP requests: {http['requests']} ({http['not_modified']} not modified, {http['failures']} failed)\n"
+                f"Connections: {http['connections_opened']} opened, {http['connections_reused']} reused\n"
+                f"Received: {http['bytes_received'] / 1024:.1f} KiB\n"
+                f"Average latency: {'-' if latency is None else f'{latency:.0f} ms'}"
+            )
+
+        @self.traced
         def do_convert(force=False):
             amt_text = amount_input.text().strip()
             if not amt_text:
@@ -852,35 +1580,46 @@ class MainWindow(QMainWindow):
                 if fc == tc:
                     output_label.setText(f"Result: {amount:.6f} {tc}")
                     return
-                rates = fetch_rates(fc, force_refresh=force)
-                if rates and tc in rates:
-                    rate = float(rates[tc])
+                cross = self.rate_fetcher.request(force_refresh=force)
+                rate = cross.rate(fc, tc) if cross else None
+                if cross is None and self.rate_fetcher.is_loading():
+                    output_label.setText("Result: Loading rates...")
+                elif rate is not None:
                     result = amount * rate
                     output_label.setText(f"Result: {result:.6f} {tc}  (Rate: {rate:.6f})")
                 else:
                     output_label.setText("Result: Could not fetch rates (try Refresh Rates)")
+                show_status()
             except Exception:
                 output_label.setText("Result: Invalid amount")
 
+        @self.traced
+        def on_rates(base, rates):
+            self.scheduler.schedule(do_convert)
+
         def do_swap():
             i = from_curr.currentText()
             j = to_curr.currentText()
             from_curr.setCurrentText(j)
             to_curr.setCurrentText(i)
-            do_convert()
+            self.scheduler.schedule(do_convert)
 
+        self.rate_fetcher.ratesReady.connect(on_rates)
+        # The fetcher outlives cached panels; drop the slot with the panel
+        output_label.destroyed.connect(lambda: self.rate_fetcher.ratesReady.disconnect(on_rates))
         convert_btn.clicked.connect(lambda: do_convert(False))
         swap_btn.clicked.connect(do_swap)
         refresh_btn.clicked.connect(lambda: do_convert(True))
         amount_input.returnPressed.connect(lambda: do_convert(False))
-        from_curr.currentIndexChanged.connect(lambda: do_convert(False))
-        to_curr.currentIndexChanged.connect(lambda: do_convert(False))
+        self.live_converter(do_convert, output_label,
+                            signals=(from_curr.currentIndexChanged, to_curr.currentIndexChanged),
+                            typing=(amount_input.textChanged,))
 
     # Fuel efficiency MPG <-> L/100km
     def create_fuel_efficiency_converter(self, layout):
         input_value = self.number_line_edit("Enter value", allow_negative=False)
-        from_unit = QComboBox(); from_unit.addItems(["MPG (US)", "L/100km"])
-        to_unit = QComboBox(); to_unit.addItems(["MPG (US)", "L/100km"])
+        from_unit = QComboBox(); from_unit.addItems(FUEL_UNITS)
+        to_unit = QComboBox(); to_unit.addItems(FUEL_UNITS)
         convert_btn = QPushButton("Convert")
         output_label = QLabel("Result: Waiting for input...")
         output_label.setObjectName("resultLabel")
@@ -893,99 +1632,90 @@ class MainWindow(QMainWindow):
         grid.addWidget(output_label, 4, 0, 1, 2)
         layout.addLayout(grid)
 
-        def convert_fuel(v, fu, tu):
-            if fu == tu:
-                return v
-            if fu == "MPG (US)" and tu == "L/100km":
-                return 235.215 / v if v != 0 else float("inf")
-            if fu == "L/100km" and tu == "MPG (US)":
-                return 235.215 / v if v != 0 else float("inf")
-            return v
-
+        @self.traced
         def do_convert():
             t = input_value.text().strip()
             if not t:
                 output_label.setText("Result: Enter a value")
                 return
             try:
+                if self.exact_mode:
+                    res = self.engine.convert_decimal("Fuel Efficiency", t, from_unit.currentText(), to_unit.currentText())
+                    output_label.setText(f"Result: {format_exact(res)}")
+                    return
                 v = float(t)
-                res = convert_fuel(v, from_unit.currentText(), to_unit.currentText())
+                res = self.engine.transform("Fuel Efficiency", from_unit.currentText(), to_unit.currentText()).scalar(v)
                 output_label.setText(f"Result: {res:.3f}")
             except Exception:
                 output_label.setText("Result: Invalid input")
 
         convert_btn.clicked.connect(do_convert)
         input_value.returnPressed.connect(do_convert)
-        from_unit.currentIndexChanged.connect(do_convert)
-        to_unit.currentIndexChanged.connect(do_convert)
-
-    # Units dictionaries (factors relative to base unit named in comment)
-    def get_length_units(self):  # base: meter
-        return {"Meter": 1, "Centimeter": 0.01, "Millimeter": 0.001, "Kilometer": 1000,
-                "Inch": 0.0254, "Foot": 0.3048, "Yard": 0.9144, "Mile": 1609.344, "Nautical Mile": 1852}
-
-    def get_mass_units(self):  # base: kilogram
-        return {"Milligram": 1e-6, "Gram": 0.001, "Kilogram": 1, "Tonne": 1000,
-                "Ounce": 0.028349523125, "Pound": 0.45359237}
-
-    def get_volume_units(self):  # base: cubic meter
-        return {"Cubic Meter": 1, "Liter": 0.001, "Milliliter": 1e-6,
-                "Gallon (US)": 0.003785411784, "Quart (US)": 0.000946352946,
-                "Pint (US)": 0.000473176473, "Cup (US)": 0.0002365882365}
-
-    def get_area_units(self):  # base: square meter
-        return {"Square Meter": 1, "Square Centimeter": 1e-4, "Square Kilometer": 1e6,
-                "Square Inch": 0.00064516, "Square Foot": 0.09290304, "Acre": 4046.8564224, "Hectare": 10000}
-
-    def get_speed_units(self):  # base: m/s
-        return {"m/s": 1, "km/h": 1/3.6, "mph": 0.44704, "knot": 0.514444}
-
-    def get_energy_units(self):  # base: joule
-        return {"Joule": 1, "Kilojoule": 1000, "Calorie": 4.184, "Kilocalorie": 4184,
-                "Watt-hour": 3600, "Kilowatt-hour": 3.6e6, "Electronvolt": 1.602176634e-19}
-
-    def get_power_units(self):  # base: watt
-        return {"Watt": 1, "Kilowatt": 1000, "Horsepower (metric)": 735.49875, "Horsepower (US)": 745.699872}
-
-    def get_pressure_units(self):  # base: pascal
-        return {"Pascal": 1, "Bar": 1e5, "Atmosphere": 101325, "PSI": 6894.757293168, "Torr": 133.322368}
-
-    def get_angle_units(self):  # base: radian
-        return {"Radian": 1, "Degree": math.pi/180, "Gradian": math.pi/200}
-
-    def get_density_units(self):  # base: kg/m^3
-        return {"kg/m³": 1, "g/cm³": 1000, "lb/ft³": 16.01846337}
-
-    def get_storage_units(self):  # base: byte
-        return {"Bit": 1/8, "Byte": 1, "Kilobyte (KB)": 1024, "Megabyte (MB)": 1024**2, "Gigabyte (GB)": 1024**3,
-                "Terabyte (TB)": 1024**4}
-
-    def get_data_rate_units(self):  # base: bps
-        return {"bps": 1, "Kbps": 1_000, "Mbps": 1_000_000, "Gbps": 1_000_000_000,
-                "KiB/s": 8*1024, "MiB/s": 8*1024**2, "GiB/s": 8*1024**3}
-
-    def get_time_units(self):  # base: second
-        return {"Second": 1, "Minute": 60, "Hour": 3600, "Day": 86400, "Week": 604800,
-                "Year (365d)": 31536000}
-
-    def get_frequency_units(self):  # base: hertz
-        return {"Hertz": 1, "Kilohertz": 1_000, "Megahertz": 1_000_000, "Gigahertz": 1_000_000_000}
+        self.live_converter(do_convert, output_label,
+                            signals=(from_unit.currentIndexChanged, to_unit.currentIndexChanged),
+                            typing=(input_value.textChanged,))
+
+    # Free-text expressions, e.g. "5 ft 3 in to cm" (see expressions.py)
+    def create_expression_converter(self, layout):
+        input_value = QLineEdit()
+        input_value.setPlaceholderText("e.g. 5 ft 3 in to cm, 72 F in K, 3.2 GiB/s to Gbps")
+        convert_btn = QPushButton("Convert")
+        output_label = QLabel("Result: Waiting for input...")
+        output_label.setObjectName("resultLabel")
 
-    def get_force_units(self):  # base: newton
-        return {"Newton": 1, "Kilonewton": 1000, "Pound-force": 4.4482216152605, "Dyne": 1e-5}
+        form_layout = QVBoxLayout()
+        form_layout.addWidget(QLabel("Expression:"))
+        form_layout.addWidget(input_value)
+        form_layout.addWidget(convert_btn)
+        form_layout.addWidget(output_label)
+        layout.addLayout(form_layout)
 
-    def get_torque_units(self):  # base: N·m
-        return {"Newton-meter": 1, "Foot-pound": 1.3558179483314004, "Inch-pound": 0.1129848290276167}
+        evaluator = get_evaluator()
 
-    def get_viscosity_units(self):  # base: Pa·s
-        return {"Pascal-second": 1, "Poise": 0.1, "Centipoise": 0.001}
+        @self.traced
+        def do_convert():
+            text = input_value.text().strip()
+            if not text:
+                output_label.setText("Result: Enter an expression")
+                return
+            try:
+                output_label.setText(f"Result: {format_result(evaluator.evaluate(text), 10)}")
+            except ExpressionError as e:
+                output_label.setText(f"Result: {e}")
 
-    def get_illuminance_units(self):  # base: lux
-        return {"Lux": 1, "Foot-candle": 10.76391041671}
+        convert_btn.clicked.connect(do_convert)
+        input_value.returnPressed.connect(do_convert)
+        # Parsing is cheap and plans are cached, so this one always follows typing
+        self.live_converter(do_convert, output_label, signals=(input_value.textChanged,))
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    window = MainWindow()
+    profile_startup = "--profile-startup" in sys.argv
+    if profile_startup:
+        sys.argv.remove("--profile-startup")
+    live_convert = "--live" in sys.argv
+    if live_convert:
+        sys.argv.remove("--live")
+    performance = "--performance" in sys.argv
+    if performance:
+        sys.argv.remove("--performance")
+    with timed("QApplication"):
+        app = QApplication(sys.argv)
+    trace_path = trace_path_from_env()
+    if trace_path:
+        get_tracer().enable()
+    with timed("MainWindow"):
+        window = MainWindow(live_convert=live_convert, performance_rendering=performance)
+    shown_at = time.perf_counter()
     window.show()
-    sys.exit(app.exec())
+    if profile_startup:
+        def report_startup():
+            # Runs once the first show/paint has been processed
+            STARTUP_TIMINGS.append(("show + first paint", time.perf_counter() - shown_at))
+            print_startup_profile()
+        QTimer.singleShot(0, report_startup)
+    status = app.exec()
+    if trace_path:
+        print(get_tracer().format_summary(), file=sys.stderr)
+        print(f"Trace written to {get_tracer().export_chrome(trace_path)}", file=sys.stderr)
+    sys.exit(status)
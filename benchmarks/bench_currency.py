@@ -0,0 +1,164 @@
+"""Currency-path benchmark against the local fake rate server.
+
+Reports p50/p99 conversion latency, cache hit rates and fetch counts.
+
+    python benchmarks/bench_currency.py                      # headless path
+    python benchmarks/bench_currency.py --gui                # real currency panel, offscreen Qt
+    python benchmarks/bench_currency.py --latency 0.05 --error-rate 0.1 --ttl 0.5 --json out.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_rates_server import FakeRatesServer  # noqa: E402
+from rates import (  # noqa: E402
+    CURRENCIES, NOT_MODIFIED, REFERENCE_BASE, CrossRates, RateCache, RateProvider
+)
+
+
+def percentile(samples, pct):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def random_pairs(count, seed):
+    rng = random.Random(seed)
+    return [(rng.choice(CURRENCIES), rng.choice(CURRENCIES), rng.uniform(1, 10000)) for _ in range(count)]
+
+
+def run_headless(server, args):
+    # Same steps as the GUI's RateFetcher + do_convert, but synchronous
+    provider = RateProvider(server.url)
+    cache = RateCache(ttl=args.ttl)
+    cross = source = None
+    latencies = []
+    failures = 0
+    for i, (fc, tc, amount) in enumerate(random_pairs(args.conversions, args.seed)):
+        if args.bump_every and i and i % args.bump_every == 0:
+            server.bump()
+        start = time.perf_counter()
+        rates, age = cache.lookup(REFERENCE_BASE)
+        if rates is None or age >= cache.ttl:
+            status, fetched = provider.fetch(REFERENCE_BASE)
+            if status == NOT_MODIFIED:
+                rates = cache.touch(REFERENCE_BASE)
+            elif fetched:
+                cache.put(REFERENCE_BASE, fetched)
+                rates = fetched
+        if rates is not None and rates is not source:
+            cross, source = CrossRates(REFERENCE_BASE, rates), rates
+        result = cross.convert(amount, fc, tc) if cross else None
+        latencies.append(time.perf_counter() - start)
+        if result is None:
+            failures += 1
+    provider.close()
+    return latencies, failures, cache.stats(), provider.stats()
+
+
+def run_gui(server, args):
+    # Drive the real currency panel under the offscreen Qt platform
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["AK_CONVERTER_CACHE_DIR"] = tempfile.mkdtemp(prefix="ak-bench-")
+    import importlib.util
+    from PyQt6.QtWidgets import QApplication, QComboBox, QLabel, QLineEdit, QPushButton
+
+    spec = importlib.util.spec_from_file_location("ak_converter", os.path.join(ROOT, "ak-converter.py"))
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+
+    app = QApplication.instance() or QApplication([])
+    window = app_module.MainWindow()
+    window.rate_cache.ttl = args.ttl
+    window.rate_fetcher.provider = RateProvider(server.url)
+    window.show()
+    tabs = window.tab_widget
+    tabs.setCurrentIndex(next(i for i in range(tabs.count()) if tabs.tabText(i) == "Finance"))
+    panel = tabs.currentWidget().stack.currentWidget()
+    amount_input = panel.findChildren(QLineEdit)[0]
+    from_curr, to_curr = panel.findChildren(QComboBox)[:2]
+    convert_btn = next(b for b in panel.findChildren(QPushButton) if b.text() == "Convert")
+    result_label = next(lb for lb in panel.findChildren(QLabel) if lb.objectName() == "resultLabel")
+
+    latencies = []
+    failures = 0
+    for i, (fc, tc, amount) in enumerate(random_pairs(args.conversions, args.seed)):
+        if args.bump_every and i and i % args.bump_every == 0:
+            server.bump()
+        for combo, code in ((from_curr, fc), (to_curr, tc)):
+            combo.blockSignals(True)
+            combo.setCurrentText(code)
+            combo.blockSignals(False)
+        amount_input.setText(f"{amount:.2f}")
+        result_label.setText("")
+        start = time.perf_counter()
+        convert_btn.click()
+        # Wait for a final answer (the fetch itself runs in the background)
+        deadline = start + 30
+        while (not result_label.text() or "Loading" in result_label.text()) and time.perf_counter() < deadline:
+            app.processEvents()
+            time.sleep(0.0005)
+        latencies.append(time.perf_counter() - start)
+        if "Could not fetch" in result_label.text():
+            failures += 1
+    stats = (window.rate_cache.stats(), window.rate_fetcher.provider.stats())
+    window.close()
+    return latencies, failures, stats[0], stats[1]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--gui", action="store_true", help="Drive the real currency panel instead of the headless path")
+    parser.add_argument("--conversions", type=int, default=2000)
+    parser.add_argument("--ttl", type=float, default=1800, help="Rate cache TTL in seconds")
+    parser.add_argument("--latency", type=float, default=0.02, help="Server latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--extra-currencies", type=int, default=0, help="Padding currencies per payload")
+    parser.add_argument("--bump-every", type=int, default=0, help="Publish new rates every N conversions")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args(argv)
+
+    with FakeRatesServer(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                         extra_currencies=args.extra_currencies, seed=args.seed) as server:
+        runner = run_gui if args.gui else run_headless
+        latencies, failures, cache_stats, http_stats = runner(server, args)
+        server_stats = {"requests": server.requests, "errors": server.errors, "not_modified": server.not_modified}
+
+    lookups = cache_stats["hits"] + cache_stats["stale_hits"] + cache_stats["misses"]
+    results = {
+        "mode": "gui" if args.gui else "headless",
+        "conversions": len(latencies),
+        "failures": failures,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": max(latencies) * 1000,
+        "cache": cache_stats,
+        "cache_hit_rate": cache_stats["hits"] / lookups if lookups else None,
+        "http": http_stats,
+        "server": server_stats,
+    }
+    print(f"{results['mode']}: {results['conversions']} conversions, {failures} failed")
+    print(f"  latency  p50 {results['p50_ms']:.3f} ms   p99 {results['p99_ms']:.3f} ms   max {results['max_ms']:.3f} ms")
+    print(f"  cache    {cache_stats['hits']} hits, {cache_stats['stale_hits']} stale, {cache_stats['misses']} misses"
+          f" (hit rate {results['cache_hit_rate'] or 0:.1%})")
+    print(f"  fetches  {http_stats['requests']} requests, {http_stats['not_modified']} not modified,"
+          f" {http_stats['failures']} failed, {http_stats['connections_reused']} reused connections")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
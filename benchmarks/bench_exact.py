@@ -0,0 +1,84 @@
+"""Float vs. exact (Fraction / Decimal) conversion throughput.
+
+    float            one multiply by the precomputed float matrix entry
+    fraction         Fraction value x cached Fraction ratio
+    decimal          Decimal value x cached numerator / denominator
+    decimal-uncached ratio rebuilt from the table on every call, i.e. what
+                     exact mode would cost without the per-pair cache
+
+    python benchmarks/bench_exact.py
+    python benchmarks/bench_exact.py --count 500000 --json exact.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from engine import EXACT_FACTORS, as_decimal, as_fraction, get_engine  # noqa: E402
+
+CATEGORIES = ("Length", "Mass", "Speed", "Pressure", "Energy")
+
+
+def workload(count, seed):
+    # (category, from id, to id, value text); values as they would be typed
+    engine = get_engine()
+    rng = random.Random(seed)
+    work = []
+    for _ in range(count):
+        cat = engine.category(rng.choice(CATEGORIES))
+        work.append((cat, rng.randrange(len(cat)), rng.randrange(len(cat)), f"{rng.uniform(0, 10000):.4f}"))
+    return work
+
+
+def uncached_decimal(cat, i, j, text):
+    def exact(k):
+        return EXACT_FACTORS.get((cat.name, cat.names[k])) or as_fraction(cat.factors[k])
+    ratio = exact(i) / exact(j)
+    return as_decimal(text) * Decimal(ratio.numerator) / Decimal(ratio.denominator)
+
+
+def run(label, work, fn):
+    start = time.perf_counter()
+    for cat, i, j, value in work:
+        fn(cat, i, j, value)
+    elapsed = time.perf_counter() - start
+    return {"path": label, "conversions": len(work), "seconds": elapsed, "per_second": len(work) / elapsed}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args(argv)
+
+    work = workload(args.count, args.seed)
+    floats = [(cat, i, j, float(v)) for cat, i, j, v in work]
+    # Warm the per-pair caches so the timed runs measure steady state
+    for cat, i, j, v in work:
+        cat.decimal_factor(i, j)
+
+    results = [
+        run("float", floats, lambda cat, i, j, v: v * cat.matrix[i][j]),
+        run("fraction", work, lambda cat, i, j, v: cat.convert_exact(v, i, j)),
+        run("decimal", work, lambda cat, i, j, v: cat.convert_decimal(v, i, j)),
+        run("decimal-uncached", work, uncached_decimal),
+    ]
+    base = results[0]["per_second"]
+    for r in results:
+        r["slowdown_vs_float"] = base / r["per_second"]
+        print(f"{r['path']:>16}: {r['per_second']:>12,.0f} conversions/s  ({r['slowdown_vs_float']:.1f}x float)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""Throughput of the free-text expression parser, in expressions per second.
+
+"cold" compiles every expression (plan cache disabled), "warm" varies only
+the numbers so every plan comes from the cache, "mixed" draws shapes from a
+larger pool than the cache holds.
+
+    python benchmarks/bench_expressions.py
+    python benchmarks/bench_expressions.py --count 200000 --json expressions.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from expressions import ExpressionEvaluator, PLAN_CACHE_SIZE  # noqa: E402
+
+TEMPLATES = (
+    "{a} ft {b} in to cm",
+    "{a} F in K",
+    "{a} GiB/s to Gbps",
+    "{a} km/h to mph",
+    "{a} kwh in kcal",
+    "{a} mpg to L/100km",
+    "{a} lb {b} oz to kg",
+    "{a} nautical miles to km",
+)
+
+# Unit spellings used to grow the pool of distinct shapes for "mixed"
+LENGTHS = ("m", "cm", "mm", "km", "in", "ft", "yd", "mi", "Meter", "Foot", "Inch", "Mile")
+
+
+def expressions(count, seed, shapes=None):
+    rng = random.Random(seed)
+    if shapes is None:
+        pool = TEMPLATES
+    else:
+        pool = [f"{{a}} {u} {{b}} {v} to {w}" for u in LENGTHS for v in LENGTHS for w in LENGTHS][:shapes]
+    return [rng.choice(pool).format(a=rng.randint(1, 999), b=round(rng.uniform(0, 12), 2)) for _ in range(count)]
+
+
+def run(evaluator, exprs):
+    start = time.perf_counter()
+    for text in exprs:
+        evaluator.evaluate(text)
+    elapsed = time.perf_counter() - start
+    return {"expressions": len(exprs), "seconds": elapsed, "per_second": len(exprs) / elapsed,
+            "cache": evaluator.cache_stats()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write results to this file")
+    args = parser.parse_args(argv)
+
+    warm_exprs = expressions(args.count, args.seed)
+    results = {
+        "cold": run(ExpressionEvaluator(cache_size=0), warm_exprs),
+        "warm": run(ExpressionEvaluator(), warm_exprs),
+        "mixed": run(ExpressionEvaluator(), expressions(args.count, args.seed, shapes=PLAN_CACHE_SIZE * 2)),
+    }
+    for mode, r in results.items():
+        cache = r["cache"]
+        print(f"{mode:>5}: {r['per_second']:>10,.0f} expr/s  ({r['expressions']} in {r['seconds']:.2f}s,"
+              f" {cache['hits']} plan hits, {cache['misses']} misses)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+"""Headless GUI replay: UI latency, widget counts and heap growth.
+
+Runs the real MainWindow under the offscreen Qt platform (no display needed)
+and replays a scripted session over and over: tab switches, selector
+changes, typing (real key events), swaps, CGPA subject-count changes and
+currency refreshes against a local fake_rates_server.
+
+    tab / select     until the new panel is shown and its events are processed
+    type / swap /    from the first injected event until the panel's
+    refresh / calc   resultLabel holds a new, final text
+    subjects         the CGPA spin box showing or hiding its pooled grade rows
+
+Widget counts (QApplication.allWidgets), live Python objects and the
+tracemalloc heap are sampled after full passes, after a gc. Growth is
+measured from the end of the warm-up passes, when the panel caches are full,
+so a steady tree reports 0. Panels are kept with a small LRU (--panel-cache,
+2 by default) so selector changes keep going through the deleteLater-driven
+rebuilds in update_converter; each pass ends with all 30 grade rows shown,
+so a cached CGPA panel always holds the same pool. Deferred deletes are
+flushed after every interaction, as the running event loop would do. Frame
+times come from the window's FrameMonitor; the rendering mode is fixed for
+the run (standard, or --performance), so two runs compare the modes.
+
+    python benchmarks/bench_gui_replay.py
+    python benchmarks/bench_gui_replay.py --iterations 5000 --json replay.json
+    python benchmarks/bench_gui_replay.py --max-widget-growth 0 --max-heap-growth 512   # CI
+    python benchmarks/bench_gui_replay.py --performance    # frame times with performance rendering
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from fake_rates_server import FakeRatesServer  # noqa: E402
+from rates import RateProvider  # noqa: E402
+
+# One pass of the scripted session; values are drawn from the seeded rng
+SESSION = (
+    ("tab", "Physical Units"),
+    ("select", "Length"), ("type", None), ("swap", None),
+    ("select", "Mass"), ("type", None), ("swap", None),
+    ("select", "Temperature"), ("type", None), ("swap", None),
+    ("tab", "Digital Units"),
+    ("select", "Storage"), ("type", None),
+    ("select", "Data Rate"), ("type", None),
+    ("tab", "Health/Education"),
+    ("select", "CGPA"), ("subjects", None), ("calc", None), ("subjects", 30),
+    ("select", "Tip Calculator"),
+    ("tab", "Finance"),
+    ("type", None), ("swap", None), ("refresh", None),
+    ("tab", "Miscellaneous"),
+    ("select", "Quick Convert"), ("type", "5 ft 3 in to cm"),
+    ("select", "Force"), ("type", None),
+)
+WAIT_TIMEOUT = 30
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+class Replay:
+    # Drives one MainWindow and collects per-action latencies (seconds)
+    def __init__(self, app, window, server, rng):
+        from PyQt6.QtCore import QCoreApplication, QEvent, Qt
+        from PyQt6.QtTest import QTest
+        from PyQt6.QtWidgets import QComboBox, QLabel, QLineEdit, QPushButton, QSpinBox
+        self.app = app
+        self.window = window
+        self.server = server
+        self.rng = rng
+        self.qt = (QCoreApplication, QEvent, Qt, QTest)
+        self.widgets = (QComboBox, QLabel, QLineEdit, QPushButton, QSpinBox)
+        self.latencies = {}  # action -> [seconds]
+
+    def settle(self):
+        QCoreApplication, QEvent = self.qt[:2]
+        self.app.processEvents()
+        QCoreApplication.sendPostedEvents(None, QEvent.Type.DeferredDelete)
+
+    def panel(self):
+        return self.window.tab_widget.currentWidget().stack.currentWidget()
+
+    def result_label(self):
+        return self.panel().findChild(self.widgets[1], "resultLabel")
+
+    def button(self, text):
+        return next(b for b in self.panel().findChildren(self.widgets[3]) if b.text() == text)
+
+    def wait_for(self, done):
+        deadline = time.perf_counter() + WAIT_TIMEOUT
+        self.settle()
+        while not done():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("Timed out waiting for the UI")
+            time.sleep(0.0005)
+            self.settle()
+
+    def wait_for_result(self, label):
+        # A final text: not cleared and not a "Loading rates..." placeholder
+        fetcher = self.window.rate_fetcher
+        self.wait_for(lambda: label.text() and "Loading" not in label.text() and not fetcher.is_loading())
+
+    def click(self, button):
+        Qt, QTest = self.qt[2:]
+        QTest.mouseClick(button, Qt.MouseButton.LeftButton)
+
+    def do_tab(self, title):
+        tabs = self.window.tab_widget
+        tabs.setCurrentIndex(next(i for i in range(tabs.count()) if tabs.tabText(i) == title))
+        self.wait_for(lambda: self.result_label() is not None)
+
+    def do_select(self, name):
+        self.window.tab_widget.currentWidget().selector.setCurrentText(name)
+        self.wait_for(lambda: self.panel().title().startswith(name) and self.result_label() is not None)
+
+    def do_type(self, text):
+        Qt, QTest = self.qt[2:]
+        QComboBox, _, QLineEdit = self.widgets[:3]
+        edit = next(e for e in self.panel().findChildren(QLineEdit) if not isinstance(e.parent(), QComboBox))
+        label = self.result_label()
+        edit.clear()
+        label.clear()
+        start = time.perf_counter()  # clearing is set-up, not part of the interaction
+        QTest.keyClicks(edit, text or f"{self.rng.uniform(1, 1000):.3f}")
+        QTest.keyClick(edit, Qt.Key.Key_Return)
+        self.wait_for_result(label)
+        return start
+
+    def do_swap(self, _):
+        label = self.result_label()
+        label.clear()
+        self.click(self.button("Swap"))
+        self.wait_for_result(label)
+
+    def do_refresh(self, _):
+        # New rates on the server each time, so the refresh has to show them
+        self.server.bump()
+        label = self.result_label()
+        label.clear()
+        self.click(self.button("Refresh Rates"))
+        self.wait_for_result(label)
+
+    def do_subjects(self, count):
+        # A random count, then the full pool so every pass ends alike
+        spin = self.panel().findChild(self.widgets[4])
+        if count is None:
+            count = self.rng.randint(1, 30)
+            if count == spin.value():
+                count = count % 30 + 1
+        spin.setValue(count)
+        self.wait_for(lambda: len(self.grade_inputs()) == count)
+
+    def grade_inputs(self):
+        QLineEdit = self.widgets[2]
+        # Only the shown rows; hidden ones stay pooled in the panel
+        panel = self.panel()
+        return [e for e in panel.findChildren(QLineEdit)
+                if e.placeholderText().startswith("Grade") and e.isVisibleTo(panel)]
+
+    def do_calc(self, _):
+        for edit in self.grade_inputs():
+            edit.setText(f"{self.rng.uniform(0, 4):.2f}")
+        label = self.result_label()
+        label.clear()
+        self.click(self.button("Calculate CGPA"))
+        self.wait_for_result(label)
+
+    def session(self):
+        for action, arg in SESSION:
+            start = time.perf_counter()
+            # Actions that need set-up first return their own start time
+            start = getattr(self, f"do_{action}")(arg) or start
+            self.latencies.setdefault(action, []).append(time.perf_counter() - start)
+
+
+# Allocation sites left out of the heap numbers: the harness's own bookkeeping
+# and the rate stub, which serves from threads in this same process
+HEAP_EXCLUDE = (__file__, tracemalloc.__file__, "*/fake_rates_server.py",
+                "*/http/server.py", "*/socketserver.py", "*/email/*")
+
+
+def heap_snapshot():
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, p) for p in HEAP_EXCLUDE])
+
+
+def sample(app, heap):
+    # (widgets, live Python objects, heap snapshot) after a full collection
+    gc.collect()
+    return len(app.allWidgets()), len(gc.get_objects()), heap_snapshot() if heap else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=500, help="Session passes (default %(default)s)")
+    parser.add_argument("--warmup", type=int, default=20, help="Passes before growth is measured")
+    parser.add_argument("--sample-every", type=int, default=50, help="Passes between memory samples")
+    parser.add_argument("--panel-cache", type=int, default=2, help="Panels kept per tab (default %(default)s)")
+    parser.add_argument("--live", action="store_true", help="Convert as you type (debounced)")
+    parser.add_argument("--performance", action="store_true", help="Cached shadows and per-class styles")
+    parser.add_argument("--no-heap", action="store_true", help="Skip tracemalloc (lower latency overhead)")
+    parser.add_argument("--top", type=int, default=5, help="Heap growth sites to list")
+    parser.add_argument("--latency", type=float, default=0.005, help="Rate server latency in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Also write results to this file")
+    parser.add_argument("--max-widget-growth", type=int, help="Fail if widgets grow by more than this")
+    parser.add_argument("--max-heap-growth", type=float, help="Fail if the heap grows by more than this (KiB)")
+    parser.add_argument("--max-p99-ms", type=float, help="Fail if any action's p99 latency exceeds this")
+    args = parser.parse_args(argv)
+    args.warmup = min(args.warmup, max(0, args.iterations - 1))
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    os.environ["AK_CONVERTER_CACHE_DIR"] = tempfile.mkdtemp(prefix="ak-replay-")
+    import importlib.util
+    from PyQt6.QtWidgets import QApplication
+
+    spec = importlib.util.spec_from_file_location("ak_converter", os.path.join(ROOT, "ak-converter.py"))
+    app_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(app_module)
+    app = QApplication.instance() or QApplication([])
+
+    heap = not args.no_heap
+    with FakeRatesServer(latency=args.latency, seed=args.seed) as server:
+        if heap:
+            tracemalloc.start()
+        window = app_module.MainWindow(panel_cache_size=args.panel_cache, live_convert=args.live,
+                                       performance_rendering=args.performance, auto_performance=False)
+        window.rate_fetcher.provider = RateProvider(server.url)
+        window.show()
+        replay = Replay(app, window, server, random.Random(args.seed))
+        replay.settle()
+
+        samples = []  # (pass, widgets, live objects, heap bytes)
+        snapshots = {}  # pass -> heap snapshot, for the warm-up and last pass
+
+        def record(i):
+            widgets, objects, snapshot = sample(app, heap)
+            size = None
+            if snapshot is not None:
+                size = sum(stat.size for stat in snapshot.statistics("filename"))
+                if i in (args.warmup, args.iterations):
+                    snapshots[i] = snapshot
+            samples.append((i, widgets, objects, size))
+
+        record(0)
+        started = time.perf_counter()
+        for i in range(1, args.iterations + 1):
+            replay.session()
+            if i == args.warmup or i % args.sample_every == 0 or i == args.iterations:
+                record(i)
+        elapsed = time.perf_counter() - started
+        sites = []
+        if len(snapshots) == 2:
+            grown = snapshots[args.iterations].compare_to(snapshots[args.warmup], "lineno")
+            sites = [(str(s.traceback), s.size_diff, s.count_diff) for s in grown[:args.top] if s.size_diff > 0]
+        rendering = window.rendering_mode()
+        frames = window.frame_monitor.stats().get(rendering)
+        window.close()
+        window.deleteLater()
+        replay.settle()
+        if heap:
+            tracemalloc.stop()
+
+    base = next(s for s in samples if s[0] == args.warmup)
+    last = samples[-1]
+    passes = max(1, last[0] - base[0])
+    actions = {}
+    for action, values in replay.latencies.items():
+        actions[action] = {
+            "count": len(values),
+            "p50_ms": percentile(values, 50) * 1000,
+            "p99_ms": percentile(values, 99) * 1000,
+            "max_ms": max(values) * 1000,
+            "mean_ms": statistics.fmean(values) * 1000,
+        }
+    results = {
+        "iterations": args.iterations,
+        "interactions": sum(a["count"] for a in actions.values()),
+        "seconds": elapsed,
+        "panel_cache": args.panel_cache,
+        "live": args.live,
+        "rendering": rendering,
+        "frames": frames,
+        "actions": actions,
+        "samples": [{"iteration": i, "widgets": w, "objects": o, "heap_bytes": h} for i, w, o, h in samples],
+        "widget_growth": last[1] - base[1],
+        "object_growth": last[2] - base[2],
+        "heap_growth_bytes": None if last[3] is None else last[3] - base[3],
+        "heap_growth_sites": [{"site": s, "bytes": b, "blocks": c} for s, b, c in sites],
+    }
+
+    print(f"{results['interactions']} interactions in {args.iterations} passes ({elapsed:.1f} s)")
+    for action, a in actions.items():
+        print(f"  {action:<9} n={a['count']:<6} p50 {a['p50_ms']:8.3f} ms   p99 {a['p99_ms']:8.3f} ms"
+              f"   max {a['max_ms']:8.3f} ms")
+    if frames:
+        print(f"  frames    n={frames['frames']:<6} p50 {frames['p50_ms']:8.3f} ms   p95 {frames['p95_ms']:8.3f} ms"
+              f"   max {frames['max_ms']:8.3f} ms  ({rendering} rendering)")
+    print(f"  widgets   {base[1]} after warm-up -> {last[1]}  ({results['widget_growth']:+d})")
+    print(f"  objects   {base[2]} -> {last[2]}  ({results['object_growth']:+d},"
+          f" {results['object_growth'] * 1000 / passes:+.1f} per 1000 passes)")
+    if heap:
+        growth = results["heap_growth_bytes"]
+        print(f"  heap      {base[3] / 1024:.0f} KiB -> {last[3] / 1024:.0f} KiB  ({growth / 1024:+.1f} KiB,"
+              f" {growth / 1024 * 1000 / passes:+.1f} KiB per 1000 passes)")
+        for site, size, count in sites:
+            print(f"    {size / 1024:+8.1f} KiB {count:+6d} blocks  {site}")
+
+    failures = []
+    if args.max_widget_growth is not None and results["widget_growth"] > args.max_widget_growth:
+        failures.append(f"widgets grew by {results['widget_growth']} (allowed {args.max_widget_growth})")
+    if args.max_heap_growth is not None and heap and results["heap_growth_bytes"] > args.max_heap_growth * 1024:
+        failures.append(f"heap grew by {results['heap_growth_bytes'] / 1024:.1f} KiB"
+                        f" (allowed {args.max_heap_growth:g} KiB)")
+    if args.max_p99_ms is not None:
+        failures += [f"{action} p99 {a['p99_ms']:.1f} ms (allowed {args.max_p99_ms:g} ms)"
+                     for action, a in actions.items() if a["p99_ms"] > args.max_p99_ms]
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    results["failures"] = failures
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,310 @@
+"""Microbenchmarks for the conversion hot paths, with regression checks.
+
+    scalar/<category>   one value through the GUI path (the factor matrix at
+                        the combo indexes, or the cached transform for
+                        Temperature / Fuel Efficiency)
+    convert_temp        engine.convert_temp, by unit names
+    convert_fuel        engine.convert_fuel, by unit names
+    currency/convert    CrossRates.convert on cached rates (no network)
+    currency/matrix     building the cross-rate matrix for one rate payload
+    bulk/<op>/<n>       convert_array over n values; past one raw block the
+                        values are streamed block by block, as bulk.py does
+
+Every result is the best of --repeat runs, in nanoseconds per value, and each
+run repeats the benchmark until it has taken at least --min-time seconds, so
+microsecond-scale cases aren't timed at the resolution of the clock and the
+scheduler. Each run is paired with a run of a fixed pure-Python reference
+loop. Regressions are judged on the cost relative to that loop, so a machine
+that is slower overall for a while (other load, frequency scaling) doesn't
+fail the check. With a baseline file the suite exits with status 1 when any
+benchmark is slower than its baseline by more than the threshold (25% by
+default). A benchmark over it is timed again (--rechecks times) and only
+reported if it stays over. Baselines are machine specific: record one on the
+machine that runs the check.
+
+    python benchmarks/bench_suite.py --save-baseline        # writes benchmarks/baseline.json
+    python benchmarks/bench_suite.py --json bench.json      # fails on regressions
+    python benchmarks/bench_suite.py --filter bulk --sizes 1e3,1e6
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import engine  # noqa: E402
+from bulk import RAW_BLOCK_ITEMS  # noqa: E402
+from engine import FUEL_UNITS, TEMPERATURE_UNITS, convert_fuel, convert_temp, get_engine  # noqa: E402
+from rates import CURRENCIES, REFERENCE_BASE, CrossRates  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baseline.json")
+DEFAULT_SIZES = "1e3,1e6,1e8"
+THRESHOLD = 0.25
+REPEAT = 7
+# Shortest timed run, in seconds
+MIN_RUN_SECONDS = 0.2
+# Extra timings of a benchmark over its threshold before it counts as a regression
+RECHECKS = 2
+# Dominated by per-call overhead, which varies more between runs: more slack
+THRESHOLDS = {"bulk/scale/1000": 1.0, "bulk/affine/1000": 1.0, "bulk/reciprocal/1000": 1.0}
+
+BULK_OPS = (
+    ("scale", "Length", "Foot", "Meter"),
+    ("affine", "Temperature", "Fahrenheit", "Celsius"),
+    ("reciprocal", "Fuel Efficiency", "MPG (US)", "L/100km"),
+)
+
+
+def calibrate(fn, min_seconds):
+    # Calls of fn() that make a run last at least min_seconds
+    start = time.perf_counter()
+    fn()
+    once = time.perf_counter() - start
+    return max(1, math.ceil(min_seconds / once)) if once > 0 else 1000
+
+
+def run_once(fn, ops, loops):
+    start = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return (time.perf_counter() - start) * 1e9 / (ops * loops)
+
+
+def timed(fn, ops, repeat, min_seconds=MIN_RUN_SECONDS, reference=None):
+    # (best, median, reference best) nanoseconds per op over `repeat` runs of
+    # at least min_seconds each; with a reference (fn, ops), each run is
+    # paired with a reference run so both see the same machine state
+    loops = calibrate(fn, min_seconds)
+    if reference is not None:
+        ref_fn, ref_ops = reference
+        ref_loops = calibrate(ref_fn, min_seconds)
+    runs, ref_runs = [], []
+    for _ in range(repeat):
+        if reference is not None:
+            ref_runs.append(run_once(ref_fn, ref_ops, ref_loops))
+        runs.append(run_once(fn, ops, loops))
+    return min(runs), statistics.median(runs), min(ref_runs) if ref_runs else None
+
+
+def reference_case(count, seed):
+    # Fixed work that never changes with the code under test: a float multiply
+    # per list item, the same shape as the scalar cases
+    rng = random.Random(seed)
+    values = [rng.uniform(1, 1000) for _ in range(count)]
+
+    def run():
+        for v in values:
+            v * 1.5
+    return run, count
+
+
+def scalar_cases(count, seed):
+    # name -> (fn, ops); each fn converts `count` values with random unit pairs
+    eng = get_engine()
+    rng = random.Random(seed)
+    values = [rng.uniform(1, 1000) for _ in range(count)]
+    cases = {}
+    for name in eng.category_names:
+        cat = eng.category(name)
+        # Listed units: the GUI indexes the matrix with the combo rows
+        work = [(v, rng.randrange(len(cat)), rng.randrange(len(cat))) for v in values]
+
+        def run(matrix=cat.matrix, work=work):
+            for v, i, j in work:
+                v * matrix[i][j]
+        cases[f"scalar/{name}"] = (run, count)
+    for name, units in (("Temperature", TEMPERATURE_UNITS), ("Fuel Efficiency", FUEL_UNITS)):
+        work = [(v, rng.choice(units), rng.choice(units)) for v in values]
+
+        def run(name=name, work=work):
+            for v, f, t in work:
+                eng.transform(name, f, t).scalar(v)
+        cases[f"scalar/{name}"] = (run, count)
+
+    temps = [(v, rng.choice(TEMPERATURE_UNITS), rng.choice(TEMPERATURE_UNITS)) for v in values]
+    fuels = [(v, rng.choice(FUEL_UNITS), rng.choice(FUEL_UNITS)) for v in values]
+
+    def run_temp():
+        for v, f, t in temps:
+            convert_temp(v, f, t)
+
+    def run_fuel():
+        for v, f, t in fuels:
+            convert_fuel(v, f, t)
+    cases["convert_temp"] = (run_temp, count)
+    cases["convert_fuel"] = (run_fuel, count)
+    return cases
+
+
+def currency_cases(count, seed):
+    rng = random.Random(seed)
+    rates = {code: rng.uniform(0.01, 5000) for code in CURRENCIES}
+    cross = CrossRates(REFERENCE_BASE, rates)
+    work = [(rng.uniform(1, 10000), rng.choice(CURRENCIES), rng.choice(CURRENCIES)) for _ in range(count)]
+
+    def run_convert():
+        for amount, f, t in work:
+            cross.convert(amount, f, t)
+
+    def run_matrix():
+        CrossRates(REFERENCE_BASE, rates)
+    # The matrix build is timed per payload, reported per currency pair
+    return {"currency/convert": (run_convert, count),
+            "currency/matrix": (run_matrix, len(CURRENCIES) ** 2)}
+
+
+def bulk_cases(sizes, seed):
+    eng = get_engine()
+    cases = {}
+    for size in sizes:
+        block = min(size, RAW_BLOCK_ITEMS)
+        if engine.NUMPY_AVAILABLE:
+            np = engine.load_numpy()
+            rng = np.random.default_rng(seed)
+            src = rng.uniform(1, 1000, block)
+            dst = np.empty_like(src)
+        else:
+            from array import array
+            rng = random.Random(seed)
+            src = array("d", (rng.uniform(1, 1000) for _ in range(block)))
+            dst = array("d", bytes(8 * block))
+        for op, category, f, t in BULK_OPS:
+            def run(category=category, f=f, t=t, size=size, block=block, src=src, dst=dst):
+                # One block reused until `size` values are done: bounded memory at 1e8
+                done = 0
+                while done < size:
+                    n = min(block, size - done)
+                    eng.convert_array(category, src[:n], f, t, out=dst[:n])
+                    done += n
+            cases[f"bulk/{op}/{size}"] = (run, size)
+    return cases
+
+
+def parse_sizes(text):
+    return [int(float(s)) for s in text.split(",") if s.strip()]
+
+
+def compare(results, baseline, threshold):
+    # [(name, baseline ns, current ns, slowdown, allowed ratio)] for every
+    # regression. The slowdown is measured relative to the reference loop;
+    # baselines from before it was recorded hold plain ns.
+    regressions = []
+    for r in results:
+        base = baseline.get(r["name"])
+        if base is None:
+            continue
+        if isinstance(base, dict):
+            base_ns = base["ns"]
+            ratio = r["relative"] / base["relative"]
+        else:
+            base_ns = base
+            ratio = r["best_ns"] / base
+        allowed = 1 + THRESHOLDS.get(r["name"], threshold)
+        r["baseline_ns"] = base_ns
+        r["vs_baseline"] = ratio
+        if ratio > allowed:
+            regressions.append((r["name"], base_ns, r["best_ns"], ratio, allowed))
+    return regressions
+
+
+def measure(name, fn, ops, args, reference):
+    best, median, ref = timed(fn, ops, repeats(args.repeat, ops), args.min_time, reference)
+    return {"name": name, "ops": ops, "best_ns": best, "median_ns": median, "per_second": 1e9 / best,
+            "reference_ns": ref, "relative": best / ref}
+
+
+def repeats(repeat, ops):
+    # Big bulk runs are long enough to time steadily with fewer repeats
+    return max(1, repeat // 2) if ops >= 10 ** 8 else repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20_000, help="Values per scalar run")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Bulk sizes (default %(default)s)")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--min-time", type=float, default=MIN_RUN_SECONDS,
+                        help="Shortest timed run in seconds (default %(default)s)")
+    parser.add_argument("--rechecks", type=int, default=RECHECKS,
+                        help="Timings of a benchmark over its threshold before reporting it (default %(default)s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--filter", default="", help="Only benchmarks whose name contains this")
+    parser.add_argument("--json", help="Also write results to this file")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="Allowed slowdown before failing (default %(default)s = 25%%)")
+    args = parser.parse_args(argv)
+
+    sizes = parse_sizes(args.sizes)
+    if not engine.NUMPY_AVAILABLE and args.sizes == DEFAULT_SIZES:
+        # The pure-Python fallback would take minutes at 1e8
+        sizes = [s for s in sizes if s <= RAW_BLOCK_ITEMS]
+    cases = {}
+    cases.update(scalar_cases(args.count, args.seed))
+    cases.update(currency_cases(args.count, args.seed))
+    cases.update(bulk_cases(sizes, args.seed))
+
+    reference = reference_case(args.count, args.seed)
+    results = []
+    for name, (fn, ops) in cases.items():
+        if args.filter not in name:
+            continue
+        fn()  # warm caches (transforms, prefixed ratios, matrices)
+        r = measure(name, fn, ops, args, reference)
+        results.append(r)
+        print(f"{name:>32}: {r['best_ns']:>9.2f} ns/value  ({r['per_second']:>14,.0f}/s)", flush=True)
+
+    regressions = []
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({r["name"]: {"ns": r["best_ns"], "relative": r["relative"]} for r in results},
+                      f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for _ in range(args.rechecks):
+            if not regressions:
+                break
+            # A one-off slow timing (another process, frequency scaling) is
+            # not a regression: keep the best of the timings so far
+            flagged = {name for name, *_ in regressions}
+            for r in results:
+                if r["name"] in flagged:
+                    again = measure(r["name"], *cases[r["name"]], args, reference)
+                    if again["relative"] < r["relative"]:
+                        r.update(again)
+            regressions = compare(results, baseline, args.threshold)
+        for name, base, current, ratio, allowed in regressions:
+            print(f"REGRESSION {name}: {current:.2f} ns vs baseline {base:.2f} ns"
+                  f" ({ratio:.2f}x relative to the reference loop, allowed {allowed:.2f}x)", file=sys.stderr)
+        if not regressions:
+            print(f"No regressions against {args.baseline}")
+    else:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+
+    if args.json:
+        report = {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "numpy": engine.NUMPY_AVAILABLE,
+            "results": results,
+            "regressions": [{"name": n, "baseline_ns": b, "best_ns": c, "slowdown": x, "allowed": a}
+                            for n, b, c, x, a in regressions],
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
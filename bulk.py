@@ -0,0 +1,466 @@
+"""Streaming bulk conversion of CSV / JSONL files (command-line mode).
+
+Rows are read, converted and written one at a time through a generator
+pipeline, so memory stays flat regardless of the input size. With --jobs
+the file is split into line-aligned byte ranges that are converted in
+parallel worker processes and reassembled in order.
+
+    python bulk.py telemetry.csv -o out.csv -c Length -f Mile -t Kilometer --columns distance
+    python bulk.py telemetry.csv -o out.csv -c Length -f Mile -t Kilometer --columns distance --jobs 0
+
+Raw little-endian float64/float32 column files are memory-mapped and
+converted block by block, in place or into a second mapped file.
+
+    python bulk.py probe.f64 --format f64 --in-place -c Temperature -f Kelvin -t Celsius
+"""
+import argparse
+import csv
+import json
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import engine
+from engine import get_engine
+
+# Everything a worker needs to convert rows; small and picklable.
+# exact: Decimal arithmetic on the values as written instead of floats
+ConversionSpec = namedtuple("ConversionSpec", "category from_unit to_unit columns suffix exact", defaults=(False,))
+
+# Sent to a worker process: where to read, where to write, nothing else
+ChunkTask = namedtuple("ChunkTask", "index input_path start end spec fmt fieldnames out_path err_path")
+ChunkResult = namedtuple("ChunkResult", "index lines rows errors seconds pid")
+
+FORMATS = ("csv", "jsonl")
+
+# Raw binary column formats: (NumPy dtype, struct/memoryview code, item size)
+RAW_FORMATS = {"f64": ("<f8", "d", 8), "f32": ("<f4", "f", 4)}
+
+# Values converted per step when walking a mapped file
+RAW_BLOCK_ITEMS = 1 << 20
+
+# Smallest byte range worth shipping to a worker
+MIN_CHUNK_BYTES = 1 << 20
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in RAW_FORMATS:
+        return ext
+    return "jsonl" if ext in ("jsonl", "ndjson") else "csv"
+
+
+# Readers yield (line_no, row) and hand parse failures to `on_error`
+def read_csv_rows(reader, on_error):
+    for row in reader:
+        if None in row:
+            on_error(reader.line_num, None, None, "Too many fields")
+            continue
+        yield reader.line_num, row
+
+
+def read_jsonl_rows(f, on_error, first_line=1):
+    for line_no, line in enumerate(f, first_line):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            on_error(line_no, None, line.rstrip("\n"), f"Invalid JSON: {e}")
+            continue
+        if not isinstance(row, dict):
+            on_error(line_no, None, line.rstrip("\n"), "Expected a JSON object")
+            continue
+        yield line_no, row
+
+
+def convert_rows(rows, spec, on_error):
+    if spec.exact:
+        convert = get_engine().exact_converter(spec.category, spec.from_unit, spec.to_unit)
+        parse = _exact_input
+    else:
+        convert = get_engine().converter(spec.category, spec.from_unit, spec.to_unit)
+        parse = float
+    columns = spec.columns
+    suffix = spec.suffix
+    for line_no, row in rows:
+        try:
+            for col in columns:
+                value = row[col]
+                # CSV gives text, JSONL may already hold numbers
+                result = convert(parse(value))
+                row[col + suffix if suffix else col] = result
+        except KeyError:
+            on_error(line_no, col, None, "Missing column")
+            continue
+        except (TypeError, ValueError, ArithmeticError) as e:
+            on_error(line_no, col, value, f"Invalid value: {e}")
+            continue
+        yield line_no, row
+
+
+def _exact_input(value):
+    # CSV text is used as written; JSON numbers arrive as int/float
+    if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        return value
+    raise TypeError(f"not a number: {value!r}")
+
+
+def write_csv_rows(rows, f, fieldnames, header=True):
+    writer = csv.DictWriter(f, fieldnames=fieldnames, lineterminator="\n")
+    if header:
+        writer.writeheader()
+    count = 0
+    for _, row in rows:
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def write_jsonl_rows(rows, f):
+    count = 0
+    for _, row in rows:
+        # Exact results (Decimal) are written as strings to keep every digit
+        f.write(json.dumps(row, default=str))
+        f.write("\n")
+        count += 1
+    return count
+
+
+class ErrorLog:
+    # Collects per-row failures as JSON lines in a side file (or nowhere)
+    def __init__(self, f=None):
+        self.f = f
+        self.count = 0
+
+    def __call__(self, line_no, column, value, message):
+        self.count += 1
+        if self.f is not None:
+            self.f.write(json.dumps({"line": line_no, "column": column, "value": value, "error": message}))
+            self.f.write("\n")
+
+
+def output_fieldnames(fieldnames, spec):
+    if not spec.suffix:
+        return fieldnames
+    return fieldnames + [c + spec.suffix for c in spec.columns if c + spec.suffix not in fieldnames]
+
+
+def convert_stream(src, dst, spec, fmt, on_error):
+    # Wire reader -> converter -> writer; returns the number of rows written
+    if fmt == "csv":
+        reader = csv.DictReader(src)
+        if reader.fieldnames is None:
+            return 0
+        rows = read_csv_rows(reader, on_error)
+        return write_csv_rows(convert_rows(rows, spec, on_error), dst, output_fieldnames(reader.fieldnames, spec))
+    rows = read_jsonl_rows(src, on_error)
+    return write_jsonl_rows(convert_rows(rows, spec, on_error), dst)
+
+
+def convert_file(input_path, output_path, spec, fmt=None, errors_path=None):
+    fmt = fmt or detect_format(input_path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt!r}")
+    errors_file = open(errors_path, "w", encoding="utf-8") if errors_path else None
+    try:
+        on_error = ErrorLog(errors_file)
+        with open(input_path, newline="", encoding="utf-8") as src, \
+                open(output_path, "w", newline="", encoding="utf-8") as dst:
+            written = convert_stream(src, dst, spec, fmt, on_error)
+    finally:
+        if errors_file:
+            errors_file.close()
+    return written, on_error.count
+
+
+class RangeLines:
+    # Decoded lines of f[start:end]; `end` must sit on a line boundary
+    def __init__(self, f, start, end):
+        self.f = f
+        self.start = start
+        self.end = end
+        self.count = 0
+
+    def __iter__(self):
+        f = self.f
+        f.seek(self.start)
+        pos = self.start
+        while pos < self.end:
+            line = f.readline()
+            if not line:
+                break
+            pos += len(line)
+            self.count += 1
+            yield line.decode("utf-8")
+
+
+def split_chunks(path, start, count):
+    # Split [start, EOF) into at most `count` byte ranges ending on newlines
+    size = os.path.getsize(path)
+    step = max((size - start) // max(count, 1), 1)
+    bounds = [start]
+    with open(path, "rb") as f:
+        for i in range(1, count):
+            pos = start + i * step
+            if pos >= size:
+                break
+            # Back up one byte so a range that already starts a line is kept
+            f.seek(pos - 1)
+            f.readline()
+            pos = f.tell()
+            if pos >= size:
+                break
+            if pos > bounds[-1]:
+                bounds.append(pos)
+    if size > start:
+        bounds.append(size)
+    return list(zip(bounds, bounds[1:]))
+
+
+def convert_chunk(task):
+    # Worker entry point: convert one byte range into its own part files
+    began = time.perf_counter()
+    with open(task.input_path, "rb") as src, \
+            open(task.out_path, "w", newline="", encoding="utf-8") as dst, \
+            open(task.err_path, "w", encoding="utf-8") as err:
+        on_error = ErrorLog(err)
+        lines = RangeLines(src, task.start, task.end)
+        if task.fmt == "csv":
+            rows = read_csv_rows(csv.DictReader(lines, fieldnames=task.fieldnames), on_error)
+            written = write_csv_rows(convert_rows(rows, task.spec, on_error), dst,
+                                     output_fieldnames(task.fieldnames, task.spec), header=False)
+        else:
+            rows = read_jsonl_rows(lines, on_error)
+            written = write_jsonl_rows(convert_rows(rows, task.spec, on_error), dst)
+    return ChunkResult(task.index, lines.count, written, on_error.count,
+                       time.perf_counter() - began, os.getpid())
+
+
+def read_csv_header(path):
+    # Header fields (None for an empty file, as with csv.DictReader) and the
+    # byte offset where data rows begin
+    with open(path, "rb") as f:
+        line = f.readline()
+        if not line:
+            return None, 0
+        return next(csv.reader([line.decode("utf-8")]), None), f.tell()
+
+
+def convert_file_parallel(input_path, output_path, spec, fmt=None, errors_path=None, jobs=None):
+    fmt = fmt or detect_format(input_path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt!r}")
+    jobs = jobs or os.cpu_count() or 1
+    fieldnames, data_start = read_csv_header(input_path) if fmt == "csv" else (None, 0)
+    header_lines = 1 if fmt == "csv" else 0
+
+    size = os.path.getsize(input_path)
+    if size == data_start:
+        # No rows: write what convert_file would (the header, or nothing for
+        # an empty file) without starting a pool
+        with open(output_path, "w", newline="", encoding="utf-8") as dst:
+            if fieldnames is not None:
+                csv.writer(dst, lineterminator="\n").writerow(output_fieldnames(fieldnames, spec))
+        if errors_path:
+            open(errors_path, "w", encoding="utf-8").close()
+        return 0, 0, {}
+    count = max(1, min(jobs * 4, (size - data_start) // MIN_CHUNK_BYTES))
+    chunks = split_chunks(input_path, data_start, count)
+
+    work_dir = tempfile.mkdtemp(prefix=".bulk-", dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        tasks = [
+            ChunkTask(i, input_path, start, end, spec, fmt, fieldnames,
+                      os.path.join(work_dir, f"{i}.out"), os.path.join(work_dir, f"{i}.err"))
+            for i, (start, end) in enumerate(chunks)
+        ]
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks) or 1)) as pool:
+            results = list(pool.map(convert_chunk, tasks))
+
+        # Reassemble in input order
+        with open(output_path, "w", newline="", encoding="utf-8") as dst:
+            if fmt == "csv" and fieldnames is not None:
+                csv.writer(dst, lineterminator="\n").writerow(output_fieldnames(fieldnames, spec))
+            for task in tasks:
+                with open(task.out_path, encoding="utf-8", newline="") as part:
+                    shutil.copyfileobj(part, dst)
+        if errors_path:
+            merge_error_parts(tasks, results, errors_path, header_lines)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    written = sum(r.rows for r in results)
+    errors = sum(r.errors for r in results)
+    return written, errors, worker_stats(results)
+
+
+def merge_error_parts(tasks, results, errors_path, header_lines):
+    # Workers number lines within their chunk; shift them back to file lines
+    base = header_lines
+    with open(errors_path, "w", encoding="utf-8") as out:
+        for task, result in zip(tasks, results):
+            with open(task.err_path, encoding="utf-8") as part:
+                for line in part:
+                    entry = json.loads(line)
+                    entry["line"] += base
+                    out.write(json.dumps(entry))
+                    out.write("\n")
+            base += result.lines
+
+
+def worker_stats(results):
+    # {pid: (rows, seconds, rows_per_second)}
+    totals = {}
+    for r in results:
+        rows, seconds = totals.get(r.pid, (0, 0.0))
+        totals[r.pid] = (rows + r.rows, seconds + r.seconds)
+    return {pid: (rows, seconds, rows / seconds if seconds else 0.0)
+            for pid, (rows, seconds) in sorted(totals.items())}
+
+
+def _raw_view(buf, fmt):
+    dtype, code, _ = RAW_FORMATS[fmt]
+    if engine.NUMPY_AVAILABLE:
+        return engine.load_numpy().frombuffer(buf, dtype=dtype)
+    if sys.byteorder != "little":
+        raise RuntimeError("Raw conversion on big-endian hosts requires NumPy")
+    return memoryview(buf).cast(code)
+
+
+def convert_raw_file(input_path, output_path, category, from_unit, to_unit, fmt="f64",
+                     block_items=RAW_BLOCK_ITEMS):
+    # Memory-map a raw column file and convert it block by block; with no
+    # output path the input is rewritten in place. Returns the value count.
+    itemsize = RAW_FORMATS[fmt][2]
+    size = os.path.getsize(input_path)
+    if size % itemsize:
+        raise ValueError(f"{input_path}: size {size} is not a multiple of {itemsize} bytes")
+    eng = get_engine()
+    eng.converter(category, from_unit, to_unit)
+    if size == 0:
+        if output_path:
+            open(output_path, "wb").close()
+        return 0
+
+    in_place = not output_path or os.path.abspath(output_path) == os.path.abspath(input_path)
+    src_file = open(input_path, "r+b" if in_place else "rb")
+    dst_file = None
+    src_map = dst_map = None
+    try:
+        src_map = mmap.mmap(src_file.fileno(), 0, access=mmap.ACCESS_WRITE if in_place else mmap.ACCESS_READ)
+        if in_place:
+            dst_map = src_map
+        else:
+            dst_file = open(output_path, "w+b")
+            dst_file.truncate(size)
+            dst_map = mmap.mmap(dst_file.fileno(), size, access=mmap.ACCESS_WRITE)
+        count = size // itemsize
+        src = dst = None
+        try:
+            src = _raw_view(src_map, fmt)
+            dst = _raw_view(dst_map, fmt)
+            for i in range(0, count, block_items):
+                j = min(i + block_items, count)
+                eng.convert_array(category, src[i:j], from_unit, to_unit, out=dst[i:j])
+        except BaseException as e:
+            # The failed calls' frames still hold slices of the views
+            traceback.clear_frames(e.__traceback__)
+            raise
+        finally:
+            # Views must be released before the maps can close, or closing
+            # raises BufferError in place of the real error
+            src = dst = None
+        dst_map.flush()
+        return count
+    finally:
+        if dst_map is not None and dst_map is not src_map:
+            dst_map.close()
+        if src_map is not None:
+            src_map.close()
+        if dst_file:
+            dst_file.close()
+        src_file.close()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Convert columns of a CSV, JSONL or raw float file between units.")
+    parser.add_argument("input", help="Input CSV, JSONL or raw float64/float32 file")
+    parser.add_argument("-o", "--output", help="Output file")
+    parser.add_argument("-c", "--category", required=True, help="Converter category, e.g. Length, Temperature")
+    parser.add_argument("-f", "--from", dest="from_unit", required=True, help="Source unit")
+    parser.add_argument("-t", "--to", dest="to_unit", required=True, help="Target unit")
+    parser.add_argument("--columns", help="Comma-separated columns to convert (CSV/JSONL)")
+    parser.add_argument("--suffix", default="", help="Write results to <column><suffix> instead of overwriting")
+    parser.add_argument("--format", choices=FORMATS + tuple(RAW_FORMATS),
+                        help="Input/output format (default: from file extension)")
+    parser.add_argument("--in-place", action="store_true", help="Rewrite a raw float file in place")
+    parser.add_argument("--errors", help="Side file for per-row errors (JSON lines)")
+    parser.add_argument("--exact", action="store_true",
+                        help="Decimal arithmetic on values as written (CSV/JSONL; slower than the float default)")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="Worker processes (0 = one per CPU). Parallel mode needs one record per line")
+    return parser
+
+
+def spec_from_args(args):
+    columns = tuple(c.strip() for c in (args.columns or "").split(",") if c.strip())
+    if not columns:
+        raise ValueError("No columns given")
+    spec = ConversionSpec(args.category, args.from_unit, args.to_unit, columns, args.suffix, args.exact)
+    # Fail fast on bad category/unit names before touching the input
+    get_engine().converter(spec.category, spec.from_unit, spec.to_unit)
+    return spec
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    args.format = args.format or detect_format(args.input)
+    if args.format in RAW_FORMATS:
+        return main_raw(parser, args)
+    if args.output is None:
+        parser.error("the following arguments are required: -o/--output")
+    try:
+        spec = spec_from_args(args)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.jobs == 1:
+        written, errors = convert_file(args.input, args.output, spec, args.format, args.errors)
+    else:
+        began = time.perf_counter()
+        written, errors, stats = convert_file_parallel(args.input, args.output, spec, args.format,
+                                                       args.errors, jobs=args.jobs or None)
+        elapsed = time.perf_counter() - began
+        for pid, (rows, seconds, rate) in stats.items():
+            print(f"worker {pid}: {rows} rows in {seconds:.2f}s ({rate:,.0f} rows/s)", file=sys.stderr)
+        print(f"total: {written / elapsed if elapsed else 0:,.0f} rows/s over {len(stats)} workers", file=sys.stderr)
+    print(f"Converted {written} rows ({errors} errors)", file=sys.stderr)
+    return 1 if errors and not written else 0
+
+
+def main_raw(parser, args):
+    if not args.output and not args.in_place:
+        parser.error("raw formats need -o/--output or --in-place")
+    if args.exact:
+        parser.error("--exact applies to CSV/JSONL; raw formats are binary floats")
+    began = time.perf_counter()
+    try:
+        count = convert_raw_file(args.input, None if args.in_place else args.output,
+                                 args.category, args.from_unit, args.to_unit, args.format)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - began
+    mb = count * RAW_FORMATS[args.format][2] / 1e6
+    print(f"Converted {count} values ({mb / elapsed if elapsed else 0:,.0f} MB/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
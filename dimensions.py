@@ -0,0 +1,286 @@
+"""Dimensional analysis for compound units, independent of the GUI.
+
+Every unit is a (factor, dimension vector) pair: the factor to SI base units
+and integer exponents over (L, M, T, I, Θ, N, J, D, rad). Atoms come from the
+engine's unit tables, each category being a dimension (Force is M·L·T⁻²,
+Data Rate is D·T⁻¹, ...), so a compound expression like `kg·m/s²` or
+`kWh/100km` is canonicalized by multiplying atoms and adding exponents.
+
+    >>> get_unit_system().convert(1, "kg·m/s²", "lbf")
+    0.2248089430997105
+
+Plane angle counts as a dimension of its own, so angular and cycle
+frequencies don't mix silently (1 rad/s is 1/2π Hz, not 1 Hz):
+
+    >>> get_unit_system().convert(1, "rad/s", "Hz")
+    Traceback (most recent call last):
+    ...
+    dimensions.DimensionError: Incompatible units: rad/s is T⁻¹·rad, Hz is T⁻¹
+
+Canonical forms and pair ratios are memoized, so a repeated compound
+conversion is one cache lookup and one multiply.
+
+    python dimensions.py "kWh/100km" "Wh/mile"
+"""
+import re
+import sys
+from collections import OrderedDict
+
+from engine import get_engine
+from expressions import UnitResolver
+
+# Order of the exponents in a dimension vector; D is information (bytes) and
+# rad plane angle, which SI treats as dimensionless but which is kept apart
+# here so rad/s never converts to Hz
+BASE_DIMENSIONS = ("L", "M", "T", "I", "Θ", "N", "J", "D", "rad")
+DIMENSIONLESS = (0,) * len(BASE_DIMENSIONS)
+
+
+def _dims(**exponents):
+    return tuple(exponents.get(name, 0) for name in ("L", "M", "T", "I", "Th", "N", "J", "D", "rad"))
+
+
+# Category -> (SI factor of the category's base unit, dimension)
+CATEGORY_DIMENSIONS = {
+    "Length": (1, _dims(L=1)),
+    "Mass": (1, _dims(M=1)),
+    "Time": (1, _dims(T=1)),
+    "Area": (1, _dims(L=2)),
+    "Volume": (1, _dims(L=3)),
+    "Speed": (1, _dims(L=1, T=-1)),
+    "Energy": (1, _dims(M=1, L=2, T=-2)),
+    "Power": (1, _dims(M=1, L=2, T=-3)),
+    "Pressure": (1, _dims(M=1, L=-1, T=-2)),
+    "Angle": (1, _dims(rad=1)),
+    "Density": (1, _dims(M=1, L=-3)),
+    "Storage": (1, _dims(D=1)),
+    "Data Rate": (1 / 8, _dims(D=1, T=-1)),  # base is bit/s
+    "Frequency": (1, _dims(T=-1)),
+    "Force": (1, _dims(M=1, L=1, T=-2)),
+    "Torque": (1, _dims(M=1, L=2, T=-2)),
+    "Viscosity": (1, _dims(M=1, L=-1, T=-1)),
+    "Illuminance": (1, _dims(L=-2, J=1)),  # lux = cd·sr/m²
+}
+
+# SI base units that have no table of their own
+BASE_ATOMS = {
+    "A": (1, _dims(I=1)), "ampere": (1, _dims(I=1)),
+    "K": (1, _dims(Th=1)), "kelvin": (1, _dims(Th=1)),
+    "mol": (1, _dims(N=1)), "cd": (1, _dims(J=1)),
+}
+
+# Canonical forms / pair ratios kept (least recently used are dropped)
+CANONICAL_CACHE_SIZE = 1024
+
+_SUPERSCRIPTS = str.maketrans("⁰¹²³⁴⁵⁶⁷⁸⁹⁻⁺", "0123456789-+")
+_TOKEN_RE = re.compile(
+    r"\s*(?:"
+    r"(?P<pow>(?:\^|\*\*)\s*[-+]?\d+|[⁻⁺]?[⁰¹²³⁴⁵⁶⁷⁸⁹]+)"
+    r"|(?P<op>[*·⋅/()])"
+    r"|(?P<num>\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)"
+    r"|(?P<atom>[^\s*·⋅/()^⁰¹²³⁴⁵⁶⁷⁸⁹⁻⁺\d][^\s*·⋅/()^⁰¹²³⁴⁵⁶⁷⁸⁹⁻⁺]*"
+    r"(?:\s+[^\s*·⋅/()^⁰¹²³⁴⁵⁶⁷⁸⁹⁻⁺\d][^\s*·⋅/()^⁰¹²³⁴⁵⁶⁷⁸⁹⁻⁺]*)*)"
+    r")"
+)
+
+
+class DimensionError(ValueError):
+    pass
+
+
+def dimension_name(vector):
+    # (1, 1, -2, 0, ...) -> "L·M·T⁻²"; "dimensionless" for all zeros
+    parts = []
+    for name, exp in zip(BASE_DIMENSIONS, vector):
+        if exp == 1:
+            parts.append(name)
+        elif exp:
+            parts.append(name + str(exp).translate(str.maketrans("0123456789-", "⁰¹²³⁴⁵⁶⁷⁸⁹⁻")))
+    return "·".join(parts) or "dimensionless"
+
+
+def _combine(a, b, sign=1):
+    return (a[0] * b[0] ** sign, tuple(x + sign * y for x, y in zip(a[1], b[1])))
+
+
+def _power(a, exp):
+    return (a[0] ** exp, tuple(x * exp for x in a[1]))
+
+
+class UnitSystem:
+    def __init__(self, engine=None, cache_size=CANONICAL_CACHE_SIZE):
+        self.engine = engine or get_engine()
+        self.resolver = UnitResolver(self.engine)
+        self.cache_size = cache_size
+        self._canonical = OrderedDict()  # text -> (factor, dims)
+        self._ratios = OrderedDict()     # (from, to) -> factor
+        self.hits = 0
+        self.misses = 0
+
+    def atom(self, text):
+        # (factor, dims) for one unit name, or None
+        if text in BASE_ATOMS:
+            return BASE_ATOMS[text]
+        found = self.resolver.resolve(text)
+        if found is None:
+            return BASE_ATOMS.get(text.lower())
+        category, unit = found
+        if category == "Temperature":
+            if unit == "Kelvin":
+                return BASE_ATOMS["K"]
+            raise DimensionError(f"{unit} is an offset scale; use K in compound units")
+        if category not in CATEGORY_DIMENSIONS:
+            raise DimensionError(f"{unit} ({category}) can't be used in compound units")
+        base_factor, vector = CATEGORY_DIMENSIONS[category]
+        return (self.engine.category(category).unit_factor(unit) * base_factor, vector)
+
+    def canonical(self, text):
+        # (factor to SI, dimension vector) for a unit expression
+        key = " ".join(text.split())
+        found = self._canonical.get(key)
+        if found is not None:
+            self._canonical.move_to_end(key)
+            return found
+        found = self.atom(key) or _Parser(self, key).parse()
+        self._canonical[key] = found
+        if len(self._canonical) > self.cache_size:
+            self._canonical.popitem(last=False)
+        return found
+
+    def factor(self, from_text, to_text):
+        key = (from_text, to_text)
+        ratio = self._ratios.get(key)
+        if ratio is not None:
+            self.hits += 1
+            self._ratios.move_to_end(key)
+            return ratio
+        self.misses += 1
+        f_factor, f_dims = self.canonical(from_text)
+        t_factor, t_dims = self.canonical(to_text)
+        if f_dims != t_dims:
+            raise DimensionError(f"Incompatible units: {from_text} is {dimension_name(f_dims)},"
+                                 f" {to_text} is {dimension_name(t_dims)}")
+        ratio = self._ratios[key] = f_factor / t_factor
+        if len(self._ratios) > self.cache_size:
+            self._ratios.popitem(last=False)
+        return ratio
+
+    def convert(self, value, from_text, to_text):
+        return value * self.factor(from_text, to_text)
+
+    def compatible(self, from_text, to_text):
+        try:
+            return self.canonical(from_text)[1] == self.canonical(to_text)[1]
+        except DimensionError:
+            return False
+
+    def cache_stats(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "canonical": len(self._canonical), "ratios": len(self._ratios)}
+
+
+class _Parser:
+    # expr    := product (("*" | "·" | "/") product)*
+    # product := power power*            (juxtaposition binds tighter than /)
+    # power   := primary ("^n" | "**n" | superscript)?
+    # primary := "(" expr ")" | number | unit name
+    def __init__(self, system, text):
+        self.system = system
+        self.text = text
+        self.tokens = []
+        pos = 0
+        text = text.rstrip()
+        while pos < len(text):
+            match = _TOKEN_RE.match(text, pos)
+            if match is None or match.end() == pos:
+                raise DimensionError(f"Can't parse unit {self.text!r} at {text[pos:]!r}")
+            kind = match.lastgroup
+            self.tokens.append((kind, match.group(kind)))
+            pos = match.end()
+        self.i = 0
+
+    def peek(self):
+        return self.tokens[self.i] if self.i < len(self.tokens) else (None, None)
+
+    def take(self):
+        token = self.peek()
+        self.i += 1
+        return token
+
+    def parse(self):
+        result = self.expr()
+        if self.i != len(self.tokens):
+            raise DimensionError(f"Unexpected {self.peek()[1]!r} in unit {self.text!r}")
+        return result
+
+    def expr(self):
+        result = self.product()
+        while self.peek() in (("op", "*"), ("op", "·"), ("op", "⋅"), ("op", "/")):
+            _, op = self.take()
+            result = _combine(result, self.product(), -1 if op == "/" else 1)
+        return result
+
+    def product(self):
+        result = self.power()
+        while self.peek()[0] in ("num", "atom") or self.peek() == ("op", "("):
+            result = _combine(result, self.power())
+        return result
+
+    def power(self):
+        result = self.primary()
+        if self.peek()[0] == "pow":
+            exp = self.take()[1].translate(_SUPERSCRIPTS).lstrip("^*").strip()
+            result = _power(result, int(exp))
+        return result
+
+    def primary(self):
+        kind, text = self.take()
+        if kind == "op" and text == "(":
+            result = self.expr()
+            if self.take() != ("op", ")"):
+                raise DimensionError(f"Missing ')' in unit {self.text!r}")
+            return result
+        if kind == "num":
+            return (float(text), DIMENSIONLESS)
+        if kind == "atom":
+            found = self.system.atom(text)
+            if found is not None:
+                return found
+            words = text.split()
+            if len(words) > 1:
+                # "kg m s^-2": separate units, an exponent binds to the last one
+                self.i -= 1
+                self.tokens[self.i:self.i + 1] = [("atom", word) for word in words]
+                return self.primary()
+            raise DimensionError(f"Unknown unit: {text!r}")
+        raise DimensionError(f"Expected a unit in {self.text!r}")
+
+
+_system = None
+
+
+def get_unit_system():
+    # Process-wide shared unit system (one set of caches)
+    global _system
+    if _system is None:
+        _system = UnitSystem()
+    return _system
+
+
+def convert_compound(value, from_text, to_text):
+    return get_unit_system().convert(value, from_text, to_text)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (3, 4):
+        print('usage: python dimensions.py [value] "<from unit>" "<to unit>"', file=sys.stderr)
+        sys.exit(2)
+    value = float(sys.argv[1]) if len(sys.argv) == 4 else 1.0
+    from_text, to_text = sys.argv[-2:]
+    system = get_unit_system()
+    try:
+        result = system.convert(value, from_text, to_text)
+    except DimensionError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    print(f"{value:g} {from_text} = {result:.10g} {to_text}  [{dimension_name(system.canonical(to_text)[1])}]")
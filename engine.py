@@ -0,0 +1,626 @@
+"""Headless conversion engine shared by the GUI and the command-line tools."""
+import math
+from array import array
+from decimal import Decimal, InvalidOperation
+import importlib.util
+from fractions import Fraction
+
+# NumPy is optional; without it the batch API falls back to a plain loop. It
+# is only imported by the first array conversion (the GUI never makes one);
+# at import time we just check that it is installed.
+np = None
+NUMPY_AVAILABLE = importlib.util.find_spec("numpy") is not None
+
+
+def load_numpy():
+    global np
+    if np is None:
+        import numpy
+        np = numpy
+    return np
+
+# Units dictionaries (factors relative to base unit named in comment)
+
+# base: meter
+LENGTH_UNITS = {"Meter": 1, "Centimeter": 0.01, "Millimeter": 0.001, "Kilometer": 1000,
+                "Inch": 0.0254, "Foot": 0.3048, "Yard": 0.9144, "Mile": 1609.344, "Nautical Mile": 1852}
+
+# base: kilogram
+MASS_UNITS = {"Milligram": 1e-6, "Gram": 0.001, "Kilogram": 1, "Tonne": 1000,
+              "Ounce": 0.028349523125, "Pound": 0.45359237}
+
+# base: cubic meter
+VOLUME_UNITS = {"Cubic Meter": 1, "Liter": 0.001, "Milliliter": 1e-6,
+                "Gallon (US)": 0.003785411784, "Quart (US)": 0.000946352946,
+                "Pint (US)": 0.000473176473, "Cup (US)": 0.0002365882365}
+
+# base: square meter
+AREA_UNITS = {"Square Meter": 1, "Square Centimeter": 1e-4, "Square Kilometer": 1e6,
+              "Square Inch": 0.00064516, "Square Foot": 0.09290304, "Acre": 4046.8564224, "Hectare": 10000}
+
+# base: m/s
+SPEED_UNITS = {"m/s": 1, "km/h": 1/3.6, "mph": 0.44704, "knot": 0.514444}
+
+# base: joule
+ENERGY_UNITS = {"Joule": 1, "Kilojoule": 1000, "Calorie": 4.184, "Kilocalorie": 4184,
+                "Watt-hour": 3600, "Kilowatt-hour": 3.6e6, "Electronvolt": 1.602176634e-19}
+
+# base: watt
+POWER_UNITS = {"Watt": 1, "Kilowatt": 1000, "Megawatt": 1_000_000, "Horsepower (metric)": 735.49875, "Horsepower (US)": 745.699872}
+
+# base: pascal
+PRESSURE_UNITS = {"Pascal": 1, "Kilopascal": 1000, "Bar": 1e5, "Atmosphere": 101325, "PSI": 6894.757293168, "Torr": 133.322368}
+
+# base: radian
+ANGLE_UNITS = {"Radian": 1, "Degree": math.pi/180, "Gradian": math.pi/200}
+
+# base: kg/m^3
+DENSITY_UNITS = {"kg/m³": 1, "g/cm³": 1000, "lb/ft³": 16.01846337}
+
+# base: byte (SI prefixes are powers of 1000, IEC ones powers of 1024)
+STORAGE_UNITS = {"Bit": 1/8, "Byte": 1, "Kilobyte (kB)": 1000, "Megabyte (MB)": 1000**2, "Gigabyte (GB)": 1000**3,
+                 "Terabyte (TB)": 1000**4, "Kibibyte (KiB)": 1024, "Mebibyte (MiB)": 1024**2,
+                 "Gibibyte (GiB)": 1024**3, "Tebibyte (TiB)": 1024**4}
+
+# base: bps
+DATA_RATE_UNITS = {"bps": 1, "kbps": 1_000, "Mbps": 1_000_000, "Gbps": 1_000_000_000,
+                   "KiB/s": 8*1024, "MiB/s": 8*1024**2, "GiB/s": 8*1024**3}
+
+# base: second
+TIME_UNITS = {"Second": 1, "Millisecond": 0.001, "Minute": 60, "Hour": 3600, "Day": 86400, "Week": 604800,
+              "Year (365d)": 31536000}
+
+# base: hertz
+FREQUENCY_UNITS = {"Hertz": 1, "Kilohertz": 1_000, "Megahertz": 1_000_000, "Gigahertz": 1_000_000_000}
+
+# base: newton
+FORCE_UNITS = {"Newton": 1, "Kilonewton": 1000, "Pound-force": 4.4482216152605, "Dyne": 1e-5}
+
+# base: N·m
+TORQUE_UNITS = {"Newton-meter": 1, "Foot-pound": 1.3558179483314004, "Inch-pound": 0.1129848290276167}
+
+# base: Pa·s
+VISCOSITY_UNITS = {"Pascal-second": 1, "Poise": 0.1, "Centipoise": 0.001}
+
+# base: lux
+ILLUMINANCE_UNITS = {"Lux": 1, "Foot-candle": 10.76391041671}
+
+# Old unit names that are still accepted (not listed in the selectors):
+# category -> { old name: current name }
+UNIT_ALIASES = {
+    "Data Rate": {"Kbps": "kbps"},
+}
+
+# Category name (as shown in the converter selectors) -> factor table
+UNIT_TABLES = {
+    "Length": LENGTH_UNITS,
+    "Mass": MASS_UNITS,
+    "Volume": VOLUME_UNITS,
+    "Area": AREA_UNITS,
+    "Speed": SPEED_UNITS,
+    "Energy": ENERGY_UNITS,
+    "Power": POWER_UNITS,
+    "Pressure": PRESSURE_UNITS,
+    "Angle": ANGLE_UNITS,
+    "Density": DENSITY_UNITS,
+    "Storage": STORAGE_UNITS,
+    "Data Rate": DATA_RATE_UNITS,
+    "Time": TIME_UNITS,
+    "Frequency": FREQUENCY_UNITS,
+    "Force": FORCE_UNITS,
+    "Torque": TORQUE_UNITS,
+    "Viscosity": VISCOSITY_UNITS,
+    "Illuminance": ILLUMINANCE_UNITS,
+}
+
+# Non-multiplicative categories: each unit is an exact transform to the
+# base unit, ("affine", a, b) for a * value + b or ("reciprocal", k, 0) for
+# k / value. Unit pairs are composed from these (see Transform).
+
+# base: kelvin
+TEMPERATURE_SCALES = {
+    "Celsius": ("affine", Fraction(1), Fraction("273.15")),
+    "Fahrenheit": ("affine", Fraction(5, 9), Fraction("459.67") * Fraction(5, 9)),
+    "Kelvin": ("affine", Fraction(1), Fraction(0)),
+    "Rankine": ("affine", Fraction(5, 9), Fraction(0)),
+    "Réaumur": ("affine", Fraction(5, 4), Fraction("273.15")),
+}
+TEMPERATURE_UNITS = tuple(TEMPERATURE_SCALES)
+
+# base: km/L
+_KM_PER_MILE = Fraction("1.609344")
+FUEL_SCALES = {
+    "MPG (US)": ("affine", _KM_PER_MILE / Fraction("3.785411784"), Fraction(0)),
+    "L/100km": ("reciprocal", Fraction(100), Fraction(0)),
+    "MPG (UK)": ("affine", _KM_PER_MILE / Fraction("4.54609"), Fraction(0)),
+    "km/L": ("affine", Fraction(1), Fraction(0)),
+}
+FUEL_UNITS = tuple(FUEL_SCALES)
+
+TRANSFORM_TABLES = {"Temperature": TEMPERATURE_SCALES, "Fuel Efficiency": FUEL_SCALES}
+
+# Prefixed units that are not listed above ("kPa", "Millisecond", "GiB",
+# "quettameter") are resolved from their base unit on first lookup, so the
+# tables and combo boxes keep only the common ones.
+# (name, symbol, exponent of 10)
+SI_PREFIXES = (
+    ("quecto", "q", -30), ("ronto", "r", -27), ("yocto", "y", -24), ("zepto", "z", -21),
+    ("atto", "a", -18), ("femto", "f", -15), ("pico", "p", -12), ("nano", "n", -9),
+    ("micro", "µ", -6), ("milli", "m", -3), ("centi", "c", -2), ("deci", "d", -1),
+    ("deca", "da", 1), ("hecto", "h", 2), ("kilo", "k", 3), ("mega", "M", 6),
+    ("giga", "G", 9), ("tera", "T", 12), ("peta", "P", 15), ("exa", "E", 18),
+    ("zetta", "Z", 21), ("yotta", "Y", 24), ("ronna", "R", 27), ("quetta", "Q", 30),
+)
+# (name, symbol, exponent of 1024)
+IEC_PREFIXES = (
+    ("kibi", "Ki", 1), ("mebi", "Mi", 2), ("gibi", "Gi", 3), ("tebi", "Ti", 4), ("pebi", "Pi", 5),
+    ("exbi", "Ei", 6), ("zebi", "Zi", 7), ("yobi", "Yi", 8), ("robi", "Ri", 9), ("quebi", "Qi", 10),
+)
+
+# Category -> ((long name or None, symbols, exact factor in the category's
+# base, IEC prefixes allowed), ...)
+PREFIXABLE_UNITS = {
+    "Length": (("Meter", ("m",), Fraction(1), False), ("Metre", (), Fraction(1), False)),
+    "Mass": (("Gram", ("g",), Fraction(1, 1000), False),),
+    "Volume": (("Liter", ("L", "l"), Fraction(1, 1000), False), ("Litre", (), Fraction(1, 1000), False)),
+    "Energy": (("Joule", ("J",), Fraction(1), False), ("Watt-hour", ("Wh",), Fraction(3600), False),
+               ("Electronvolt", ("eV",), Fraction("1.602176634e-19"), False)),
+    "Power": (("Watt", ("W",), Fraction(1), False),),
+    "Pressure": (("Pascal", ("Pa",), Fraction(1), False), ("Bar", ("bar",), Fraction(100000), False)),
+    "Angle": (("Radian", ("rad",), Fraction(1), False),),
+    "Storage": (("Byte", ("B",), Fraction(1), True), ("Bit", ("bit", "b"), Fraction(1, 8), True)),
+    "Data Rate": ((None, ("bps", "bit/s", "b/s"), Fraction(1), True), (None, ("B/s",), Fraction(8), True)),
+    "Time": (("Second", ("s",), Fraction(1), False),),
+    "Frequency": (("Hertz", ("Hz",), Fraction(1), False),),
+    "Force": (("Newton", ("N",), Fraction(1), False),),
+    "Torque": (("Newton-meter", ("N·m", "Nm"), Fraction(1), False),),
+    "Viscosity": (("Pascal-second", ("Pa·s",), Fraction(1), False),),
+    "Illuminance": (("Lux", ("lx",), Fraction(1), False),),
+}
+
+_SI_SYMBOLS = {symbol: Fraction(10) ** exp for _, symbol, exp in SI_PREFIXES}
+_SI_SYMBOLS["μ"] = _SI_SYMBOLS["u"] = _SI_SYMBOLS["µ"]  # Greek mu, ASCII u
+_SI_NAMES = {name: Fraction(10) ** exp for name, _, exp in SI_PREFIXES}
+_SI_NAMES["deka"] = _SI_NAMES["deca"]
+_IEC_SYMBOLS = {symbol: Fraction(1024) ** exp for _, symbol, exp in IEC_PREFIXES}
+_IEC_NAMES = {name: Fraction(1024) ** exp for name, _, exp in IEC_PREFIXES}
+
+
+def _prefix(prefix, si, iec):
+    if not prefix:
+        return 1
+    return si.get(prefix) or (iec and iec.get(prefix))
+
+
+def prefixed_factor(category, unit):
+    # Exact factor of a prefixed unit ("kPa", "kilopascals", "GiB"), or None.
+    # Symbols are case-sensitive (mW is not MW), names are not.
+    for name, symbols, factor, binary in PREFIXABLE_UNITS.get(category, ()):
+        for symbol in symbols:
+            if unit.endswith(symbol):
+                prefix = unit[:-len(symbol)]
+                multiplier = _prefix(prefix, _SI_SYMBOLS, binary and _IEC_SYMBOLS)
+                if multiplier:
+                    return factor * multiplier
+        if name is not None:
+            lower = unit.lower()
+            base = name.lower()
+            for form in (lower, lower[:-1] if lower.endswith("s") else None):
+                if form and form.endswith(base):
+                    prefix = form[:-len(base)]
+                    multiplier = _prefix(prefix, _SI_NAMES, binary and _IEC_NAMES)
+                    if multiplier:
+                        return factor * multiplier
+    return None
+
+
+# Exact mode. Factors are taken from the shortest repr of each table entry
+# (0.0254 -> 254/10000), except where the table holds a rounded quotient;
+# those are restated here from their definitions.
+# pi to 50 digits; it cancels between Degree and Gradian
+PI = Fraction("3.14159265358979323846264338327950288419716939937510")
+_INCH = Fraction("0.0254")
+_FOOT = Fraction("0.3048")
+_LBF = Fraction("4.4482216152605")
+EXACT_FACTORS = {
+    ("Speed", "km/h"): Fraction(1000, 3600),
+    ("Speed", "knot"): Fraction(1852, 3600),
+    ("Angle", "Degree"): PI / 180,
+    ("Angle", "Gradian"): PI / 200,
+    ("Pressure", "PSI"): _LBF / _INCH ** 2,
+    ("Pressure", "Torr"): Fraction(101325, 760),
+    ("Density", "lb/ft³"): Fraction("0.45359237") / _FOOT ** 3,
+    ("Illuminance", "Foot-candle"): 1 / _FOOT ** 2,
+}
+
+
+def as_fraction(value):
+    # Floats go through their shortest repr, so 0.1 means 1/10
+    if isinstance(value, float):
+        return Fraction(repr(value))
+    if isinstance(value, str):
+        return Fraction(value.strip())
+    return Fraction(value)
+
+
+def as_decimal(value):
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, Fraction):
+        return Decimal(value.numerator) / Decimal(value.denominator)
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    try:
+        return Decimal(value.strip() if isinstance(value, str) else value)
+    except InvalidOperation:
+        raise ValueError(f"Invalid number: {value!r}") from None
+
+
+def convert_temp(value, from_u, to_u):
+    return get_engine().transform("Temperature", from_u, to_u)(value)
+
+
+def convert_fuel(v, fu, tu):
+    return get_engine().transform("Fuel Efficiency", fu, tu)(v)
+
+
+class Transform:
+    # One compiled from -> to conversion. Coefficients are kept exact so
+    # transforms compose and serve exact mode; the float form is fixed once:
+    #   affine      a * x + b   (a plain scale when b == 0)
+    #   reciprocal  a / x       (x == 0 gives inf)
+    # Calling it converts a float, or a whole array / buffer in one pass.
+    __slots__ = ("kind", "a", "b", "scalar", "_array")
+
+    def __init__(self, kind, a, b=0):
+        self.kind = kind
+        self.a = Fraction(a)
+        self.b = Fraction(b)
+        if kind == "reciprocal":
+            k = float(self.a)
+            self.scalar = lambda v: k / v if v != 0 else float("inf")
+            self._array = lambda values, out: _reciprocal_array(values, k, out)
+        elif self.b == 0:
+            factor = float(self.a)
+            self.scalar = float if factor == 1.0 else (lambda v: v * factor)
+            self._array = lambda values, out: _scale_array(values, factor, out)
+        else:
+            # x * scale + post (C -> F is x * 1.8 + 32), or (x + pre) * scale
+            # when only pre is a short decimal (F -> C is (x - 32) * 5/9)
+            scale = float(self.a)
+            pre = self.b / self.a
+            if as_fraction(float(self.b)) != self.b and as_fraction(float(pre)) == pre:
+                pre = float(pre)
+                self.scalar = lambda v: (v + pre) * scale
+                self._array = lambda values, out: _affine_array(values, pre, scale, 0.0, out)
+            else:
+                post = float(self.b)
+                self.scalar = lambda v: v * scale + post
+                self._array = lambda values, out: _affine_array(values, 0.0, scale, post, out)
+
+    def __call__(self, value, out=None):
+        if out is None and isinstance(value, (float, int)):
+            return self.scalar(value)
+        return self._array(value, out)
+
+    def array(self, values, out=None):
+        return self._array(values, out)
+
+    def exact(self, value):
+        value = as_fraction(value)
+        if self.kind == "reciprocal":
+            if value == 0:
+                raise ZeroDivisionError("Zero has no reciprocal")
+            return self.a / value
+        return self.a * value + self.b
+
+    def inverse(self):
+        if self.kind == "reciprocal":
+            return self
+        return Transform("affine", 1 / self.a, -self.b / self.a)
+
+    def then(self, other):
+        # self first, then other
+        if self.kind == "affine" and other.kind == "affine":
+            return Transform("affine", self.a * other.a, other.a * self.b + other.b)
+        if self.kind == "reciprocal" and other.kind == "reciprocal":
+            return Transform("affine", other.a / self.a)
+        if self.kind == "affine" and self.b == 0:
+            return Transform("reciprocal", other.a / self.a)
+        if other.kind == "affine" and other.b == 0:
+            return Transform("reciprocal", self.a * other.a)
+        raise ValueError("An offset and a reciprocal don't compose into one transform")
+
+
+class Category:
+    # One multiplicative category with an immutable from x to factor matrix.
+    # Units are addressed by integer id (their position in `names`), which is
+    # also the row order of the GUI combo boxes. Old names of renamed units
+    # (UNIT_ALIASES) map to the same id.
+    # Exact (Fraction / Decimal) ratios are only derived when first asked for,
+    # once per unit pair. Prefixed units that are not listed are looked up by
+    # name; their factors and pair ratios are cached in `_prefixed`.
+    __slots__ = ("name", "names", "ids", "factors", "matrix", "_exact", "_exact_pairs", "_decimal_pairs",
+                 "_prefixed")
+
+    def __init__(self, name, units, aliases=None):
+        self.name = name
+        self.names = tuple(units)
+        self.ids = {n: i for i, n in enumerate(self.names)}
+        for old, new in (aliases or {}).items():
+            self.ids.setdefault(old, self.ids[new])
+        self.factors = tuple(float(f) for f in units.values())
+        self.matrix = tuple(tuple(f / t for t in self.factors) for f in self.factors)
+        self._exact = None
+        self._exact_pairs = {}
+        self._decimal_pairs = {}
+        self._prefixed = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def unit_id(self, unit):
+        try:
+            return self.ids[unit]
+        except KeyError:
+            raise ValueError(f"Unknown {self.name} unit: {unit!r}") from None
+
+    def factor(self, from_id, to_id):
+        return self.matrix[from_id][to_id]
+
+    def _resolve(self, unit):
+        # (float, Fraction) factors of an unlisted, prefixed unit
+        found = self._prefixed.get(unit)
+        if found is None:
+            exact = prefixed_factor(self.name, unit)
+            if exact is None:
+                raise ValueError(f"Unknown {self.name} unit: {unit!r}")
+            found = self._prefixed[unit] = (float(exact), exact)
+        return found
+
+    def unit_factor(self, unit):
+        # Factor to the base unit for any listed or prefixed unit name
+        i = self.ids.get(unit)
+        return self.factors[i] if i is not None else self._resolve(unit)[0]
+
+    def exact_unit_factor(self, unit):
+        i = self.ids.get(unit)
+        if i is not None:
+            return self._exact_factors()[i]
+        return self._resolve(unit)[1]
+
+    def has_unit(self, unit):
+        try:
+            self.unit_factor(unit)
+        except ValueError:
+            return False
+        return True
+
+    def ratio(self, from_unit, to_unit):
+        # Factor between two unit names; the matrix when both are listed
+        i = self.ids.get(from_unit)
+        j = self.ids.get(to_unit)
+        if i is not None and j is not None:
+            return self.matrix[i][j]
+        ratio = self._prefixed.get((from_unit, to_unit))
+        if ratio is None:
+            # Rounded once from the exact ratio, so µs -> ns is exactly 1000
+            ratio = self._prefixed[(from_unit, to_unit)] = float(self.exact_ratio(from_unit, to_unit))
+        return ratio
+
+    def exact_ratio(self, from_unit, to_unit):
+        i = self.ids.get(from_unit)
+        j = self.ids.get(to_unit)
+        if i is not None and j is not None:
+            return self.exact_factor(i, j)
+        return self.exact_unit_factor(from_unit) / self.exact_unit_factor(to_unit)
+
+    def _exact_factors(self):
+        if self._exact is None:
+            self._exact = tuple(EXACT_FACTORS.get((self.name, n)) or as_fraction(f)
+                                for n, f in zip(self.names, self.factors))
+        return self._exact
+
+    def convert(self, value, from_id, to_id):
+        return value * self.matrix[from_id][to_id]
+
+    def exact_factor(self, from_id, to_id):
+        factor = self._exact_pairs.get((from_id, to_id))
+        if factor is None:
+            exact = self._exact_factors()
+            factor = self._exact_pairs[(from_id, to_id)] = exact[from_id] / exact[to_id]
+        return factor
+
+    def decimal_factor(self, from_id, to_id):
+        # (numerator, denominator) as Decimals: multiply, then divide once
+        pair = self._decimal_pairs.get((from_id, to_id))
+        if pair is None:
+            factor = self.exact_factor(from_id, to_id)
+            pair = self._decimal_pairs[(from_id, to_id)] = (Decimal(factor.numerator), Decimal(factor.denominator))
+        return pair
+
+    def convert_exact(self, value, from_id, to_id):
+        return as_fraction(value) * self.exact_factor(from_id, to_id)
+
+    def convert_decimal(self, value, from_id, to_id):
+        num, den = self.decimal_factor(from_id, to_id)
+        return as_decimal(value) * num / den
+
+
+class ConversionEngine:
+    def __init__(self, tables=UNIT_TABLES):
+        self._tables = tables
+        self._categories = {}
+        self._transforms = {}  # (category, from, to) -> Transform
+
+    @property
+    def category_names(self):
+        return tuple(self._tables)
+
+    def has_category(self, name):
+        return name in self._tables
+
+    def category(self, name):
+        # Built on first use, then reused for the lifetime of the engine
+        cat = self._categories.get(name)
+        if cat is None:
+            try:
+                units = self._tables[name]
+            except KeyError:
+                raise ValueError(f"Unknown category: {name!r}") from None
+            cat = self._categories[name] = Category(name, units, UNIT_ALIASES.get(name))
+        return cat
+
+    def unit_names(self, name):
+        return self.category(name).names
+
+    def factor(self, name, from_unit, to_unit):
+        # Listed units come from the matrix; prefixed ones ("kPa") are resolved
+        return self.category(name).ratio(from_unit, to_unit)
+
+    def transform(self, name, from_unit, to_unit):
+        # Compiled Transform for a Temperature / Fuel Efficiency unit pair,
+        # composed through the base unit once and then reused
+        key = (name, from_unit, to_unit)
+        found = self._transforms.get(key)
+        if found is None:
+            try:
+                table = TRANSFORM_TABLES[name]
+            except KeyError:
+                raise ValueError(f"{name} has no transform table; use factor()") from None
+            to_base = Transform(*table[_check_unit(name, table, from_unit)])
+            from_base = Transform(*table[_check_unit(name, table, to_unit)]).inverse()
+            found = self._transforms[key] = to_base.then(from_base)
+        return found
+
+    def convert(self, name, value, from_unit, to_unit):
+        if name in TRANSFORM_TABLES:
+            return self.transform(name, from_unit, to_unit).scalar(value)
+        return value * self.factor(name, from_unit, to_unit)
+
+    def convert_exact(self, name, value, from_unit, to_unit):
+        # Fraction result; `value` may be a str, int, Decimal, Fraction or float
+        if name in TRANSFORM_TABLES:
+            return self.transform(name, from_unit, to_unit).exact(value)
+        return as_fraction(value) * self.category(name).exact_ratio(from_unit, to_unit)
+
+    def convert_decimal(self, name, value, from_unit, to_unit):
+        # Decimal result in the current decimal context; exact whenever the
+        # ratio terminates in base 10
+        if name in TRANSFORM_TABLES:
+            return as_decimal(self.convert_exact(name, value, from_unit, to_unit))
+        cat = self.category(name)
+        if from_unit in cat.ids and to_unit in cat.ids:
+            return cat.convert_decimal(value, cat.ids[from_unit], cat.ids[to_unit])
+        ratio = cat.exact_ratio(from_unit, to_unit)
+        return as_decimal(value) * Decimal(ratio.numerator) / Decimal(ratio.denominator)
+
+    def exact_converter(self, name, from_unit, to_unit):
+        # Decimal counterpart of converter(); the pair's ratio is resolved once
+        if name in TRANSFORM_TABLES:
+            exact = self.transform(name, from_unit, to_unit).exact
+            return lambda v: as_decimal(exact(v))
+        cat = self.category(name)
+        if from_unit in cat.ids and to_unit in cat.ids:
+            num, den = cat.decimal_factor(cat.ids[from_unit], cat.ids[to_unit])
+        else:
+            ratio = cat.exact_ratio(from_unit, to_unit)
+            num, den = Decimal(ratio.numerator), Decimal(ratio.denominator)
+        return lambda v: as_decimal(v) * num / den
+
+    def converter(self, name, from_unit, to_unit):
+        # Scalar callable for a fixed unit pair, resolved once up front
+        if name in TRANSFORM_TABLES:
+            return self.transform(name, from_unit, to_unit).scalar
+        factor = self.factor(name, from_unit, to_unit)
+        return lambda v: v * factor
+
+    def convert_array(self, name, values, from_unit, to_unit, out=None):
+        # Convert a whole array (or any buffer-protocol sequence) in one pass.
+        # `out` may be the input itself for an in-place conversion.
+        if name in TRANSFORM_TABLES:
+            return self.transform(name, from_unit, to_unit).array(values, out)
+        return _scale_array(values, self.factor(name, from_unit, to_unit), out)
+
+
+def _check_unit(category, units, unit):
+    if unit not in units:
+        raise ValueError(f"Unknown {category} unit: {unit!r}")
+    return unit
+
+
+def _as_float_array(values):
+    np = load_numpy()
+    arr = np.asarray(values)
+    if arr.dtype.kind != "f":
+        arr = arr.astype(np.float64)
+    return arr
+
+
+def _float_view(out):
+    # Typed buffers (array("d"), a float memoryview) as they are; untyped
+    # bytes (bytearray, mmap) as float64, which must fill them exactly
+    view = memoryview(out)
+    if view.format not in ("B", "b", "c"):
+        return view
+    if view.nbytes % 8:
+        raise ValueError(f"out buffer of {view.nbytes} bytes doesn't hold whole float64 values")
+    return view.cast("d")
+
+
+def _as_out(out):
+    # Wrap a writable buffer (array.array, memoryview, bytearray, mmap...)
+    # without copying
+    np = load_numpy()
+    if out is None or isinstance(out, np.ndarray):
+        return out
+    return np.asarray(_float_view(out))
+
+
+def _fill(values, out, fn):
+    # Pure-Python fallback used when NumPy is not installed
+    if out is None:
+        return array("d", map(fn, values))
+    target = out if isinstance(out, array) else _float_view(out)
+    for i, v in enumerate(values):
+        target[i] = fn(v)
+    return out
+
+
+def _scale_array(values, factor, out=None):
+    if not NUMPY_AVAILABLE:
+        return _fill(values, out, lambda v: v * factor)
+    np = load_numpy()
+    return np.multiply(_as_float_array(values), factor, out=_as_out(out))
+
+
+def _affine_array(values, pre, scale, post, out=None):
+    if not NUMPY_AVAILABLE:
+        return _fill(values, out, lambda v: (v + pre) * scale + post)
+    np = load_numpy()
+    res = np.add(_as_float_array(values), pre, out=_as_out(out))
+    np.multiply(res, scale, out=res)
+    return np.add(res, post, out=res)
+
+
+def _reciprocal_array(values, k, out=None):
+    if not NUMPY_AVAILABLE:
+        return _fill(values, out, lambda v: k / v if v != 0 else float("inf"))
+    np = load_numpy()
+    with np.errstate(divide="ignore"):
+        return np.divide(k, _as_float_array(values), out=_as_out(out))
+
+
+_engine = None
+
+
+def get_engine():
+    # Process-wide shared engine instance
+    global _engine
+    if _engine is None:
+        _engine = ConversionEngine()
+    return _engine
+
+
+def convert_array(category, values, from_unit, to_unit, out=None):
+    return get_engine().convert_array(category, values, from_unit, to_unit, out=out)
@@ -0,0 +1,324 @@
+"""Free-text conversion expressions, independent of the GUI.
+
+    >>> format_result(evaluate("5 ft 3 in to cm"))
+    '160.02 Centimeter'
+
+An expression is one or more "<number> <unit>" terms of the same category,
+a separator (to / in / into / as / -> / =) and a target unit. Parsing
+produces a plan keyed on the expression's shape, with the numbers lifted
+out ("# ft # in to cm"), so repeated and near-identical queries reuse the
+compiled plan from an LRU cache and only the arithmetic runs. Compound
+units ("9.81 kg·m/s² to lbf") fall back to dimensions.py, where angular and
+cycle frequencies stay apart:
+
+    >>> evaluate("1 rad/s to Hz")
+    Traceback (most recent call last):
+    ...
+    expressions.ExpressionError: Cannot convert T⁻¹·rad (rad/s) to T⁻¹ (Hz)
+
+    python expressions.py "72 F in K" "3.2 GiB/s to Gbps"
+"""
+import re
+import sys
+from collections import OrderedDict, namedtuple
+
+from engine import FUEL_UNITS, PREFIXABLE_UNITS, TEMPERATURE_UNITS, get_engine
+
+# Compiled plans kept (least recently used are dropped)
+PLAN_CACHE_SIZE = 256
+
+SEPARATORS = ("to", "in", "into", "as", "->", "=")
+
+# category: engine category; units: one per term; fn(numbers) -> value in to_unit
+Plan = namedtuple("Plan", "category units to_unit fn")
+Result = namedtuple("Result", "value unit category")
+
+# Symbols and spellings the unit names don't cover, per category
+EXTRA_SYMBOLS = {
+    "Temperature": {"c": "Celsius", "°c": "Celsius", "degc": "Celsius",
+                    "f": "Fahrenheit", "°f": "Fahrenheit", "degf": "Fahrenheit",
+                    "k": "Kelvin", "°r": "Rankine", "°ra": "Rankine", "°ré": "Réaumur", "°re": "Réaumur",
+                    "reaumur": "Réaumur"},
+    "Fuel Efficiency": {"mpg": "MPG (US)", "mpg us": "MPG (US)", "mpg uk": "MPG (UK)", "imperial mpg": "MPG (UK)",
+                        "l/100km": "L/100km", "kmpl": "km/L"},
+    "Length": {"m": "Meter", "cm": "Centimeter", "mm": "Millimeter", "km": "Kilometer", "in": "Inch",
+               "ft": "Foot", "feet": "Foot", "'": "Foot", '"': "Inch", "yd": "Yard", "mi": "Mile",
+               "nmi": "Nautical Mile", "metre": "Meter", "kilometre": "Kilometer"},
+    "Mass": {"mg": "Milligram", "g": "Gram", "kg": "Kilogram", "t": "Tonne", "oz": "Ounce",
+             "lb": "Pound", "lbs": "Pound"},
+    "Volume": {"m3": "Cubic Meter", "m³": "Cubic Meter", "l": "Liter", "litre": "Liter",
+               "ml": "Milliliter", "gal": "Gallon (US)", "qt": "Quart (US)", "pt": "Pint (US)"},
+    "Area": {"m2": "Square Meter", "m²": "Square Meter", "km2": "Square Kilometer", "km²": "Square Kilometer",
+             "ft2": "Square Foot", "ft²": "Square Foot", "sq ft": "Square Foot", "ha": "Hectare"},
+    "Energy": {"j": "Joule", "kj": "Kilojoule", "cal": "Calorie", "kcal": "Kilocalorie",
+               "wh": "Watt-hour", "kwh": "Kilowatt-hour", "ev": "Electronvolt"},
+    "Power": {"w": "Watt", "kw": "Kilowatt", "hp": "Horsepower (US)"},
+    "Pressure": {"pa": "Pascal", "atm": "Atmosphere"},
+    "Angle": {"rad": "Radian", "deg": "Degree", "°": "Degree"},
+    "Storage": {"bit": "Bit", "bits": "Bit"},
+    "Time": {"s": "Second", "sec": "Second", "min": "Minute", "h": "Hour", "hr": "Hour", "d": "Day",
+             "wk": "Week", "yr": "Year (365d)", "year": "Year (365d)", "years": "Year (365d)"},
+    "Frequency": {"hz": "Hertz", "khz": "Kilohertz", "mhz": "Megahertz", "ghz": "Gigahertz"},
+    "Force": {"n": "Newton", "kn": "Kilonewton", "lbf": "Pound-force"},
+    "Torque": {"nm": "Newton-meter", "n·m": "Newton-meter", "ft-lb": "Foot-pound", "in-lb": "Inch-pound"},
+    "Viscosity": {"pa·s": "Pascal-second", "p": "Poise", "cp": "Centipoise"},
+    "Illuminance": {"lx": "Lux", "fc": "Foot-candle"},
+}
+
+# A number that starts a term: at the start, after whitespace, or right after
+# a unit when another term follows without spaces (5ft3in, 5'3"). Digits
+# inside a unit name ("L/100km", "km2") are not matched.
+_TERM_NUMBER_RE = re.compile(
+    r"(?:(?<!\S)|(?<=[A-Za-z'\"])(?=\d[\d.]*[A-Za-z'\"]))[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?"
+)
+
+
+class ExpressionError(ValueError):
+    pass
+
+
+def _spellings(name):
+    # "Gallon (US)" -> gallon (us), gallon, us; plus simple plurals
+    lower = name.lower()
+    forms = {lower}
+    match = re.fullmatch(r"(.+?)\s*\((.+)\)", lower)
+    if match:
+        forms.add(match.group(1))
+        if name[name.index("(") + 1].isupper():
+            forms.add(match.group(2))
+    for form in list(forms):
+        if "foot" in form:
+            forms.add(form.replace("foot", "feet"))
+        if form.endswith(("ch", "sh", "x", "s")):
+            forms.add(form + "es")
+        elif form[-1:].isalpha():
+            forms.add(form + "s")
+    return forms
+
+
+class UnitResolver:
+    # Text -> (category, unit name) over every engine table, temperature and
+    # fuel units; exact case wins, then prefixed units the tables don't list
+    # ("kPa", "ms", "gibibytes"), whose symbols are case-sensitive (mHz is not
+    # MHz, Mb is not MB), and only then case-insensitive aliases ("kwh", "feet")
+    def __init__(self, engine=None):
+        engine = self.engine = engine or get_engine()
+        self._exact = {}
+        self._folded = {}
+        groups = [(name, engine.unit_names(name)) for name in engine.category_names]
+        groups += [("Temperature", TEMPERATURE_UNITS), ("Fuel Efficiency", FUEL_UNITS)]
+        for category, units in groups:
+            for unit in units:
+                self._exact.setdefault(unit, (category, unit))
+                for form in _spellings(unit):
+                    self._folded.setdefault(form, (category, unit))
+        for category, symbols in EXTRA_SYMBOLS.items():
+            for symbol, unit in symbols.items():
+                self._folded.setdefault(symbol, (category, unit))
+                # As written, a symbol names the listed unit ("cm" is
+                # Centimeter), unless it spells a prefixed unit of another
+                # quantity ("nm" is nanometres, not N·m)
+                if all(other == category or not engine.category(other).has_unit(symbol)
+                       for other in PREFIXABLE_UNITS):
+                    self._exact.setdefault(symbol, (category, unit))
+
+    def resolve(self, text):
+        text = " ".join(text.split())
+        found = self._exact.get(text) or self._prefixed(text)
+        if found is None:
+            found = self._folded.get(text.lower())
+            if found is None and text.lower().startswith("deg "):
+                found = self._folded.get(text.lower()[4:])
+            if found is not None:
+                # Not a prefixed unit; skip the prefix scan next time
+                self._exact[text] = found
+        return found
+
+    def _prefixed(self, text):
+        for category in PREFIXABLE_UNITS:
+            if self.engine.category(category).has_unit(text):
+                found = self._exact[text] = (category, text)
+                return found
+        return None
+
+
+def tokenize(expression):
+    # [("num", text) | ("word", text)]
+    expression = expression.replace("->", " -> ")
+    tokens = []
+    pos = 0
+    for match in _TERM_NUMBER_RE.finditer(expression):
+        tokens.extend(("word", w) for w in expression[pos:match.start()].split())
+        tokens.append(("num", match.group()))
+        pos = match.end()
+    tokens.extend(("word", w) for w in expression[pos:].split())
+    return tokens
+
+
+def shape_of(expression):
+    # Cache key: whitespace-normalized text with every number replaced by
+    # NUL, found without a full tokenize
+    expression = expression.replace("->", " -> ")
+    return " ".join(_TERM_NUMBER_RE.sub(" \x00 ", expression).split())
+
+
+class ExpressionEvaluator:
+    def __init__(self, engine=None, cache_size=PLAN_CACHE_SIZE):
+        self.engine = engine or get_engine()
+        self.resolver = UnitResolver(self.engine)
+        self.cache_size = cache_size
+        self._plans = OrderedDict()  # shape -> Plan or ExpressionError
+        self.hits = 0
+        self.misses = 0
+
+    def plan(self, expression):
+        # (Plan, numbers); raises ExpressionError
+        shape = shape_of(expression)
+        numbers = [float(text) for text in _TERM_NUMBER_RE.findall(expression.replace("->", " -> "))]
+        plan = self._plans.get(shape)
+        if plan is None:
+            self.misses += 1
+            try:
+                plan = self.compile(tokenize(expression))
+            except ExpressionError as e:
+                plan = e
+            self._plans[shape] = plan
+            if len(self._plans) > self.cache_size:
+                self._plans.popitem(last=False)
+        else:
+            self.hits += 1
+            self._plans.move_to_end(shape)
+        if isinstance(plan, ExpressionError):
+            raise plan
+        return plan, numbers
+
+    def evaluate(self, expression):
+        plan, numbers = self.plan(expression)
+        return Result(plan.fn(numbers), plan.to_unit, plan.category)
+
+    def compile(self, tokens):
+        if not any(kind == "num" for kind, _ in tokens):
+            raise ExpressionError("Expected a number, e.g. '5 ft 3 in to cm'")
+        last_num = max(i for i, (kind, _) in enumerate(tokens) if kind == "num")
+        # Rightmost separator whose right-hand side is a unit ("3 in in cm")
+        for i in range(len(tokens) - 1, last_num, -1):
+            kind, text = tokens[i]
+            if kind == "word" and text.lower() in SEPARATORS:
+                target = self.resolver.resolve(" ".join(t for _, t in tokens[i + 1:]))
+                if target is not None:
+                    terms = None
+                    try:
+                        terms = self._terms(tokens[:i])
+                        return self._compile_terms(terms, target)
+                    except ExpressionError as e:
+                        error = e
+                    try:
+                        compound = self._compile_compound(tokens)
+                    except ExpressionError:
+                        if terms is not None:
+                            raise error
+                        # The left side is a compound unit of another
+                        # dimension ("rad/s to Hz"), which beats "Unknown unit"
+                        raise
+                    if compound is None:
+                        raise error
+                    return compound
+        compound = self._compile_compound(tokens)
+        if compound is None:
+            raise ExpressionError("Expected a target unit, e.g. '... to cm'")
+        return compound
+
+    def _terms(self, tokens):
+        # [(category, unit)], one per number
+        terms = []
+        i = 0
+        while i < len(tokens):
+            if tokens[i][0] != "num":
+                raise ExpressionError(f"Unexpected {tokens[i][1]!r}")
+            j = i + 1
+            while j < len(tokens) and tokens[j][0] == "word":
+                j += 1
+            text = " ".join(t for _, t in tokens[i + 1:j])
+            if not text:
+                raise ExpressionError(f"Missing unit after {tokens[i][1]}")
+            unit = self.resolver.resolve(text)
+            if unit is None:
+                raise ExpressionError(f"Unknown unit: {text!r}")
+            terms.append(unit)
+            i = j
+        return terms
+
+    def _compile_terms(self, terms, target):
+        category, to_unit = target
+        for term_category, unit in terms:
+            if term_category != category:
+                raise ExpressionError(f"Cannot convert {term_category} ({unit}) to {category} ({to_unit})")
+        units = tuple(unit for _, unit in terms)
+        if not self.engine.has_category(category):
+            # Temperature / fuel efficiency: one value, no sums
+            if len(units) > 1:
+                raise ExpressionError(f"{category} values can't be added together")
+            convert = self.engine.converter(category, units[0], to_unit)
+            return Plan(category, units, to_unit, lambda numbers: convert(numbers[0]))
+        factors = tuple(self.engine.factor(category, unit, to_unit) for unit in units)
+        if len(factors) == 1:
+            factor = factors[0]
+            return Plan(category, units, to_unit, lambda numbers: numbers[0] * factor)
+        return Plan(category, units, to_unit, lambda numbers: sum(n * f for n, f in zip(numbers, factors)))
+
+    def _compile_compound(self, tokens):
+        # "<number> <unit expression> to <unit expression>" through dimensional
+        # analysis (kg·m/s² to lbf, kWh/100km to Wh/mile); None if it isn't one
+        from dimensions import DimensionError, dimension_name, get_unit_system
+        if tokens[0][0] != "num" or any(kind == "num" for kind, _ in tokens[1:]):
+            return None
+        system = get_unit_system()
+        for i in range(len(tokens) - 2, 1, -1):
+            if tokens[i][1].lower() not in SEPARATORS:
+                continue
+            left = " ".join(t for _, t in tokens[1:i])
+            right = " ".join(t for _, t in tokens[i + 1:])
+            try:
+                _, from_dims = system.canonical(left)
+                _, to_dims = system.canonical(right)
+            except DimensionError:
+                continue
+            if from_dims != to_dims:
+                raise ExpressionError(f"Cannot convert {dimension_name(from_dims)} ({left})"
+                                      f" to {dimension_name(to_dims)} ({right})")
+            factor = system.factor(left, right)
+            return Plan(dimension_name(to_dims), (left,), right, lambda numbers: numbers[0] * factor)
+        return None
+
+    def cache_stats(self):
+        return {"hits": self.hits, "misses": self.misses, "plans": len(self._plans)}
+
+
+_evaluator = None
+
+
+def get_evaluator():
+    # Process-wide shared evaluator (one plan cache)
+    global _evaluator
+    if _evaluator is None:
+        _evaluator = ExpressionEvaluator()
+    return _evaluator
+
+
+def evaluate(expression):
+    return get_evaluator().evaluate(expression)
+
+
+def format_result(result, digits=6):
+    return f"{result.value:.{digits}g} {result.unit}"
+
+
+if __name__ == "__main__":
+    status = 0
+    for expression in sys.argv[1:]:
+        try:
+            print(f"{expression} = {format_result(evaluate(expression))}")
+        except ExpressionError as e:
+            print(f"{expression}: {e}", file=sys.stderr)
+            status = 1
+    sys.exit(status)
@@ -0,0 +1,197 @@
+"""Local stand-in for the exchange-rate API (same /latest?base= JSON shape,
+plus /timeseries?start_date=&end_date=&base= for historical daily rates).
+
+Latency, error rate and payload size are configurable, so the currency path
+can be measured and regression-tested without touching the live service.
+
+    python fake_rates_server.py --port 8765 --latency 0.05 --error-rate 0.1
+    AK_CONVERTER_RATES_URL=http://127.0.0.1:8765 python ak-converter.py
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from rates import CURRENCIES
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        fake = self.server.fake
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        base = query.get("base", ["USD"])[0].upper()
+        path = url.path.rstrip("/")
+        if path == "/latest":
+            status, payload, etag = fake.respond(base, self.headers.get("If-None-Match"))
+            self._send(status, payload, etag)
+        elif path == "/timeseries":
+            try:
+                start = date.fromisoformat(query["start_date"][0])
+                end = date.fromisoformat(query["end_date"][0])
+            except (KeyError, ValueError):
+                self._send(400, {"success": False, "error": "start_date and end_date are required"})
+                return
+            self._send(*fake.respond_timeseries(base, start, end))
+        else:
+            self._send(404, {"success": False, "error": "not found"})
+
+    def _send(self, status, payload, etag=None):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        if payload is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeRatesServer:
+    # Threaded HTTP server on a background thread; use as a context manager
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 extra_currencies=0, etag=True, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.etag = etag
+        self.version = 1
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        # Padding codes make the payload as large as needed
+        codes = list(CURRENCIES) + [f"X{i:04d}" for i in range(extra_currencies)]
+        self.usd_rates = {c: 1.0 if c == "USD" else round(self._rng.uniform(0.0001, 500), 6) for c in codes}
+        self.requests = 0
+        self.errors = 0
+        self.not_modified = 0
+        self._httpd = ThreadingHTTPServer((host, port), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.fake = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-rates", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def bump(self):
+        # Publish new rates (and a new ETag)
+        with self._lock:
+            self.version += 1
+            for code in self.usd_rates:
+                if code != "USD":
+                    self.usd_rates[code] = round(self.usd_rates[code] * self._rng.uniform(0.98, 1.02), 6)
+
+    def respond(self, base, if_none_match=None):
+        # (status, payload or None, etag or None) for one request
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = self.error_rate and self._rng.random() < self.error_rate
+            etag = f'"v{self.version}"' if self.etag else None
+            usd = dict(self.usd_rates)
+            if failed:
+                self.errors += 1
+            elif etag and if_none_match == etag:
+                self.not_modified += 1
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return 503, {"success": False, "error": "injected failure"}, None
+        if etag and if_none_match == etag:
+            return 304, None, etag
+        if base not in usd:
+            return 200, {"success": False, "error": f"unknown base {base}"}, None
+        per = usd[base]
+        payload = {
+            "success": True,
+            "base": base,
+            "date": date.today().isoformat(),
+            "rates": {c: v / per for c, v in usd.items()},
+        }
+        return 200, payload, etag
+
+    def historical_usd_rate(self, code, day):
+        # Deterministic daily drift around today's rate
+        if code == "USD":
+            return 1.0
+        phase = zlib.crc32(code.encode()) % 360
+        return self.usd_rates[code] * (1 + 0.05 * math.sin(day.toordinal() / 29 + phase))
+
+    def respond_timeseries(self, base, start, end):
+        # (status, payload) for one /timeseries request; at most 366 days
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = self.error_rate and self._rng.random() < self.error_rate
+            if failed:
+                self.errors += 1
+        if delay:
+            time.sleep(delay)
+        if failed:
+            return 503, {"success": False, "error": "injected failure"}
+        if end < start or (end - start).days > 365:
+            return 400, {"success": False, "error": "invalid date range (max 366 days)"}
+        if base not in self.usd_rates:
+            return 200, {"success": False, "error": f"unknown base {base}"}
+        series = {}
+        day = start
+        while day <= end:
+            per = self.historical_usd_rate(base, day)
+            series[day.isoformat()] = {c: self.historical_usd_rate(c, day) / per for c in self.usd_rates}
+            day += timedelta(days=1)
+        payload = {"success": True, "timeseries": True, "base": base,
+                   "start_date": start.isoformat(), "end_date": end.isoformat(), "rates": series}
+        return 200, payload
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve fake exchange rates on /latest?base=XXX")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 503")
+    parser.add_argument("--extra-currencies", type=int, default=0, help="Padding currencies to enlarge payloads")
+    parser.add_argument("--no-etag", action="store_true", help="Never answer 304 Not Modified")
+    args = parser.parse_args(argv)
+    server = FakeRatesServer(args.host, args.port, args.latency, args.jitter, args.error_rate,
+                             args.extra_currencies, etag=not args.no_etag)
+    print(f"Serving fake rates on {server.url}/latest?base=USD (Ctrl+C to stop)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
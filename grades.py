@@ -0,0 +1,217 @@
+"""Grade points and credit-weighted CGPA, independent of the GUI.
+
+A grade is a letter on the 4.0 scale ("A", "b+", "C-") or a number of grade
+points from 0 to 4.0, and each course counts by its credit hours.
+
+    >>> round(cgpa([("A", 3), ("B+", 4), ("3.0", 2)]), 4)
+    3.4667
+
+Whole cohorts come from a transcript CSV with one row per student and
+course. The columns are read once and the distinct grade texts (a dozen
+letters, a few point values) are mapped to points. Then every student's
+credit and point totals are one weighted bincount over the whole file:
+NumPy when it is installed, a plain loop otherwise.
+
+    python grades.py transcript.csv -o cgpa.csv
+    python grades.py transcript.csv -o cgpa.csv --student id --grade letter --credits hours --errors bad.jsonl
+"""
+import argparse
+import csv
+import math
+import sys
+import time
+
+from engine import NUMPY_AVAILABLE, load_numpy
+
+# Letter grade -> grade points
+GRADE_POINTS = {
+    "A": 4.0, "A-": 3.7, "B+": 3.3, "B": 3.0, "B-": 2.7,
+    "C+": 2.3, "C": 2.0, "C-": 1.7, "D+": 1.3, "D": 1.0, "F": 0.0,
+}
+MAX_POINTS = 4.0
+DEFAULT_CREDITS = 3.0
+
+# Default transcript columns; without a credits column every course counts once
+STUDENT_COLUMN = "student"
+GRADE_COLUMN = "grade"
+CREDITS_COLUMN = "credits"
+
+
+class GradeError(ValueError):
+    pass
+
+
+def grade_points(grade):
+    # Points for a letter ("b+") or a number of points ("3.7")
+    text = str(grade).strip()
+    points = GRADE_POINTS.get(text.upper())
+    if points is not None:
+        return points
+    try:
+        points = float(text)
+    except ValueError:
+        raise GradeError(f"Unknown grade: {text!r}") from None
+    if not 0 <= points <= MAX_POINTS:
+        raise GradeError(f"Grades must be between 0 and {MAX_POINTS}: {text!r}")
+    return points
+
+
+def credit_hours(value):
+    try:
+        hours = float(value)
+    except (TypeError, ValueError):
+        raise GradeError(f"Invalid credit hours: {value!r}") from None
+    if not (hours >= 0 and math.isfinite(hours)):
+        raise GradeError(f"Invalid credit hours: {value!r}")
+    return hours
+
+
+def cgpa(courses):
+    # Credit-weighted CGPA of (grade, credit hours) pairs; None without credits
+    points = credits = 0.0
+    for grade, hours in courses:
+        hours = credit_hours(hours)
+        points += grade_points(grade) * hours
+        credits += hours
+    return points / credits if credits else None
+
+
+def read_transcript(f, student_column=STUDENT_COLUMN, grade_column=GRADE_COLUMN, credits_column=CREDITS_COLUMN):
+    # Columns of a transcript CSV: (students, grades, credits, line numbers)
+    reader = csv.DictReader(f)
+    fieldnames = reader.fieldnames or []
+    missing = [c for c in (student_column, grade_column) if c not in fieldnames]
+    if missing:
+        raise ValueError(f"Missing column(s): {', '.join(missing)}")
+    weighted = credits_column in fieldnames
+    students, grades, credits, lines = [], [], [], []
+    for row in reader:
+        students.append((row[student_column] or "").strip())
+        grades.append(row[grade_column] or "")
+        credits.append((row[credits_column] or "") if weighted else "1")
+        lines.append(reader.line_num)
+    return students, grades, credits, lines
+
+
+def _or_nan(parse, value):
+    try:
+        return parse(value)
+    except GradeError:
+        return math.nan
+
+
+def _factorize(values):
+    # (distinct values in order of first appearance, integer code per value)
+    np = load_numpy()
+    seen = {}
+    codes = np.fromiter([seen.setdefault(v, len(seen)) for v in values], dtype=np.intp, count=len(values))
+    return list(seen), codes
+
+
+def _report(index, students, grades, credits, lines, on_error, columns):
+    # Log why row `index` was left out
+    for column, value, parse in ((columns[1], grades[index], grade_points), (columns[2], credits[index], credit_hours)):
+        try:
+            parse(value)
+        except GradeError as e:
+            on_error(lines[index] if lines else index + 1, column, value, str(e))
+            return
+
+
+def cohort_cgpa(students, grades, credits, lines=None, on_error=None,
+                columns=(STUDENT_COLUMN, GRADE_COLUMN, CREDITS_COLUMN)):
+    # [(student, courses, credits, cgpa or None)] sorted by student. Rows
+    # with an unknown grade or bad credit hours are left out and reported.
+    if not NUMPY_AVAILABLE:
+        return _cohort_cgpa_loop(students, grades, credits, lines, on_error, columns)
+    np = load_numpy()
+    # Grades and credit hours take few distinct values; only those are parsed
+    ids, codes = _factorize(students)
+    grade_texts, grade_codes = _factorize(grades)
+    points = np.array([_or_nan(grade_points, t) for t in grade_texts], dtype=float)[grade_codes]
+    credit_texts, credit_codes = _factorize(credits)
+    hours = np.array([_or_nan(credit_hours, t) for t in credit_texts], dtype=float)[credit_codes]
+    valid = ~(np.isnan(points) | np.isnan(hours))
+    if on_error is not None:
+        for row in np.flatnonzero(~valid).tolist():
+            _report(row, students, grades, credits, lines, on_error, columns)
+    codes, points, hours = codes[valid], points[valid], hours[valid]
+    courses = np.bincount(codes, minlength=len(ids)).tolist()
+    credit_sums = np.bincount(codes, weights=hours, minlength=len(ids)).tolist()
+    point_sums = np.bincount(codes, weights=points * hours, minlength=len(ids)).tolist()
+    return [(ids[i], courses[i], credit_sums[i], point_sums[i] / credit_sums[i] if credit_sums[i] else None)
+            for i in sorted(range(len(ids)), key=ids.__getitem__)]
+
+
+def _cohort_cgpa_loop(students, grades, credits, lines, on_error, columns):
+    totals = {}  # student -> [courses, credits, points]
+    points_of = {}  # grade text -> points (NaN for unknown)
+    hours_of = {}   # credits text -> hours (NaN for invalid)
+    for index, (student, grade, hours) in enumerate(zip(students, grades, credits)):
+        total = totals.get(student)
+        if total is None:
+            total = totals[student] = [0, 0.0, 0.0]
+        points = points_of.get(grade)
+        if points is None:
+            points = points_of[grade] = _or_nan(grade_points, grade)
+        text, hours = hours, hours_of.get(hours)
+        if hours is None:
+            hours = hours_of[text] = _or_nan(credit_hours, text)
+        if math.isnan(points) or math.isnan(hours):
+            if on_error is not None:
+                _report(index, students, grades, credits, lines, on_error, columns)
+            continue
+        total[0] += 1
+        total[1] += hours
+        total[2] += points * hours
+    return [(student, n, hours, points / hours if hours else None)
+            for student, (n, hours, points) in sorted(totals.items())]
+
+
+def transcript_file(input_path, output_path, student_column=STUDENT_COLUMN, grade_column=GRADE_COLUMN,
+                    credits_column=CREDITS_COLUMN, errors_path=None, digits=2):
+    # Transcript CSV -> one CSV row per student; returns (students, courses, errors)
+    # bulk (and its process pool) is only loaded here, not when the GUI imports grades
+    from bulk import ErrorLog
+    with open(input_path, newline="", encoding="utf-8") as f:
+        students, grades, credits, lines = read_transcript(f, student_column, grade_column, credits_column)
+    errors_file = open(errors_path, "w", encoding="utf-8") if errors_path else None
+    try:
+        on_error = ErrorLog(errors_file)
+        results = cohort_cgpa(students, grades, credits, lines, on_error,
+                              (student_column, grade_column, credits_column))
+    finally:
+        if errors_file:
+            errors_file.close()
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow([student_column, "courses", "credits", "cgpa"])
+        for student, courses, hours, value in results:
+            writer.writerow([student, courses, f"{hours:g}", "" if value is None else f"{value:.{digits}f}"])
+    return len(results), len(students), on_error.count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Credit-weighted CGPA for every student in a transcript CSV.")
+    parser.add_argument("input", help="Transcript CSV, one row per student and course")
+    parser.add_argument("-o", "--output", required=True, help="Output CSV: student, courses, credits, cgpa")
+    parser.add_argument("--student", default=STUDENT_COLUMN, help="Student id column (default %(default)s)")
+    parser.add_argument("--grade", default=GRADE_COLUMN, help="Letter grade or points column (default %(default)s)")
+    parser.add_argument("--credits", default=CREDITS_COLUMN,
+                        help="Credit hours column (default %(default)s; if absent every course counts once)")
+    parser.add_argument("--digits", type=int, default=2, help="Decimals in the cgpa column")
+    parser.add_argument("--errors", help="Side file for rows left out (JSON lines)")
+    args = parser.parse_args(argv)
+    began = time.perf_counter()
+    try:
+        students, courses, errors = transcript_file(args.input, args.output, args.student, args.grade,
+                                                    args.credits, args.errors, args.digits)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"{students} students from {courses} course rows ({errors} errors) in"
+          f" {time.perf_counter() - began:.2f}s", file=sys.stderr)
+    return 1 if errors and not students else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,439 @@
+"""Local store of historical daily exchange rates, independent of the GUI.
+
+Each currency keeps two parallel arrays (sorted day ordinals and rates against
+one base), so the rate on any date is a binary search and a whole column of
+(date, amount) pairs is converted with one sorted lookup per currency.
+
+    python rate_history.py backfill --start 2022-01-01 --end 2024-12-31
+    python rate_history.py rate EUR GBP 2023-05-04
+    python rate_history.py convert invoices.csv -o repriced.csv --from EUR --to USD \\
+        --date-column invoice_date --amount-column total
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, timedelta
+
+# NumPy is optional; without it column conversion falls back to a bisect loop
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from rates import REFERENCE_BASE, default_cache_path, get_provider
+
+# The timeseries endpoint serves at most this many days per request
+MAX_SPAN_DAYS = 366
+
+# A rate "on or before" a date is used for at most this many days after it was
+# published (weekends and holidays); later dates count as having no rate
+MAX_STALE_DAYS = 7
+
+# date(1970, 1, 1).toordinal(): shifts datetime64[D] values to date ordinals
+EPOCH_ORDINAL = 719163
+
+FILE_MAGIC = b"AKRH1\n"
+
+CSV_CHUNK_ROWS = 50_000
+
+
+def default_history_path():
+    return os.path.join(os.path.dirname(default_cache_path()), "history.bin")
+
+
+def day_ordinal(day):
+    # date / datetime / "YYYY-MM-DD..." / ordinal -> proleptic Gregorian ordinal
+    if isinstance(day, int):
+        return day
+    if isinstance(day, str):
+        return date.fromisoformat(day.strip()[:10]).toordinal()
+    return day.toordinal()
+
+
+class RateHistory:
+    # Daily rates for one base currency. Rates are looked up "on or before" a
+    # date, so weekends and holidays resolve to the last published rate, as
+    # long as it is at most max_stale_days old.
+    def __init__(self, base=REFERENCE_BASE, max_stale_days=MAX_STALE_DAYS):
+        self.base = base
+        self.max_stale_days = max_stale_days
+        self._days = {}    # { code: array("i") of sorted day ordinals }
+        self._values = {}  # { code: array("d") of rates, parallel to _days }
+        self._covered = array("i")  # every day added, sorted
+        self._columns = {}  # { code: (days, values) as NumPy arrays }, rebuilt after writes
+
+    def __len__(self):
+        return len(self._covered)
+
+    def codes(self):
+        return sorted(self._days)
+
+    def span(self):
+        # (first, last) date held, or None when empty
+        if not self._covered:
+            return None
+        return date.fromordinal(self._covered[0]), date.fromordinal(self._covered[-1])
+
+    def covers(self, start, end):
+        # True when every day in [start, end] has been added
+        lo, hi = day_ordinal(start), day_ordinal(end)
+        count = bisect_right(self._covered, hi) - bisect_left(self._covered, lo)
+        return count == hi - lo + 1
+
+    def add(self, day, rates):
+        d = day_ordinal(day)
+        _insert(self._covered, None, d, None)
+        for code, value in rates.items():
+            if code == self.base:
+                continue
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                continue
+            days = self._days.get(code)
+            if days is None:
+                days = self._days[code] = array("i")
+                self._values[code] = array("d")
+            _insert(days, self._values[code], d, value)
+        self._columns.clear()
+
+    def add_series(self, series):
+        # { "YYYY-MM-DD": {code: rate} } as served by the timeseries endpoint
+        for day in sorted(series):
+            self.add(day, series[day])
+        return len(series)
+
+    def rate_on(self, code, day):
+        # Rate of `code` per base on `day` (or the latest day before it, up to
+        # max_stale_days back), or None
+        if code == self.base:
+            return 1.0
+        days = self._days.get(code)
+        if days is None:
+            return None
+        d = day_ordinal(day)
+        i = bisect_right(days, d) - 1
+        if i < 0 or d - days[i] > self.max_stale_days:
+            return None
+        return self._values[code][i]
+
+    def cross_rate(self, from_code, to_code, day):
+        f = self.rate_on(from_code, day)
+        t = self.rate_on(to_code, day)
+        return t / f if f and t is not None else None
+
+    def convert(self, amount, from_code, to_code, day):
+        rate = self.cross_rate(from_code, to_code, day)
+        return None if rate is None else amount * rate
+
+    def convert_column(self, days, amounts, from_code, to_code, out=None):
+        # Convert amounts[i] at days[i] for a whole column. `days` may hold
+        # dates, ISO strings, ordinals or a datetime64 array. Rows with no
+        # rate on record, or only a stale one, come back as NaN.
+        if not NUMPY_AVAILABLE:
+            return self._convert_column_loop(days, amounts, from_code, to_code, out)
+        ordinals = _ordinal_array(days)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = self._rates_for(to_code, ordinals)
+            np.divide(rate, self._rates_for(from_code, ordinals), out=rate)
+            values = np.asarray(amounts, dtype=np.float64)
+            return np.multiply(values, rate, out=out)
+
+    def _convert_column_loop(self, days, amounts, from_code, to_code, out):
+        nan = float("nan")
+        results = (
+            nan if r is None else a * r
+            for a, r in ((float(a), self.cross_rate(from_code, to_code, _safe_ordinal(d)))
+                         for d, a in zip(days, amounts))
+        )
+        if out is None:
+            return array("d", results)
+        for i, value in enumerate(results):
+            out[i] = value
+        return out
+
+    def _rates_for(self, code, ordinals):
+        if code == self.base:
+            return np.ones(len(ordinals))
+        column = self._columns.get(code)
+        if column is None:
+            if code not in self._days:
+                return np.full(len(ordinals), np.nan)
+            # Copies: a live view would stop the array("i") from growing
+            column = self._columns[code] = (
+                np.array(self._days[code], dtype=np.int64),
+                np.array(self._values[code], dtype=np.float64),
+            )
+        day_col, value_col = column
+        idx = np.searchsorted(day_col, ordinals, side="right") - 1
+        found = np.maximum(idx, 0)
+        rates = value_col[found]
+        rates[(idx < 0) | (ordinals - day_col[found] > self.max_stale_days)] = np.nan
+        return rates
+
+    def backfill(self, provider=None, start=None, end=None, chunk_days=MAX_SPAN_DAYS, progress=None):
+        # Fetch [start, end] in as few timeseries requests as the API allows,
+        # skipping chunks already held. Returns (days added, failed chunks).
+        provider = provider or get_provider()
+        end = end or date.today()
+        start = start or end - timedelta(days=chunk_days - 1)
+        added = 0
+        failed = []
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(chunk_start + timedelta(days=chunk_days - 1), end)
+            if not self.covers(chunk_start, chunk_end):
+                series = provider.fetch_timeseries(self.base, chunk_start, chunk_end)
+                if series is None:
+                    failed.append((chunk_start, chunk_end))
+                else:
+                    added += self.add_series(series)
+                if progress:
+                    progress(chunk_start, chunk_end, series is not None)
+            chunk_start = chunk_end + timedelta(days=1)
+        return added, failed
+
+    def save(self, path=None):
+        # Header (JSON) + raw array bytes, written to a temp file then swapped in
+        path = path or default_history_path()
+        codes = self.codes()
+        header = json.dumps({
+            "base": self.base,
+            "byteorder": sys.byteorder,
+            "covered": len(self._covered),
+            "codes": {c: len(self._days[c]) for c in codes},
+        }).encode()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".history-", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(FILE_MAGIC)
+                f.write(len(header).to_bytes(4, "little"))
+                f.write(header)
+                self._covered.tofile(f)
+                for code in codes:
+                    self._days[code].tofile(f)
+                    self._values[code].tofile(f)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        return path
+
+    @classmethod
+    def load(cls, path=None, base=REFERENCE_BASE, max_stale_days=MAX_STALE_DAYS):
+        # Empty history when the file is missing or unreadable; ValueError when
+        # it holds rates against another base
+        path = path or default_history_path()
+        history = cls(base, max_stale_days)
+        if not os.path.exists(path):
+            return history
+        try:
+            with open(path, "rb") as f:
+                if f.read(len(FILE_MAGIC)) != FILE_MAGIC:
+                    raise ValueError("not a rate history file")
+                header = json.loads(f.read(int.from_bytes(f.read(4), "little")))
+                swap = header["byteorder"] != sys.byteorder
+                history = cls(header["base"], max_stale_days)
+                history._covered = _read_array(f, "i", header["covered"], swap)
+                for code, count in header["codes"].items():
+                    history._days[code] = _read_array(f, "i", count, swap)
+                    history._values[code] = _read_array(f, "d", count, swap)
+        except (OSError, ValueError, KeyError, EOFError) as e:
+            print(f"Rate history unavailable ({path}): {e}")
+            return cls(base, max_stale_days)
+        if history.base != base:
+            raise ValueError(f"{path} holds rates against {history.base}, not {base}")
+        return history
+
+
+def _insert(days, values, d, value):
+    # Append on the common in-order path, otherwise insert/overwrite in place
+    if not days or d > days[-1]:
+        days.append(d)
+        if values is not None:
+            values.append(value)
+        return
+    i = bisect_left(days, d)
+    if i < len(days) and days[i] == d:
+        if values is not None:
+            values[i] = value
+        return
+    days.insert(i, d)
+    if values is not None:
+        values.insert(i, value)
+
+
+def _read_array(f, typecode, count, swap):
+    arr = array(typecode)
+    arr.fromfile(f, count)
+    if swap:
+        arr.byteswap()
+    return arr
+
+
+def _ordinal_array(days):
+    if isinstance(days, np.ndarray) and days.dtype.kind == "M":
+        return days.astype("datetime64[D]").astype(np.int64) + EPOCH_ORDINAL
+    if isinstance(days, np.ndarray) and days.dtype.kind in "iu":
+        return days.astype(np.int64)
+    try:
+        # Fast path for "YYYY-MM-DD" strings and date objects. NumPy also reads
+        # "2024-05" or "2024" as a day, so other strings take the slow path,
+        # which accepts and rejects exactly what day_ordinal does.
+        arr = np.asarray(days)
+        if arr.dtype.kind == "U" and (np.char.str_len(arr) != 10).any():
+            raise ValueError("not all full ISO dates")
+        return arr.astype("datetime64[D]").astype(np.int64) + EPOCH_ORDINAL
+    except (TypeError, ValueError):
+        return np.array([_safe_ordinal(d) for d in days], dtype=np.int64)
+
+
+def _safe_ordinal(day):
+    # Unparseable dates sort before every stored day, so they convert to NaN
+    try:
+        return day_ordinal(day)
+    except (TypeError, ValueError, AttributeError):
+        return -1
+
+
+def convert_csv(history, input_path, output_path, from_code, to_code, date_column, amount_column,
+                output_column=None, chunk_rows=CSV_CHUNK_ROWS):
+    # Reprice a CSV in chunks of rows; rows without a rate get an empty cell
+    output_column = output_column or f"{amount_column}_{to_code}"
+    written = missing = 0
+    with open(input_path, newline="", encoding="utf-8") as src, \
+            open(output_path, "w", newline="", encoding="utf-8") as dst:
+        reader = csv.DictReader(src)
+        fieldnames = list(reader.fieldnames or ())
+        for col in (date_column, amount_column):
+            if col not in fieldnames:
+                raise ValueError(f"Missing column: {col}")
+        if output_column not in fieldnames:
+            fieldnames.append(output_column)
+        writer = csv.DictWriter(dst, fieldnames=fieldnames, lineterminator="\n")
+        writer.writeheader()
+        chunk = []
+        for row in reader:
+            chunk.append(row)
+            if len(chunk) >= chunk_rows:
+                missing += _convert_csv_chunk(history, chunk, from_code, to_code,
+                                              date_column, amount_column, output_column)
+                writer.writerows(chunk)
+                written += len(chunk)
+                chunk = []
+        if chunk:
+            missing += _convert_csv_chunk(history, chunk, from_code, to_code,
+                                          date_column, amount_column, output_column)
+            writer.writerows(chunk)
+            written += len(chunk)
+    return written, missing
+
+
+def _convert_csv_chunk(history, rows, from_code, to_code, date_column, amount_column, output_column):
+    amounts = []
+    for row in rows:
+        try:
+            amounts.append(float(row[amount_column]))
+        except (TypeError, ValueError):
+            amounts.append(float("nan"))
+    results = history.convert_column([row[date_column] for row in rows], amounts, from_code, to_code)
+    missing = 0
+    for row, value in zip(rows, results):
+        if value != value:  # NaN
+            row[output_column] = ""
+            missing += 1
+        else:
+            row[output_column] = float(value)
+    return missing
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Historical exchange rates: backfill, look up, reprice CSVs.")
+    parser.add_argument("--path", help="History file (default: next to the rate cache)")
+    parser.add_argument("--base", default=REFERENCE_BASE, help="Base currency stored")
+    parser.add_argument("--max-stale-days", type=int, default=MAX_STALE_DAYS,
+                        help="Oldest rate used for a date without one, in days (default %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    backfill = sub.add_parser("backfill", help="Download daily rates for a date range")
+    backfill.add_argument("--start", type=date.fromisoformat, required=True)
+    backfill.add_argument("--end", type=date.fromisoformat, default=date.today())
+
+    rate = sub.add_parser("rate", help="Show the rate between two currencies on a date")
+    rate.add_argument("from_code")
+    rate.add_argument("to_code")
+    rate.add_argument("day", type=date.fromisoformat)
+
+    convert = sub.add_parser("convert", help="Reprice an amount column of a CSV at each row's date")
+    convert.add_argument("input")
+    convert.add_argument("-o", "--output", required=True)
+    convert.add_argument("-f", "--from", dest="from_code", required=True)
+    convert.add_argument("-t", "--to", dest="to_code", required=True)
+    convert.add_argument("--date-column", default="date")
+    convert.add_argument("--amount-column", default="amount")
+    convert.add_argument("--output-column", help="Result column (default: <amount column>_<to>)")
+
+    sub.add_parser("info", help="Show what the history file holds")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    path = args.path or default_history_path()
+    try:
+        history = RateHistory.load(path, args.base, args.max_stale_days)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    if args.command == "backfill":
+        began = time.perf_counter()
+        added, failed = history.backfill(
+            start=args.start, end=args.end,
+            progress=lambda s, e, ok: print(f"  {s} .. {e}: {'ok' if ok else 'FAILED'}", file=sys.stderr),
+        )
+        history.save(path)
+        print(f"Added {added} days in {time.perf_counter() - began:.1f}s ({len(failed)} failed chunks)",
+              file=sys.stderr)
+        return 1 if failed else 0
+    if args.command == "rate":
+        rate = history.cross_rate(args.from_code.upper(), args.to_code.upper(), args.day)
+        if rate is None:
+            print(f"No rate on record for {args.day} (run backfill first)", file=sys.stderr)
+            return 1
+        print(f"1 {args.from_code.upper()} = {rate:.6f} {args.to_code.upper()} on {args.day}")
+        return 0
+    if args.command == "convert":
+        began = time.perf_counter()
+        try:
+            written, missing = convert_csv(history, args.input, args.output, args.from_code.upper(),
+                                           args.to_code.upper(), args.date_column, args.amount_column,
+                                           args.output_column)
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 2
+        elapsed = time.perf_counter() - began
+        print(f"Converted {written} rows ({missing} without a rate, {written / elapsed if elapsed else 0:,.0f} rows/s)",
+              file=sys.stderr)
+        return 0
+    span = history.span()
+    print(f"History file: {path}")
+    if span is None:
+        print("  empty")
+    else:
+        print(f"  base {history.base}: {len(history)} days, {span[0]} .. {span[1]}, {len(history.codes())} currencies")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
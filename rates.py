@@ -0,0 +1,380 @@
+"""Exchange-rate fetching and caching, independent of the GUI."""
+import importlib.util
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import timedelta
+
+# Free, no-key API that supports crypto: exchangerate.host. Point
+# AK_CONVERTER_RATES_URL at another server (e.g. fake_rates_server.py) to test.
+API_ROOT = os.environ.get("AK_CONVERTER_RATES_URL", "https://api.exchangerate.host")
+LATEST_PATH = "/latest?base={base}"
+TIMESERIES_PATH = "/timeseries?start_date={start}&end_date={end}&base={base}"
+API_URL = API_ROOT.rstrip("/") + LATEST_PATH
+REQUEST_TIMEOUT = 8
+CACHE_TTL = timedelta(minutes=30)
+
+# One base is fetched; every other pair is derived from it
+REFERENCE_BASE = "USD"
+
+# Broad set of common currencies + BTC/ETH
+CURRENCIES = (
+    "USD", "EUR", "GBP", "JPY", "CAD", "AUD", "CHF", "CNY", "INR",
+    "NZD", "SEK", "NOK", "DKK", "PLN", "CZK", "HUF", "MXN", "BRL",
+    "ZAR", "HKD", "SGD", "KRW", "THB", "TWD", "AED", "SAR", "TRY",
+    "ILS", "RUB", "BTC", "ETH"
+)
+
+# requests (and its urllib3/ssl chain) is only imported on the first fetch;
+# at import time we just check that it is installed
+requests = None
+REQUESTS_AVAILABLE = importlib.util.find_spec("requests") is not None
+
+
+def load_requests():
+    global requests
+    if requests is None:
+        import requests as _requests
+        requests = _requests
+    return requests
+
+
+# RateProvider.fetch outcomes
+FETCHED = "fetched"
+NOT_MODIFIED = "not_modified"
+FAILED = "failed"
+
+
+class RateProvider:
+    # HTTP client for the rate API. Keeps one pooled requests.Session so
+    # refreshes reuse the TCP/TLS connection, and sends If-None-Match /
+    # If-Modified-Since so an unchanged payload costs a 304 instead of a
+    # full download. Counters are exposed through stats().
+    def __init__(self, root=API_ROOT, timeout=REQUEST_TIMEOUT):
+        self.root = root.rstrip("/")
+        self.url = self.root + LATEST_PATH
+        self.timeseries_url = self.root + TIMESERIES_PATH
+        self.timeout = timeout
+        self._session = None
+        self._validators = {}  # { base: {"ETag": ..., "Last-Modified": ...} }
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.not_modified = 0
+        self.failures = 0
+        self.bytes_received = 0
+        self.total_latency = 0.0
+        self.last_latency = None
+        self.connections_opened = 0
+
+    def session(self):
+        if self._session is None:
+            self._session = load_requests().Session()
+            self._session.headers["Accept-Encoding"] = "gzip, deflate"
+        return self._session
+
+    def fetch(self, base, conditional=True, timeout=None):
+        # (FETCHED, rates) | (NOT_MODIFIED, None) | (FAILED, None)
+        if not REQUESTS_AVAILABLE:
+            return FAILED, None
+        url = self.url.format(base=base)
+        headers = {}
+        if conditional:
+            with self._lock:
+                validators = dict(self._validators.get(base, {}))
+            if "ETag" in validators:
+                headers["If-None-Match"] = validators["ETag"]
+            if "Last-Modified" in validators:
+                headers["If-Modified-Since"] = validators["Last-Modified"]
+        try:
+            resp = self._get(url, headers, timeout)
+            if resp.status_code == 304:
+                with self._lock:
+                    self.not_modified += 1
+                return NOT_MODIFIED, None
+            if resp.status_code == 200:
+                rates = resp.json().get("rates", {})
+                if rates:
+                    with self._lock:
+                        self._validators[base] = {
+                            k: resp.headers[k] for k in ("ETag", "Last-Modified") if k in resp.headers
+                        }
+                    return FETCHED, rates
+        except Exception as e:
+            print(f"Error fetching currency rates: {e}")
+        with self._lock:
+            self.failures += 1
+        return FAILED, None
+
+    def fetch_timeseries(self, base, start, end, timeout=None):
+        # Daily rates between two dates: { "YYYY-MM-DD": {code: rate} }, or None
+        if not REQUESTS_AVAILABLE:
+            return None
+        url = self.timeseries_url.format(base=base, start=start.isoformat(), end=end.isoformat())
+        try:
+            resp = self._get(url, {}, timeout)
+            if resp.status_code == 200:
+                series = resp.json().get("rates", {})
+                if series:
+                    return series
+        except Exception as e:
+            print(f"Error fetching historical rates: {e}")
+        with self._lock:
+            self.failures += 1
+        return None
+
+    def _get(self, url, headers, timeout):
+        # One counted GET. The lock only guards the session and the counters,
+        # never the request itself, so stats() doesn't wait on the network.
+        with self._lock:
+            session = self.session()
+        opened_before = self._pool_connections(session, url)
+        start = time.perf_counter()
+        resp = session.get(url, headers=headers, timeout=timeout or self.timeout)
+        body = resp.content
+        latency = time.perf_counter() - start
+        received = self._wire_bytes(resp, body)
+        opened = max(self._pool_connections(session, url) - opened_before, 0)
+        with self._lock:
+            self.last_latency = latency
+            self.total_latency += latency
+            self.requests += 1
+            self.bytes_received += received
+            self.connections_opened += opened
+        return resp
+
+    @staticmethod
+    def _pool_connections(session, url):
+        # New connections opened so far by the urllib3 pools behind `url`'s adapter
+        try:
+            pools = session.get_adapter(url).poolmanager.pools
+            return sum(pools[key].num_connections for key in pools.keys())
+        except Exception:
+            return 0
+
+    @staticmethod
+    def _wire_bytes(resp, body):
+        # Compressed size when urllib3 tracks it, else the decoded body size
+        try:
+            return resp.raw.tell() or len(body)
+        except Exception:
+            return len(body)
+
+    def stats(self):
+        with self._lock:
+            reused = max(self.requests - self.connections_opened, 0)
+            return {
+                "requests": self.requests,
+                "not_modified": self.not_modified,
+                "failures": self.failures,
+                "bytes_received": self.bytes_received,
+                "avg_latency_ms": self.total_latency / self.requests * 1000 if self.requests else None,
+                "last_latency_ms": self.last_latency * 1000 if self.last_latency is not None else None,
+                "connections_opened": self.connections_opened,
+                "connections_reused": reused,
+            }
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+_provider = None
+
+
+def get_provider():
+    # Process-wide shared provider (one connection pool)
+    global _provider
+    if _provider is None:
+        _provider = RateProvider()
+    return _provider
+
+
+def fetch_latest(base, timeout=REQUEST_TIMEOUT):
+    # Blocking fetch of the latest rates for `base`; None on any failure
+    _, rates = get_provider().fetch(base, conditional=False, timeout=timeout)
+    return rates
+
+
+class CrossRates:
+    # Every pair derived from one reference-base payload:
+    # rate(from -> to) = rates[to] / rates[from]. The N x N matrix for `codes`
+    # is computed once per payload; entries are None when a code is missing.
+    __slots__ = ("base", "rates", "codes", "ids", "matrix")
+
+    def __init__(self, base, rates, codes=CURRENCIES):
+        self.base = base
+        self.rates = dict(rates)
+        self.rates[base] = 1.0
+        self.codes = tuple(codes)
+        self.ids = {c: i for i, c in enumerate(self.codes)}
+        per_base = [self._per_base(c) for c in self.codes]
+        self.matrix = tuple(
+            tuple(t / f if f and t is not None else None for t in per_base)
+            for f in per_base
+        )
+
+    def _per_base(self, code):
+        value = self.rates.get(code)
+        try:
+            return float(value) if value is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    def rate(self, from_code, to_code):
+        i = self.ids.get(from_code)
+        j = self.ids.get(to_code)
+        if i is not None and j is not None:
+            return self.matrix[i][j]
+        # Outside the precomputed list: derive on the fly
+        f = self._per_base(from_code)
+        t = self._per_base(to_code)
+        return t / f if f and t is not None else None
+
+    def convert(self, amount, from_code, to_code):
+        rate = self.rate(from_code, to_code)
+        return None if rate is None else amount * rate
+
+
+def format_age(seconds):
+    if seconds < 90:
+        return f"{seconds:.0f}s"
+    if seconds < 90 * 60:
+        return f"{seconds / 60:.0f} min"
+    if seconds < 48 * 3600:
+        return f"{seconds / 3600:.1f} h"
+    return f"{seconds / 86400:.1f} days"
+
+
+class RateCache:
+    # Rates per base currency with a freshness window; safe to share between
+    # the GUI thread and fetch workers. Stale entries are kept so callers can
+    # still use them while a refresh runs or when offline.
+    def __init__(self, ttl=CACHE_TTL):
+        self.ttl = ttl.total_seconds() if isinstance(ttl, timedelta) else float(ttl)
+        self._entries = {}  # { base: (fetched_at epoch seconds, {...}) }
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def lookup(self, base):
+        # (rates, age in seconds) for `base`, stale or not; (None, None) on a miss
+        with self._lock:
+            entry = self._entries.get(base)
+            if entry is None:
+                self.misses += 1
+                return None, None
+            age = time.time() - entry[0]
+            if age < self.ttl:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+            return entry[1], age
+
+    def get(self, base):
+        # Fresh rates for `base`, or None
+        rates, age = self.lookup(base)
+        return rates if rates is not None and age < self.ttl else None
+
+    def age(self, base):
+        with self._lock:
+            entry = self._entries.get(base)
+        return None if entry is None else time.time() - entry[0]
+
+    def is_fresh(self, base):
+        age = self.age(base)
+        return age is not None and age < self.ttl
+
+    def put(self, base, rates, fetched_at=None):
+        fetched_at = time.time() if fetched_at is None else fetched_at
+        with self._lock:
+            self._entries[base] = (fetched_at, rates)
+            self._store(base, fetched_at, rates)
+
+    def touch(self, base):
+        # Server says nothing changed: restart the TTL on what we have
+        with self._lock:
+            entry = self._entries.get(base)
+        if entry is None:
+            return None
+        self.put(base, entry[1])
+        return entry[1]
+
+    def bases(self):
+        with self._lock:
+            return list(self._entries)
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses,
+                    "entries": len(self._entries)}
+
+    def _store(self, base, fetched_at, rates):
+        # Persistence hook, called with the lock held
+        pass
+
+
+def default_cache_path():
+    root = os.environ.get("AK_CONVERTER_CACHE_DIR")
+    if not root:
+        if sys.platform == "win32":
+            root = os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "AK-Converter")
+        else:
+            root = os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "ak-converter")
+    return os.path.join(root, "rates.sqlite3")
+
+
+class PersistentRateCache(RateCache):
+    # RateCache backed by a local SQLite file, so rates survive restarts.
+    # Each write is a single transaction, so a crash never leaves a torn entry.
+    def __init__(self, path=None, ttl=CACHE_TTL):
+        super().__init__(ttl)
+        self.path = path or default_cache_path()
+        self._db = None
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS rates ("
+                "base TEXT PRIMARY KEY, fetched_at REAL NOT NULL, payload TEXT NOT NULL)"
+            )
+            for base, fetched_at, payload in self._db.execute("SELECT base, fetched_at, payload FROM rates"):
+                self._entries[base] = (fetched_at, json.loads(payload))
+        except (OSError, sqlite3.Error, ValueError) as e:
+            # Unwritable or corrupt cache: keep working from memory only
+            print(f"Rate cache unavailable ({self.path}): {e}")
+            self._db = None
+
+    def _store(self, base, fetched_at, rates):
+        if self._db is None:
+            return
+        try:
+            with self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO rates (base, fetched_at, payload) VALUES (?, ?, ?)",
+                    (base, fetched_at, json.dumps(rates)),
+                )
+        except sqlite3.Error as e:
+            print(f"Could not save currency rates: {e}")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+if __name__ == "__main__":
+    # Diagnostics: show what the on-disk cache holds
+    cache = PersistentRateCache()
+    print(f"Cache file: {cache.path}")
+    for base in sorted(cache.bases()):
+        age = cache.age(base)
+        state = "fresh" if age < cache.ttl else "stale"
+        print(f"  {base}: {format_age(age)} old ({state})")
@@ -0,0 +1,168 @@
+"""Optional instrumentation: durations and counts for named spans, exported
+as Chrome trace-event JSON (open in chrome://tracing or ui.perfetto.dev) or
+as a summary table.
+
+instrument() shadows methods on one instance only when asked to, and
+uninstrument() removes the shadows again. wrap() gives a single thin
+wrapper that checks `enabled` on every call, for handlers that are connected
+once and should be traced whenever tracing is on. So a disabled tracer costs
+at most one flag check per wrapped call.
+
+    AK_CONVERTER_TRACE=trace.json python ak-converter.py   # trace the whole session
+    AK_CONVERTER_TRACE=1 python ak-converter.py            # same, to ak-converter-trace.json
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+TRACE_ENV = "AK_CONVERTER_TRACE"
+DEFAULT_TRACE_FILE = "ak-converter-trace.json"
+# Oldest events are dropped past this; per-name totals keep counting
+MAX_EVENTS = 200_000
+
+
+class Tracer:
+    def __init__(self, max_events=MAX_EVENTS):
+        self.enabled = False
+        self.events = deque(maxlen=max_events)  # (name, category, start, seconds, thread id)
+        self.totals = {}  # name -> [category, count, total seconds, max seconds]
+        self.threads = {}  # thread id -> thread name
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._patched = []  # (object, attribute) shadowed by instrument()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+        self.uninstrument()
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+            self.totals.clear()
+
+    def record(self, name, category, start, seconds):
+        thread = threading.current_thread()
+        with self._lock:
+            self.events.append((name, category, start, seconds, thread.ident))
+            self.threads.setdefault(thread.ident, thread.name)
+            total = self.totals.get(name)
+            if total is None:
+                total = self.totals[name] = [category, 0, 0.0, 0.0]
+            total[1] += 1
+            total[2] += seconds
+            if seconds > total[3]:
+                total[3] = seconds
+
+    @contextmanager
+    def span(self, name, category="app"):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, category, start, time.perf_counter() - start)
+
+    def wrap(self, fn, name, category="app", max_args=None):
+        # Traced version of fn; it stops recording (but stays a thin wrapper)
+        # once tracing is disabled. With max_args, extra positional arguments
+        # are dropped, as Qt does for a slot that takes fewer than the signal
+        # sends (clicked's `checked`).
+        @functools.wraps(fn)
+        def traced(*args, **kwargs):
+            if max_args is not None:
+                args = args[:max_args]
+            if not self.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(name, category, start, time.perf_counter() - start)
+        return traced
+
+    def instrument(self, obj, names, category="app"):
+        # Shadow methods of one instance with traced ones. `names` is an
+        # iterable of attributes or {attribute: span name}.
+        if not isinstance(names, dict):
+            names = {attr: attr for attr in names}
+        for attr, name in names.items():
+            if (obj, attr) in self._patched:
+                continue
+            setattr(obj, attr, self.wrap(getattr(obj, attr), name, category))
+            self._patched.append((obj, attr))
+
+    def uninstrument(self):
+        for obj, attr in self._patched:
+            try:
+                delattr(obj, attr)
+            except (AttributeError, RuntimeError):
+                # Already gone, or a Qt object deleted underneath us
+                pass
+        self._patched.clear()
+
+    def chrome_trace(self):
+        # Trace-event format: complete ("X") events in microseconds
+        pid = os.getpid()
+        with self._lock:
+            events = list(self.events)
+            threads = dict(self.threads)
+        trace = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                 for tid, name in threads.items()]
+        trace += [{"name": name, "cat": category, "ph": "X", "pid": pid, "tid": tid,
+                   "ts": round((start - self._origin) * 1e6, 3), "dur": round(seconds * 1e6, 3)}
+                  for name, category, start, seconds, tid in events]
+        return {"traceEvents": trace, "displayTimeUnit": "ms"}
+
+    def export_chrome(self, path):
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
+        os.replace(tmp, path)
+        return path
+
+    def summary(self):
+        # [(name, category, count, total ms, mean ms, max ms)], most total time first
+        with self._lock:
+            totals = [(name, *t) for name, t in self.totals.items()]
+        rows = [(name, category, count, total * 1000, total * 1000 / count, peak * 1000)
+                for name, category, count, total, peak in totals]
+        rows.sort(key=lambda r: -r[3])
+        return rows
+
+    def format_summary(self):
+        rows = self.summary()
+        if not rows:
+            return "No spans recorded"
+        width = max(len("span"), *(len(r[0]) for r in rows))
+        lines = [f"{'span':<{width}}  {'category':<8} {'count':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"]
+        for name, category, count, total, mean, peak in rows:
+            lines.append(f"{name:<{width}}  {category:<8} {count:>7} {total:>10.2f} {mean:>9.3f} {peak:>9.3f}")
+        return "\n".join(lines)
+
+
+def trace_path_from_env(environ=os.environ):
+    # Where to write the session trace, or None when tracing is not requested
+    value = environ.get(TRACE_ENV, "").strip()
+    if not value or value == "0":
+        return None
+    return DEFAULT_TRACE_FILE if value == "1" else value
+
+
+_tracer = None
+
+
+def get_tracer():
+    # Process-wide shared tracer
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
@@ -0,0 +1,273 @@
+"""Search index over every converter and unit name, independent of the GUI.
+
+Words are held in a prefix trie whose nodes already know which entries lie
+below them, so a keystroke costs one walk down the trie. Typos are matched
+with a precomputed deletion index (every word and word prefix with one or two
+characters removed), so no distance is computed against the whole vocabulary.
+
+    python unit_search.py kilomter
+"""
+import re
+import sys
+import time
+from collections import namedtuple
+
+from engine import FUEL_UNITS, PREFIXABLE_UNITS, TEMPERATURE_UNITS, get_engine
+from rates import CURRENCIES
+
+# label: what the user sees; converter: selector entry; unit: combo entry or None
+SearchEntry = namedtuple("SearchEntry", "label converter unit tab")
+SearchResult = namedtuple("SearchResult", "entry score")
+
+# Extra words per converter, for things users search by description
+KEYWORDS = {
+    "Decimal to Hex": ("hexadecimal", "base 16"),
+    "RGB to Hex": ("color", "colour", "hex color"),
+    "BMI": ("body mass index", "weight"),
+    "CGPA": ("gpa", "grade point average"),
+    "Grade Converter": ("letter grade", "gpa"),
+    "Age Calculator": ("birthday", "years old"),
+    "Date Difference": ("days between", "duration"),
+    "BMR/TDEE": ("basal metabolic rate", "calories", "metabolism"),
+    "Tip Calculator": ("gratuity",),
+    "Discount Calculator": ("sale", "percent off"),
+    "Currency Converter": ("money", "exchange rate", "forex"),
+    "Fuel Efficiency": ("mileage", "consumption"),
+    "Quick Convert": ("expression", "calculator", "free text"),
+}
+
+# Common abbreviations -> unit names as they appear in the combo boxes
+ALIASES = {
+    "m": "Meter", "cm": "Centimeter", "mm": "Millimeter", "km": "Kilometer", "in": "Inch",
+    "ft": "Foot", "yd": "Yard", "mi": "Mile", "nmi": "Nautical Mile",
+    "mg": "Milligram", "g": "Gram", "kg": "Kilogram", "t": "Tonne", "oz": "Ounce", "lb": "Pound",
+    "l": "Liter", "ml": "Milliliter", "gal": "Gallon (US)", "qt": "Quart (US)", "pt": "Pint (US)",
+    "ha": "Hectare", "j": "Joule", "kj": "Kilojoule", "cal": "Calorie", "kcal": "Kilocalorie",
+    "wh": "Watt-hour", "kwh": "Kilowatt-hour", "ev": "Electronvolt", "w": "Watt", "kw": "Kilowatt",
+    "hp": "Horsepower (US)", "pa": "Pascal", "atm": "Atmosphere", "rad": "Radian", "deg": "Degree",
+    "s": "Second", "min": "Minute", "h": "Hour", "hz": "Hertz", "khz": "Kilohertz", "mhz": "Megahertz",
+    "ghz": "Gigahertz", "n": "Newton", "kn": "Kilonewton", "lbf": "Pound-force", "nm": "Newton-meter",
+    "lx": "Lux", "fc": "Foot-candle", "c": "Celsius", "f": "Fahrenheit", "k": "Kelvin",
+    "mpg": "MPG (US)", "kmpl": "km/L", "reaumur": "Réaumur",
+}
+
+# Scores per query word, best first; fuzzy hits lose a tenth per edit
+EXACT, PREFIX, FUZZY = 3, 2, 1
+KEYWORD_PENALTY = 0.5
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def tokenize(text):
+    return _WORD_RE.findall(text.lower())
+
+
+def default_entries(tabs, engine=None):
+    # One entry per converter and per unit it offers; tabs: ((title, [converters]), ...)
+    engine = engine or get_engine()
+    entries = []
+    for tab, converters in tabs:
+        for converter in converters:
+            entries.append(SearchEntry(converter, converter, None, tab))
+            if engine.has_category(converter):
+                units = engine.unit_names(converter)
+            elif converter == "Temperature":
+                units = TEMPERATURE_UNITS
+            elif converter == "Fuel Efficiency":
+                units = FUEL_UNITS
+            elif converter == "Currency Converter":
+                units = CURRENCIES
+            else:
+                units = ()
+            entries.extend(SearchEntry(unit, converter, unit, tab) for unit in units)
+    return entries
+
+
+def prefixed_entries(query, tabs, engine=None):
+    # Entries for a prefixed unit symbol or name ("kPa", "ms", "gibibyte"),
+    # found by lookup rather than indexed: the listed unit when one has the
+    # same factor, else the typed unit itself
+    engine = engine or get_engine()
+    query = query.strip()
+    entries = []
+    for tab, converters in tabs:
+        for converter in converters:
+            if converter not in PREFIXABLE_UNITS:
+                continue
+            cat = engine.category(converter)
+            if not cat.has_unit(query):
+                continue
+            factor = cat.unit_factor(query)
+            unit = next((name for name, f in zip(cat.names, cat.factors) if f == factor), query)
+            entries.append(SearchEntry(unit, converter, unit, tab))
+    return entries
+
+
+class UnitIndex:
+    # Built once; search() only walks precomputed structures
+    MIN_FUZZY_LEN = 4
+
+    def __init__(self, entries):
+        self.entries = tuple(entries)
+        # Names (and abbreviations) in one trie, descriptive keywords in another
+        # so a keyword hit ranks below a name hit of the same kind
+        names = {}
+        keywords = {}
+        for i, entry in enumerate(self.entries):
+            terms = tokenize(entry.label)
+            if entry.unit is None:
+                for keyword in KEYWORDS.get(entry.converter, ()):
+                    for word in tokenize(keyword):
+                        keywords.setdefault(word, set()).add(i)
+            else:
+                terms += [alias for alias, unit in ALIASES.items() if unit == entry.unit]
+            for word in terms:
+                names.setdefault(word, set()).add(i)
+        self._words = names
+        self._keywords = keywords
+        self._trie = self._build_trie(names)
+        self._keyword_trie = self._build_trie(keywords)
+        self._deletes = {}  # word or prefix with chars removed -> set of originals
+        for word in set(names) | set(keywords):
+            for end in range(self.MIN_FUZZY_LEN, len(word) + 1):
+                prefix = word[:end]
+                for variant in _deletions(prefix, _max_distance(len(prefix))):
+                    self._deletes.setdefault(variant, set()).add(prefix)
+
+    def _build_trie(self, words):
+        # char -> child node; node[""] = frozenset of entry ids below it
+        trie = {}
+        for word, ids in words.items():
+            node = trie
+            for ch in word:
+                node = node.setdefault(ch, {})
+                node.setdefault("", set()).update(ids)
+        self._freeze(trie)
+        return trie
+
+    def _freeze(self, node):
+        for key, child in node.items():
+            if key == "":
+                node[""] = frozenset(child)
+            else:
+                self._freeze(child)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _prefix_ids(trie, prefix):
+        node = trie
+        for ch in prefix:
+            node = node.get(ch)
+            if node is None:
+                return frozenset()
+        return node.get("", frozenset())
+
+    def _fuzzy_terms(self, word):
+        # {indexed word or prefix: edit distance} within reach of `word`
+        limit = _max_distance(len(word))
+        found = {}
+        for variant in _deletions(word, limit):
+            for term in self._deletes.get(variant, ()):
+                if term not in found:
+                    distance = _distance(word, term, limit)
+                    if distance <= limit:
+                        found[term] = distance
+        return found
+
+    def _word_scores(self, word):
+        # entry id -> best score for one query word. Typo matching only kicks
+        # in when the word is not the start of any name.
+        scores = {}
+
+        def offer(ids, score):
+            for i in ids:
+                if scores.get(i, 0) < score:
+                    scores[i] = score
+
+        offer(self._prefix_ids(self._trie, word), PREFIX)
+        offer(self._words.get(word, ()), EXACT)
+        offer(self._prefix_ids(self._keyword_trie, word), PREFIX - KEYWORD_PENALTY)
+        offer(self._keywords.get(word, ()), EXACT - KEYWORD_PENALTY)
+        if len(word) >= self.MIN_FUZZY_LEN and not self._prefix_ids(self._trie, word):
+            for term, distance in self._fuzzy_terms(word).items():
+                score = FUZZY - distance / 10
+                offer(self._prefix_ids(self._trie, term), score)
+                offer(self._prefix_ids(self._keyword_trie, term), score - KEYWORD_PENALTY)
+        return scores
+
+    def search(self, query, limit=12):
+        words = tokenize(query)
+        if not words:
+            return []
+        totals = None
+        for word in words:
+            scores = self._word_scores(word)
+            if totals is None:
+                totals = scores
+            else:
+                # Every query word has to match
+                totals = {i: s + scores[i] for i, s in totals.items() if i in scores}
+            if not totals:
+                return []
+        q = query.strip().lower()
+        ranked = []
+        for i, score in totals.items():
+            entry = self.entries[i]
+            if entry.label.lower().startswith(q):
+                score += 1
+            ranked.append((-score, entry.unit is not None, len(entry.label), entry.label, i))
+        ranked.sort()
+        return [SearchResult(self.entries[r[-1]], -r[0]) for r in ranked[:limit]]
+
+
+def _max_distance(length):
+    return 2 if length >= 10 else 1
+
+
+def _deletions(word, distance):
+    # The word itself plus every variant with up to `distance` characters removed
+    found = {word}
+    edge = {word}
+    for _ in range(distance):
+        edge = {w[:i] + w[i + 1:] for w in edge for i in range(len(w)) if len(w) > 1}
+        found |= edge
+    return found
+
+
+def _distance(a, b, limit):
+    # Damerau-Levenshtein (adjacent transpositions), stopping early past `limit`
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+if __name__ == "__main__":
+    # Ad-hoc check: results and per-query time for the words on the command line
+    converters = list(get_engine().category_names) + ["Temperature", "Fuel Efficiency"]
+    tabs = [("", converters + [c for c in KEYWORDS if c not in converters])]
+    began = time.perf_counter()
+    index = UnitIndex(default_entries(tabs))
+    print(f"Indexed {len(index)} entries in {(time.perf_counter() - began) * 1000:.1f} ms")
+    for query in sys.argv[1:] or ["kilo", "kilomter", "mlie", "body mass"]:
+        runs = 200
+        began = time.perf_counter()
+        for _ in range(runs):
+            results = index.search(query)
+        per_query = (time.perf_counter() - began) / runs * 1e6
+        print(f"{query!r} ({per_query:.0f} us/query):")
+        for r in results[:5]:
+            print(f"  {r.entry.label} [{r.entry.converter}] score {r.score:g}")